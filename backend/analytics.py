@@ -0,0 +1,223 @@
+import os
+import time
+import asyncio
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+from backend.metrics import registry
+
+# Progress histogram: ten 10%-wide buckets (the last one includes 100)
+PROGRESS_BINS = np.linspace(0.0, 100.0, 11)
+PERCENTILES = (10, 25, 50, 75, 90)
+FUNNEL_THRESHOLDS = (('25%', 25.0), ('50%', 50.0), ('75%', 75.0))
+INTERVALS = ('day', 'week', 'month')
+
+
+def _timestamps(values: List[Optional[str]]) -> np.ndarray:
+    """ISO strings (naive UTC, or with an offset as PostgREST returns them) to datetime64[s]; None -> NaT"""
+    return np.array([value[:19] if value else 'NaT' for value in values], dtype='datetime64[s]')
+
+
+class EnrollmentColumns:
+    """One course's enrollments as columnar numpy arrays"""
+
+    __slots__ = ('progress', 'completed_lessons', 'enrolled_at', 'completed_at')
+
+    def __init__(self, rows: List[dict]):
+        self.progress = np.fromiter((row['progress'] or 0.0 for row in rows), dtype=np.float64, count=len(rows))
+        self.completed_lessons = np.fromiter(
+            (row['completed_lessons'] or 0 for row in rows), dtype=np.int64, count=len(rows))
+        self.enrolled_at = _timestamps([row['enrolled_at'] for row in rows])
+        self.completed_at = _timestamps([row['completed_at'] for row in rows])
+
+    def __len__(self) -> int:
+        return len(self.progress)
+
+
+def _percentiles(values: np.ndarray) -> Optional[Dict[str, float]]:
+    if not len(values):
+        return None
+    return {f'p{p}': round(float(v), 2) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+
+def _periods(timestamps: np.ndarray, interval: str) -> np.ndarray:
+    """Start of the day/week (Monday)/month each timestamp falls in, as datetime64[D]"""
+    days = timestamps.astype('datetime64[D]')
+    if interval == 'week':
+        # 1970-01-01 was a Thursday, so weekday (Monday = 0) is (days + 3) % 7
+        ordinal = days.astype(np.int64)
+        return (ordinal - (ordinal + 3) % 7).astype('datetime64[D]')
+    if interval == 'month':
+        return timestamps.astype('datetime64[M]').astype('datetime64[D]')
+    return days
+
+
+def compute_rollup(columns: EnrollmentColumns, interval: str = 'week') -> dict:
+    """Funnel, progress distribution, time to completion and an enrollment timeline, all vectorized"""
+    completed = ~np.isnat(columns.completed_at)
+    total = len(columns)
+    completions = int(completed.sum())
+
+    funnel = [{'step': 'enrolled', 'count': total},
+              {'step': 'started', 'count': int((columns.progress > 0).sum())}]
+    funnel += [{'step': step, 'count': int((columns.progress >= threshold).sum())}
+               for step, threshold in FUNNEL_THRESHOLDS]
+    funnel.append({'step': 'completed', 'count': completions})
+
+    histogram, _ = np.histogram(np.clip(columns.progress, 0.0, 100.0), bins=PROGRESS_BINS)
+    timed = completed & ~np.isnat(columns.enrolled_at)
+    days_to_complete = (columns.completed_at[timed] - columns.enrolled_at[timed]).astype(np.float64) / 86400.0
+
+    enrolled_periods = _periods(columns.enrolled_at[~np.isnat(columns.enrolled_at)], interval)
+    completed_periods = _periods(columns.completed_at[completed], interval)
+    periods = np.union1d(enrolled_periods, completed_periods)
+    enrolled_counts = np.zeros(len(periods), dtype=np.int64)
+    completed_counts = np.zeros(len(periods), dtype=np.int64)
+    np.add.at(enrolled_counts, np.searchsorted(periods, enrolled_periods), 1)
+    np.add.at(completed_counts, np.searchsorted(periods, completed_periods), 1)
+
+    return {
+        'enrollments': total,
+        'completions': completions,
+        'completion_rate': round(completions / total, 4) if total else 0.0,
+        'funnel': funnel,
+        'progress': {
+            'bins': PROGRESS_BINS.tolist(),
+            'counts': histogram.tolist(),
+            'mean': round(float(columns.progress.mean()), 2) if total else None,
+            'percentiles': _percentiles(columns.progress),
+        },
+        'completed_lessons': {'percentiles': _percentiles(columns.completed_lessons)},
+        'days_to_complete': {'percentiles': _percentiles(days_to_complete)},
+        'timeline': {
+            'interval': interval,
+            'buckets': [
+                {'period': str(period), 'enrollments': int(enrolled), 'completions': int(done)}
+                for period, enrolled, done in zip(periods, enrolled_counts, completed_counts)
+            ],
+        },
+    }
+
+
+class CourseRollups:
+    """Loaded columns of one course plus the rollups computed from them so far"""
+
+    __slots__ = ('columns', 'loaded_at', 'refreshed_at', 'rollups')
+
+    def __init__(self, columns: EnrollmentColumns):
+        self.columns = columns
+        self.loaded_at = time.monotonic()
+        self.refreshed_at = datetime.utcnow().isoformat()
+        self.rollups: Dict[str, dict] = {}
+
+
+class AnalyticsStore:
+    """Per-course analytics cache, kept off the transactional paths.
+
+    Writes only mark a course dirty (a set insert, no I/O). A dirty course
+    is reloaded on its next read once its rollups are `min_refresh` seconds
+    old, so a busy course costs at most one reload per interval; anything
+    is reloaded after `ttl` to pick up writes made by other processes.
+    Reloads are single-flight per course, at most `max_concurrent_loads`
+    hold a DB slot at once, and numpy work runs on a worker thread rather
+    than the event loop or the DB executor.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, min_refresh: float, max_concurrent_loads: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.min_refresh = min_refresh
+        self._entries: "OrderedDict[str, CourseRollups]" = OrderedDict()
+        self._dirty: Set[str] = set()
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._load_slots = asyncio.Semaphore(max_concurrent_loads)
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+
+    def invalidate(self, course_id: str) -> None:
+        if course_id in self._entries or course_id in self._loading:
+            self._dirty.add(course_id)
+
+    def drop(self, course_id: str) -> None:
+        self._entries.pop(course_id, None)
+        self._dirty.discard(course_id)
+
+    def is_stale(self, course_id: str) -> bool:
+        return course_id in self._dirty
+
+    def _usable(self, entry: CourseRollups, course_id: str) -> bool:
+        age = time.monotonic() - entry.loaded_at
+        if age >= self.ttl:
+            return False
+        return course_id not in self._dirty or age < self.min_refresh
+
+    async def get(self, database, course_id: str) -> CourseRollups:
+        entry = self._entries.get(course_id)
+        if entry is not None and self._usable(entry, course_id):
+            self._entries.move_to_end(course_id)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        future = self._loading.get(course_id)
+        if future is None:
+            future = asyncio.ensure_future(self._load(database, course_id))
+            self._loading[course_id] = future
+            future.add_done_callback(lambda _: self._loading.pop(course_id, None))
+        # Shielded so one cancelled request does not abort the load others wait on
+        return await asyncio.shield(future)
+
+    async def _load(self, database, course_id: str) -> CourseRollups:
+        async with self._load_slots:
+            # Writes from here on must mark the new entry dirty again
+            self._dirty.discard(course_id)
+            rows = await database.get_course_enrollment_rows(course_id)
+        entry = CourseRollups(await asyncio.to_thread(EnrollmentColumns, rows))
+        self.loads += 1
+        self._entries[course_id] = entry
+        self._entries.move_to_end(course_id)
+        while len(self._entries) > self.maxsize:
+            evicted, _ = self._entries.popitem(last=False)
+            self._dirty.discard(evicted)
+        return entry
+
+    async def rollup(self, database, course_id: str, interval: str = 'week') -> dict:
+        """Analytics for one course, computed once per loaded snapshot and interval"""
+        entry = await self.get(database, course_id)
+        rollup = entry.rollups.get(interval)
+        if rollup is None:
+            rollup = await asyncio.to_thread(compute_rollup, entry.columns, interval)
+            entry.rollups[interval] = rollup
+        return {
+            'course_id': course_id,
+            'refreshed_at': entry.refreshed_at,
+            'stale': self.is_stale(course_id),
+            **rollup,
+        }
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'courses': len(self._entries),
+            'dirty': len(self._dirty),
+            'loads_total': self.loads,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Global analytics rollup store
+analytics_store = AnalyticsStore(
+    maxsize=int(os.environ.get('ANALYTICS_CACHE_SIZE', '500')),
+    ttl=float(os.environ.get('ANALYTICS_TTL', '900')),
+    min_refresh=float(os.environ.get('ANALYTICS_MIN_REFRESH', '60')),
+    max_concurrent_loads=int(os.environ.get('ANALYTICS_MAX_CONCURRENT_LOADS', '2')),
+)
+
+registry.gauge('analytics_courses', 'Courses with analytics rollups in memory', callback=lambda: len(analytics_store._entries))
+registry.counter('analytics_loads_total', 'Analytics enrollment reloads', callback=lambda: analytics_store.loads)
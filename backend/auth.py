@@ -1,64 +1,171 @@
 import os
+import time
+import uuid
+import logging
 import jwt
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, List, Optional
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from passlib.context import CryptContext
-from backend.models import User, UserRole
-from backend.database import db
+from backend.models import Token, TokenClaims, User, UserRole
+from backend.database import db, is_uuid
+from backend.cache import user_cache
+from backend.passwords import password_hasher
+from backend.resilience import Unavailable
+from backend.revocation import revocations
 
 # Security configuration
 SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.environ.get('ACCESS_TOKEN_EXPIRE_MINUTES', '15'))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.environ.get('REFRESH_TOKEN_EXPIRE_DAYS', '30'))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = password_hasher.context
 security = HTTPBearer()
+logger = logging.getLogger(__name__)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
+    """Verify a password against its hash (blocking; prefer password_hasher in async code)"""
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    """Hash a password"""
+    """Hash a password (blocking; prefer hash_password in async code)"""
     return pwd_context.hash(password)
 
+async def hash_password(password: str) -> str:
+    """Hash a password off the event loop"""
+    return await password_hasher.hash(password)
+
+def user_claims(user: User) -> dict:
+    """Access token claims: enough for role checks and display without reading the user row"""
+    return {
+        "sub": user.id,
+        "role": user.role.value,
+        "name": user.name,
+        "email": user.email,
+        "avatar": user.avatar,
+    }
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    """Create a JWT access token"""
+    """Create a JWT access token carrying `data` as claims"""
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    # Sub-second iat: a token issued right after a revocation must not count as revoked
+    to_encode.update({"exp": expire, "iat": time.time(), "jti": uuid.uuid4().hex, "typ": "access"})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
-    """Get the current authenticated user"""
-    credentials_exception = HTTPException(
+async def issue_tokens(user: User) -> Token:
+    """Access token plus a refresh token recorded in the database"""
+    expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    stored = await db.create_refresh_token(user.id, expire)
+    refresh_token = jwt.encode(
+        {"sub": user.id, "jti": stored["id"], "typ": "refresh", "iat": time.time(), "exp": expire},
+        SECRET_KEY, algorithm=ALGORITHM
+    )
+    return Token(
+        access_token=create_access_token(user_claims(user)),
+        token_type="bearer",
+        user=user,
+        refresh_token=refresh_token,
+        expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    )
+
+def decode_token(token: str, token_type: str) -> dict:
+    """Verify a token's signature, expiry and type; raises jwt.PyJWTError"""
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    # Tokens from before refresh tokens existed carry no typ and are access tokens
+    if payload.get("typ", "access") != token_type or payload.get("sub") is None:
+        raise jwt.InvalidTokenError(f"Not an {token_type} token")
+    return payload
+
+def credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+async def load_user(user_id: str) -> User:
+    """Full user row for `user_id`, through the user cache"""
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
     
+    generation = user_cache.generation
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
+        user_data = await db.get_user_by_id(user_id)
+    except Unavailable:
+        user = user_cache.get_stale(user_id)
+        if user is None:
+            raise
+        return user
+    if user_data is None:
+        raise credentials_exception()
+    
+    user = User(**user_data)
+    if user_cache.generation == generation:
+        user_cache.set(user_id, user)
+    return user
+
+async def load_users(user_ids: List[str]) -> Dict[str, Optional[User]]:
+    """Users keyed by id (None when missing): cached ones from the user cache, the rest in one query"""
+    found: Dict[str, Optional[User]] = {}
+    misses = []
+    for user_id in user_ids:
+        user = user_cache.get(user_id)
+        if user is not None:
+            found[user_id] = user
+        elif is_uuid(user_id):
+            misses.append(user_id)
+
+    if misses:
+        generation = user_cache.generation
+        try:
+            users = [User(**user_data) for user_data in await db.get_users_by_ids(misses)]
+        except Unavailable:
+            users = [user_cache.get_stale(user_id) for user_id in misses]
+            if any(user is None for user in users):
+                raise
+        for user in users:
+            found[user.id] = user
+            if user_cache.generation == generation:
+                user_cache.set(user.id, user)
+    return {user_id: found.get(user_id) for user_id in user_ids}
+
+async def get_current_claims(credentials: HTTPAuthorizationCredentials = Depends(security)) -> TokenClaims:
+    """Get the caller from the access token alone; revocations are checked in memory"""
+    try:
+        payload = decode_token(credentials.credentials, "access")
     except jwt.PyJWTError:
-        raise credentials_exception
+        raise credentials_exception()
     
-    user_data = await db.get_user_by_id(user_id)
-    if user_data is None:
-        raise credentials_exception
+    user_id = payload["sub"]
+    if revocations.is_revoked(payload.get("jti"), user_id, payload.get("iat", 0)):
+        raise credentials_exception()
     
-    return User(**user_data)
+    if "role" not in payload:
+        # Issued before tokens carried claims: fall back to the user row
+        user = await load_user(user_id)
+        return TokenClaims(id=user.id, email=user.email, name=user.name, role=user.role, avatar=user.avatar)
+    
+    return TokenClaims(
+        id=user_id,
+        email=payload["email"],
+        name=payload["name"],
+        role=payload["role"],
+        avatar=payload.get("avatar"),
+    )
 
-async def get_current_admin_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_user(claims: TokenClaims = Depends(get_current_claims)) -> User:
+    """Get the current authenticated user's full profile"""
+    return await load_user(claims.id)
+
+async def get_current_admin_user(current_user: TokenClaims = Depends(get_current_claims)) -> TokenClaims:
     """Get the current user if they are an admin"""
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -67,7 +174,7 @@ async def get_current_admin_user(current_user: User = Depends(get_current_user))
         )
     return current_user
 
-async def get_current_instructor_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_instructor_user(current_user: TokenClaims = Depends(get_current_claims)) -> TokenClaims:
     """Get the current user if they are an instructor or admin"""
     if current_user.role not in [UserRole.INSTRUCTOR, UserRole.ADMIN]:
         raise HTTPException(
@@ -76,13 +183,63 @@ async def get_current_instructor_user(current_user: User = Depends(get_current_u
         )
     return current_user
 
+async def refresh_session(refresh_token: str) -> Token:
+    """Exchange a refresh token for a new token pair; each refresh token works once"""
+    try:
+        payload = decode_token(refresh_token, "refresh")
+    except jwt.PyJWTError:
+        raise credentials_exception()
+    
+    user_id = payload["sub"]
+    if await db.use_refresh_token(payload["jti"]) is None:
+        stored = await db.get_refresh_token(payload["jti"])
+        if stored is not None and stored["revoked_at"] is not None:
+            # An already exchanged token came back: assume it leaked and end every session
+            logger.warning("Refresh token reuse for user %s; revoking all sessions", user_id)
+            await revoke_sessions(user_id)
+        raise credentials_exception()
+    
+    user_data = await db.get_user_by_id(user_id)
+    if user_data is None:
+        raise credentials_exception()
+    return await issue_tokens(User(**user_data))
+
+async def revoke_access_tokens(user_id: str) -> None:
+    """Void the user's current access tokens (e.g. after a role change); refreshing picks up new claims"""
+    await revocations.revoke_user(user_id, datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+
+async def revoke_sessions(user_id: str) -> None:
+    """Log the user out everywhere: refresh tokens and current access tokens"""
+    await db.revoke_user_refresh_tokens(user_id)
+    await revoke_access_tokens(user_id)
+
+async def revoke_tokens(access_token: str, refresh_token: Optional[str] = None) -> None:
+    """Log out one session: its access token and, if given, its refresh token"""
+    payload = decode_token(access_token, "access")
+    if payload.get("jti"):
+        await revocations.revoke_token(payload["jti"], payload["sub"], datetime.utcfromtimestamp(payload["exp"]))
+    if refresh_token:
+        try:
+            refresh_payload = decode_token(refresh_token, "refresh")
+        except jwt.PyJWTError:
+            return
+        await db.delete_refresh_token(refresh_payload["jti"], payload["sub"])
+
 async def authenticate_user(email: str, password: str) -> Optional[User]:
     """Authenticate a user with email and password"""
     user_data = await db.get_user_by_email(email)
     if not user_data:
         return None
     
-    if not verify_password(password, user_data['password']):
+    valid, new_hash = await password_hasher.verify_and_update(password, user_data['password'])
+    if not valid:
         return None
     
+    if new_hash:
+        # Stored hash uses outdated parameters: upgrade it transparently
+        try:
+            await db.update_user(user_data['id'], {'password': new_hash})
+        except Exception:
+            logger.exception("Failed to rehash password for user %s", user_data['id'])
+    
     return User(**user_data)
\ No newline at end of file
@@ -0,0 +1,64 @@
+import math
+import hashlib
+from typing import Iterable
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings.
+
+    Sized for `capacity` items at a false-positive rate of `error_rate`;
+    membership tests can return false positives but never false negatives,
+    so callers confirm a hit against an exact structure. Positions come from
+    one blake2b digest split into two 64-bit halves (Kirsch-Mitzenmacher
+    double hashing), so adding or testing an item costs a single hash.
+    """
+
+    __slots__ = ('capacity', 'error_rate', 'size', 'hashes', 'count', '_bits')
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        # Optimal bit count m = -n ln p / (ln 2)^2 and hash count k = m/n ln 2
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    @classmethod
+    def from_items(cls, items: Iterable[str], capacity: int, error_rate: float = 0.001) -> "BloomFilter":
+        bloom = cls(capacity, error_rate)
+        for item in items:
+            bloom.add(item)
+        return bloom
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def full(self) -> bool:
+        """True once more items were added than it was sized for (the error rate then degrades)"""
+        return self.count > self.capacity
+
+    def stats(self) -> dict:
+        return {
+            'items': self.count,
+            'capacity': self.capacity,
+            'bits': self.size,
+            'hashes': self.hashes,
+            'bytes': len(self._bits),
+        }
@@ -0,0 +1,223 @@
+import os
+import csv
+import json
+import codecs
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from backend.database import Database, is_uuid
+from backend.models import UserCreate, DEFAULT_AVATAR
+from backend.passwords import PasswordHasher
+
+IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', '500'))
+
+FORMATS = ('csv', 'ndjson')
+
+
+def detect_format(content_type: Optional[str], requested: Optional[str] = None) -> str:
+    """Pick csv or ndjson from an explicit ?format= or the request Content-Type"""
+    if requested:
+        requested = requested.lower()
+        if requested not in FORMATS:
+            raise ValueError(f"Unsupported format {requested!r}; expected csv or ndjson")
+        return requested
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    if content_type in ('text/csv', 'application/csv'):
+        return 'csv'
+    return 'ndjson'
+
+
+def format_validation_error(exc: ValidationError) -> str:
+    return '; '.join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+    )
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream incrementally and yield complete lines"""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    buffered = ''
+    async for chunk in stream:
+        buffered += decoder.decode(chunk)
+        *lines, buffered = buffered.split('\n')
+        for line in lines:
+            yield line.rstrip('\r')
+    buffered += decoder.decode(b'', final=True)
+    if buffered:
+        yield buffered.rstrip('\r')
+
+
+async def iter_records(stream: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Tuple[int, object]]:
+    """Yield (row number, dict or parse error message) without buffering the body"""
+    row = 0
+    if fmt == 'ndjson':
+        async for line in iter_lines(stream):
+            if not line.strip():
+                continue
+            row += 1
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield row, f"Invalid JSON: {exc}"
+                continue
+            yield row, record if isinstance(record, dict) else "Each line must be a JSON object"
+        return
+
+    header: Optional[List[str]] = None
+    pending = ''
+    async for line in iter_lines(stream):
+        # A quoted field may span lines: keep reading until quotes balance
+        pending = f"{pending}\n{line}" if pending else line
+        if pending.count('"') % 2:
+            continue
+        text, pending = pending, ''
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        yield row, {name: value for name, value in zip(header, values) if value != ''}
+    if pending:
+        row += 1
+        yield row, "Unterminated quoted field"
+
+
+async def iter_chunks(records: AsyncIterator[Tuple[int, object]], size: int) -> AsyncIterator[List[Tuple[int, object]]]:
+    chunk = []
+    async for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ImportReport:
+    """Per-row outcome of a bulk import"""
+
+    def __init__(self):
+        self.rows: List[dict] = []
+        self.counts: Dict[str, int] = {}
+
+    def add(self, row: int, status: str, **details) -> None:
+        self.rows.append({'row': row, 'status': status, **details})
+        self.counts[status] = self.counts.get(status, 0) + 1
+
+    def as_dict(self) -> dict:
+        self.rows.sort(key=lambda r: r['row'])
+        return {'total': len(self.rows), **self.counts, 'rows': self.rows}
+
+
+async def import_users(
+    database: Database,
+    hasher: PasswordHasher,
+    stream: AsyncIterator[bytes],
+    fmt: str,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> dict:
+    """Create users from a CSV/NDJSON stream (email, name, password, optional role/avatar/bio/phone)"""
+    report = ImportReport()
+    async for chunk in iter_chunks(iter_records(stream, fmt), chunk_size):
+        valid: List[Tuple[int, UserCreate]] = []
+        seen = set()
+        for row, record in chunk:
+            if isinstance(record, str):
+                report.add(row, 'invalid', error=record)
+                continue
+            try:
+                user = UserCreate(**record)
+            except ValidationError as exc:
+                report.add(row, 'invalid', error=format_validation_error(exc))
+                continue
+            if user.email in seen:
+                report.add(row, 'duplicate', email=user.email)
+                continue
+            seen.add(user.email)
+            valid.append((row, user))
+
+        hashes = await asyncio.gather(*(hasher.hash(user.password) for _, user in valid))
+        users = []
+        for (_, user), hashed in zip(valid, hashes):
+            user_dict = user.dict()
+            user_dict['password'] = hashed
+            user_dict['role'] = user.role.value
+            user_dict['avatar'] = user_dict.get('avatar') or DEFAULT_AVATAR
+            users.append(user_dict)
+
+        # Emails that already exist are skipped by the unique constraint
+        created = {u['email']: u['id'] for u in await database.create_users_bulk(users)}
+        for row, user in valid:
+            if user.email in created:
+                report.add(row, 'created', id=created[user.email], email=user.email)
+            else:
+                report.add(row, 'duplicate', email=user.email)
+    return report.as_dict()
+
+
+async def import_enrollments(
+    database: Database,
+    stream: AsyncIterator[bytes],
+    fmt: str,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> dict:
+    """Create enrollments from a CSV/NDJSON stream (course_id plus user_id or email)"""
+    report = ImportReport()
+    async for chunk in iter_chunks(iter_records(stream, fmt), chunk_size):
+        parsed: List[Tuple[int, dict]] = []
+        for row, record in chunk:
+            if isinstance(record, str):
+                report.add(row, 'invalid', error=record)
+            elif not record.get('course_id') or not (record.get('user_id') or record.get('email')):
+                report.add(row, 'invalid', error="course_id and one of user_id or email are required")
+            elif not is_uuid(str(record['course_id'])):
+                report.add(row, 'invalid', error="course_id: not a valid id")
+            elif record.get('user_id') and not is_uuid(str(record['user_id'])):
+                report.add(row, 'invalid', error="user_id: not a valid id")
+            else:
+                parsed.append((row, record))
+
+        # Resolve emails and check users/courses exist with one query each per chunk
+        emails = list({r['email'] for _, r in parsed if not r.get('user_id')})
+        requested_user_ids = list({str(r['user_id']) for _, r in parsed if r.get('user_id')})
+        course_ids = list({str(r['course_id']) for _, r in parsed})
+        users_by_email, users_by_id, courses = await asyncio.gather(
+            database.get_users_by_emails(emails),
+            database.get_users_by_ids(requested_user_ids),
+            database.get_courses_by_ids(course_ids),
+        )
+        email_to_id = {u['email']: u['id'] for u in users_by_email}
+        known_users = {u['id'] for u in users_by_id}
+        known_courses = {c['id'] for c in courses}
+
+        enrollments, targets, seen = [], [], set()
+        for row, record in parsed:
+            if record.get('user_id'):
+                user_id = str(record['user_id']) if str(record['user_id']) in known_users else None
+            else:
+                user_id = email_to_id.get(record['email'])
+            course_id = str(record['course_id'])
+            if not user_id:
+                report.add(row, 'unknown_user', user_id=record.get('user_id'), email=record.get('email'))
+            elif course_id not in known_courses:
+                report.add(row, 'unknown_course', course_id=course_id)
+            elif (user_id, course_id) in seen:
+                report.add(row, 'duplicate', user_id=user_id, course_id=course_id)
+            else:
+                seen.add((user_id, course_id))
+                enrollments.append({'user_id': user_id, 'course_id': course_id, 'progress': 0.0, 'completed_lessons': 0})
+                targets.append(row)
+
+        # Existing (user_id, course_id) pairs are skipped by the unique constraint
+        created = {(e['user_id'], e['course_id']): e['id'] for e in await database.create_enrollments_bulk(enrollments)}
+        for row, enrollment in zip(targets, enrollments):
+            key = (enrollment['user_id'], enrollment['course_id'])
+            if key in created:
+                report.add(row, 'created', id=created[key], user_id=key[0], course_id=key[1])
+            else:
+                report.add(row, 'duplicate', user_id=key[0], course_id=key[1])
+    return report.as_dict()
@@ -0,0 +1,163 @@
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Hashable, List, Optional, Tuple
+
+from backend.metrics import watch_cache
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """In-process LRU cache whose entries also expire after `ttl` seconds.
+
+    Expired entries stop being returned by `get` but stay (LRU-bounded) until
+    replaced or invalidated, so `get_stale` can still serve them while the
+    database is unavailable. Invalidated entries are gone for good.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        # Bumped on every invalidation so readers can skip storing a value
+        # they loaded before a concurrent write invalidated it
+        self.generation = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def get_stale(self, key: Hashable) -> Optional[Any]:
+        """The cached value even if expired (never one that was invalidated)"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        self.stale_hits += 1
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+        self.generation += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.generation += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Held, expired or not (does not count as a lookup)"""
+        return key in self._data
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Snapshot of every held (key, value), expired or not"""
+        return [(key, value) for key, (value, _) in self._data.items()]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'stale_hits': self.stale_hits,
+        }
+
+
+class UserCacheSync:
+    """Invalidates cached users whose profile another worker updated.
+
+    `Database.update_user` invalidates the entry on the worker that made the
+    change; every `sync_interval` seconds this asks the database which users
+    were updated since the previous pass (less an overlap for clock skew and
+    racing commits) and drops them here too. A profile change therefore
+    reaches every worker within `sync_interval`, not the cache TTL.
+    """
+
+    overlap = timedelta(seconds=30)
+
+    def __init__(self, cache: TTLCache, sync_interval: Optional[float] = None):
+        self.cache = cache
+        self.sync_interval = sync_interval or float(os.environ.get('USER_CACHE_SYNC_INTERVAL', '5'))
+        self._database = None
+        self._synced_to: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self.invalidated = 0
+
+    async def sync(self) -> int:
+        """Drop users updated since the last pass; returns how many were cached"""
+        started = datetime.utcnow()
+        dropped = 0
+        for user_id in await self._database.get_user_ids_updated_since(self._synced_to - self.overlap):
+            if user_id in self.cache:
+                self.cache.invalidate(user_id)
+                dropped += 1
+        self._synced_to = started
+        self.invalidated += dropped
+        return dropped
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception:
+                logger.exception("User cache sync failed")
+
+    def start(self, database) -> None:
+        if self._task is None:
+            self._database = database
+            self._synced_to = datetime.utcnow()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            'sync_interval': self.sync_interval,
+            'synced_to': self._synced_to.isoformat() if self._synced_to else None,
+            'invalidated_total': self.invalidated,
+        }
+
+
+# Authenticated users keyed by user id; holds `User` models (no password hash)
+user_cache = TTLCache(
+    maxsize=int(os.environ.get('USER_CACHE_SIZE', '10000')),
+    ttl=float(os.environ.get('USER_CACHE_TTL', '60')),
+)
+watch_cache('users', user_cache)
+user_cache_sync = UserCacheSync(user_cache)
@@ -0,0 +1,78 @@
+import os
+import hashlib
+from typing import List, Optional, Union
+
+from fastapi import Request, Response
+
+from backend.cache import TTLCache
+from backend.metrics import watch_cache
+from backend.models import Course
+from backend.serialization import render
+
+
+class CatalogEntry:
+    """Cached catalog read: the DB rows plus their JSON body and strong ETag.
+
+    The body is validated and serialized once, on first use, so every later
+    hit (and every 304) costs neither a query nor serialization. Rows are
+    shared between requests and must be treated as read-only. The ETag is a
+    hash of the body, so it changes exactly when a fresh read returns
+    different rows; it cannot tell a stale entry from a current one.
+    """
+
+    __slots__ = ('rows', '_body', '_etag')
+
+    def __init__(self, rows: Union[dict, List[dict], None]):
+        self.rows = rows
+        self._body: Optional[bytes] = None
+        self._etag: Optional[str] = None
+
+    def _serialize(self) -> None:
+        self._body = render(List[Course] if isinstance(self.rows, list) else Course, self.rows)
+        self._etag = '"%s"' % hashlib.sha256(self._body).hexdigest()[:32]
+
+    @property
+    def body(self) -> bytes:
+        if self._body is None:
+            self._serialize()
+        return self._body
+
+    @property
+    def etag(self) -> str:
+        if self._etag is None:
+            self._serialize()
+        return self._etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def conditional_response(request: Request, entry: CatalogEntry) -> Response:
+    """200 with the cached body, or 304 when the client already has this version"""
+    headers = {'ETag': entry.etag, 'Cache-Control': 'no-cache'}
+    if etag_matches(request.headers.get('if-none-match'), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type='application/json', headers=headers)
+
+
+# Course pages keyed by (category, limit, offset) and single courses by id.
+# Course writes clear it on the worker that made them only: other workers keep
+# serving the previous rows, and answering 304 to their ETag, for up to
+# CATALOG_CACHE_TTL seconds. That TTL is the cross-worker staleness bound.
+catalog_cache = TTLCache(
+    maxsize=int(os.environ.get('CATALOG_CACHE_SIZE', '1000')),
+    ttl=float(os.environ.get('CATALOG_CACHE_TTL', '300')),
+)
+watch_cache('catalog', catalog_cache)
@@ -0,0 +1,119 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from backend.catalog import catalog_cache
+
+logger = logging.getLogger(__name__)
+
+STAT_FIELDS = ('students', 'completions', 'rating_count', 'rating_sum')
+
+
+class CourseStats:
+    """Write-behind buffer for per-course statistics (students, completions, ratings).
+
+    Writes record deltas in memory; they are applied to `courses` in one
+    statement every `flush_interval` seconds, so a burst of enrollments costs
+    one UPDATE and one catalog-cache invalidation rather than one per write.
+    Catalog reads simply return the stored columns.
+
+    Deltas still pending when a process dies, or written by processes that
+    race on the same enrollment, leave the counters slightly off; every
+    `reconcile_interval` seconds (0 disables) everything is recomputed from
+    `enrollments` and `course_ratings` in bulk to repair that drift.
+    """
+
+    def __init__(self, database, flush_interval: Optional[float] = None, reconcile_interval: Optional[float] = None):
+        self.db = database
+        self.flush_interval = flush_interval or float(os.environ.get('COURSE_STATS_FLUSH_INTERVAL', '5'))
+        if reconcile_interval is None:
+            reconcile_interval = float(os.environ.get('COURSE_STATS_RECONCILE_INTERVAL', '3600'))
+        self.reconcile_interval = reconcile_interval
+        self._pending: Dict[str, dict] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._last_reconcile = time.monotonic()
+        self.flushed = 0
+        self.reconciled = 0
+        self.drifted = 0
+
+    def record(self, course_id: str, students: int = 0, completions: int = 0,
+               rating_count: int = 0, rating_sum: float = 0) -> None:
+        delta = self._pending.get(course_id)
+        if delta is None:
+            delta = self._pending[course_id] = {'course_id': course_id, **{field: 0 for field in STAT_FIELDS}}
+        delta['students'] += students
+        delta['completions'] += completions
+        delta['rating_count'] += rating_count
+        delta['rating_sum'] += rating_sum
+
+    async def _apply_pending(self) -> int:
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        deltas = [delta for delta in batch.values() if any(delta[field] for field in STAT_FIELDS)]
+        if not deltas:
+            return 0
+        try:
+            updated = await self.db.apply_course_stat_deltas(deltas)
+        except BaseException:
+            # Merge the batch back into whatever was recorded meanwhile
+            for delta in deltas:
+                self.record(delta['course_id'], **{field: delta[field] for field in STAT_FIELDS})
+            raise
+        self.flushed += len(deltas)
+        catalog_cache.clear()
+        return updated
+
+    async def flush(self) -> int:
+        """Apply every pending delta in one batch"""
+        async with self._flush_lock:
+            return await self._apply_pending()
+
+    async def reconcile(self) -> int:
+        """Flush, then recompute every course's statistics; returns how many courses had drifted"""
+        async with self._flush_lock:
+            await self._apply_pending()
+            drifted = await self.db.reconcile_course_stats()
+            self._last_reconcile = time.monotonic()
+            self.reconciled += 1
+            self.drifted += drifted
+            if drifted:
+                logger.info("Course stats reconciliation fixed %d courses", drifted)
+                catalog_cache.clear()
+            return drifted
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                if self.reconcile_interval and time.monotonic() - self._last_reconcile >= self.reconcile_interval:
+                    await self.reconcile()
+                else:
+                    await self.flush()
+            except Exception:
+                logger.exception("Course stats flush failed; %d courses kept for retry", len(self._pending))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            'pending': len(self._pending),
+            'flushed_total': self.flushed,
+            'reconciliations_total': self.reconciled,
+            'drifted_total': self.drifted,
+        }
@@ -1,243 +1,556 @@
 import os
-from supabase import create_client, Client
-from typing import Optional, List, Dict, Any
-import uuid
-from datetime import datetime
 import asyncio
-from functools import wraps
+from typing import AsyncIterator, Dict, Optional, List, Tuple
+import uuid
+from datetime import datetime, timezone
+
+from backend.analytics import analytics_store
+from backend.cache import user_cache
+from backend.catalog import CatalogEntry, catalog_cache
+from backend.course_stats import CourseStats
+from backend.metrics import registry
+from backend.search import course_index
+from backend.pagination import Cursor
+from backend.recommendations import related_courses
+from backend.resilience import Unavailable
+from backend.storage import StorageBackend, create_backend
+
 
-# Initialize Supabase client
-supabase_url = os.environ.get('SUPABASE_URL')
-supabase_key = os.environ.get('SUPABASE_ANON_KEY')
+# Sorts before every other uuid, so (ts, NIL_UUID) keysets include rows at exactly ts
+NIL_UUID = '00000000-0000-0000-0000-000000000000'
 
-if not supabase_url or not supabase_key:
-    raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY must be set in environment variables")
 
-supabase: Client = create_client(supabase_url, supabase_key)
+def is_uuid(value: str) -> bool:
+    """Whether `value` can be a row id; anything else is known missing without a query"""
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        return False
+    return True
+
+
+def to_utc_iso(value: Optional[datetime]) -> Optional[str]:
+    """Naive-UTC ISO string, the format timestamps are stored in"""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
 
-def async_supabase(func):
-    """Decorator to handle async operations with Supabase"""
-    @wraps(func)
-    async def wrapper(*args, **kwargs):
-        loop = asyncio.get_event_loop()
-        from functools import partial
-        bound = partial(func, *args, **kwargs)
-        return await loop.run_in_executor(None, bound)
-    return wrapper
 
 class Database:
-    def __init__(self):
-        self.supabase = supabase
+    """Data-access facade used by the API; storage I/O is delegated to a pluggable backend"""
+
+    def __init__(self, backend: Optional[StorageBackend] = None, search_backend: Optional[str] = None):
+        # Created on first use, so importing `db` needs no storage configuration
+        self._backend = backend
+        # 'memory' (in-process index) or 'database' (Postgres full-text search)
+        self.search_backend = search_backend or os.environ.get('SEARCH_BACKEND', 'memory')
+        self._index_lock = asyncio.Lock()
+        # Buffered students/completions/rating deltas, flushed in batches
+        self.course_stats = CourseStats(self)
+
+    @property
+    def backend(self) -> StorageBackend:
+        if self._backend is None:
+            self._backend = create_backend()
+        return self._backend
+
+    @backend.setter
+    def backend(self, backend: StorageBackend) -> None:
+        self._backend = backend
+
+    async def connect(self):
+        """Open backend connections"""
+        await self.backend.connect()
+
+    async def warm(self, connections: int):
+        """Open extra backend connections before traffic arrives"""
+        await self.backend.warm(connections)
+
+    async def close(self):
+        """Close backend connections"""
+        if self._backend is not None:
+            await self._backend.close()
 
     # User operations
-    @async_supabase
-    def create_user(self, user_data: dict) -> dict:
+    async def create_user(self, user_data: dict) -> dict:
         """Create a new user"""
         user_data['id'] = str(uuid.uuid4())
         user_data['created_at'] = datetime.utcnow().isoformat()
-        
-        result = self.supabase.table('users').insert(user_data).execute()
-        return result.data[0] if result.data else None
+        return await self.backend.create_user(user_data)
 
-    @async_supabase
-    def get_user_by_email(self, email: str) -> Optional[dict]:
+    async def get_user_by_email(self, email: str) -> Optional[dict]:
         """Get user by email"""
-        result = self.supabase.table('users').select('*').eq('email', email).execute()
-        return result.data[0] if result.data else None
+        return await self.backend.get_user_by_email(email)
 
-    @async_supabase
-    def get_user_by_id(self, user_id: str) -> Optional[dict]:
+    async def get_user_by_id(self, user_id: str) -> Optional[dict]:
         """Get user by ID"""
-        result = self.supabase.table('users').select('*').eq('id', user_id).execute()
-        return result.data[0] if result.data else None
+        return await self.backend.get_user_by_id(user_id)
 
-    @async_supabase
-    def update_user(self, user_id: str, user_data: dict) -> Optional[dict]:
+    async def update_user(self, user_id: str, user_data: dict) -> Optional[dict]:
         """Update user"""
         user_data['updated_at'] = datetime.utcnow().isoformat()
-        result = self.supabase.table('users').update(user_data).eq('id', user_id).execute()
-        return result.data[0] if result.data else None
+        try:
+            return await self.backend.update_user(user_id, user_data)
+        finally:
+            user_cache.invalidate(user_id)
+            if 'name' in user_data or 'avatar' in user_data:
+                # Instructor name/avatar are embedded in cached catalog rows
+                catalog_cache.clear()
+
+    async def get_users_by_ids(self, user_ids: List[str]) -> List[dict]:
+        """Get several users in one query (order not guaranteed)"""
+        if not user_ids:
+            return []
+        return await self.backend.get_users_by_ids(user_ids)
+
+    async def get_user_ids_updated_since(self, updated_since: datetime) -> List[str]:
+        """Ids of users updated at or after `updated_since`, by any worker"""
+        return await self.backend.get_user_ids_updated_since(to_utc_iso(updated_since))
+
+    async def get_users_by_emails(self, emails: List[str]) -> List[dict]:
+        """Get the users matching any of the given emails"""
+        if not emails:
+            return []
+        return await self.backend.get_users_by_emails(emails)
+
+    async def create_users_bulk(self, users: List[dict]) -> List[dict]:
+        """Insert many users at once, skipping emails that already exist"""
+        now = datetime.utcnow().isoformat()
+        for user_data in users:
+            user_data['id'] = str(uuid.uuid4())
+            user_data['created_at'] = now
+        if not users:
+            return []
+        return await self.backend.create_users_bulk(users)
+
+    # Token operations
+    async def create_refresh_token(self, user_id: str, expires_at: datetime) -> dict:
+        """Record a newly issued refresh token; its id is the token's jti"""
+        token_data = {
+            'id': str(uuid.uuid4()),
+            'user_id': user_id,
+            'created_at': datetime.utcnow().isoformat(),
+            'expires_at': to_utc_iso(expires_at),
+        }
+        return await self.backend.create_refresh_token(token_data)
+
+    async def get_refresh_token(self, token_id: str) -> Optional[dict]:
+        return await self.backend.get_refresh_token(token_id)
+
+    async def use_refresh_token(self, token_id: str) -> Optional[dict]:
+        """Revoke a live refresh token as it is exchanged; None if it was unknown, expired or already used"""
+        return await self.backend.use_refresh_token(token_id, datetime.utcnow().isoformat())
+
+    async def revoke_user_refresh_tokens(self, user_id: str) -> int:
+        return await self.backend.revoke_user_refresh_tokens(user_id, datetime.utcnow().isoformat())
+
+    async def delete_refresh_token(self, token_id: str, user_id: str) -> bool:
+        """Forget a refresh token on logout, so presenting it later is not mistaken for reuse"""
+        return await self.backend.delete_refresh_token(token_id, user_id)
+
+    async def create_token_revocation(self, revocation_data: dict) -> dict:
+        """Revoke one access token (jti) or every token of a user issued until now (no jti)"""
+        revocation_data['id'] = str(uuid.uuid4())
+        revocation_data['revoked_at'] = datetime.utcnow().isoformat()
+        revocation_data['expires_at'] = to_utc_iso(revocation_data['expires_at'])
+        return await self.backend.create_token_revocation(revocation_data)
+
+    async def get_token_revocations(self, revoked_since: Optional[datetime], live_at: datetime) -> List[dict]:
+        return await self.backend.get_token_revocations(to_utc_iso(revoked_since), to_utc_iso(live_at))
+
+    async def purge_expired_tokens(self) -> int:
+        return await self.backend.purge_expired_tokens(datetime.utcnow().isoformat())
 
     # Course operations
-    @async_supabase
-    def create_course(self, course_data: dict) -> dict:
+    async def create_course(self, course_data: dict) -> dict:
         """Create a new course"""
         course_data['id'] = str(uuid.uuid4())
         course_data['created_at'] = datetime.utcnow().isoformat()
-        
-        result = self.supabase.table('courses').insert(course_data).execute()
-        return result.data[0] if result.data else None
+        course = await self.backend.create_course(course_data)
+        if course:
+            course_index.add(course)
+            catalog_cache.clear()
+        return course
 
-    @async_supabase
-    def get_courses(self, limit: int = 100, offset: int = 0, category: Optional[str] = None) -> List[dict]:
+    async def get_courses(self, limit: int = 100, offset: int = 0, category: Optional[str] = None) -> List[dict]:
         """Get all courses with optional filtering"""
-        query = self.supabase.table('courses').select('''
-            *,
-            users!courses_instructor_id_fkey(name, avatar)
-        ''').range(offset, offset + limit - 1)
-        
-        if category and category != 'Todos':
-            query = query.eq('category', category)
-            
-        result = query.execute()
-        
-        # Transform the data to include instructor info
-        courses = []
-        for course in result.data:
-            course_data = course.copy()
-            if course.get('users'):
-                course_data['instructor_name'] = course['users']['name']
-                course_data['instructor_avatar'] = course['users']['avatar']
-                del course_data['users']
-            courses.append(course_data)
-            
-        return courses
-
-    @async_supabase
-    def get_course_by_id(self, course_id: str) -> Optional[dict]:
+        return (await self.get_courses_entry(limit=limit, offset=offset, category=category)).rows
+
+    async def get_courses_entry(self, limit: int = 100, offset: int = 0, category: Optional[str] = None) -> CatalogEntry:
+        """Get a catalog page through the catalog cache"""
+        if category == 'Todos':
+            category = None
+        key = ('courses', category, limit, offset)
+        entry = catalog_cache.get(key)
+        if entry is None:
+            generation = catalog_cache.generation
+            try:
+                entry = CatalogEntry(await self.backend.get_courses(limit=limit, offset=offset, category=category))
+            except Unavailable:
+                # An expired page beats a 503 while the database is down
+                entry = catalog_cache.get_stale(key)
+                if entry is None:
+                    raise
+                return entry
+            if catalog_cache.generation == generation:
+                catalog_cache.set(key, entry)
+        return entry
+
+    async def get_courses_after(self, limit: int = 100, cursor: Optional[Cursor] = None, category: Optional[str] = None) -> List[dict]:
+        """Get a keyset page of courses, newest first, after the cursor row"""
+        if category == 'Todos':
+            category = None
+        return await self.backend.get_courses_after(limit=limit, after=cursor, category=category)
+
+    async def get_course_by_id(self, course_id: str) -> Optional[dict]:
         """Get course by ID"""
-        result = self.supabase.table('courses').select('''
-            *,
-            users!courses_instructor_id_fkey(name, avatar)
-        ''').eq('id', course_id).execute()
-        
-        if result.data:
-            course = result.data[0]
-            if course.get('users'):
-                course['instructor_name'] = course['users']['name']
-                course['instructor_avatar'] = course['users']['avatar']
-                del course['users']
-            return course
-        return None
+        return (await self.get_course_entry(course_id)).rows
+
+    async def get_course_entry(self, course_id: str) -> CatalogEntry:
+        """Get a single course through the catalog cache (rows is None when missing)"""
+        key = ('course', course_id)
+        entry = catalog_cache.get(key)
+        if entry is None:
+            generation = catalog_cache.generation
+            try:
+                entry = CatalogEntry(await self.backend.get_course_by_id(course_id))
+            except Unavailable:
+                entry = catalog_cache.get_stale(key)
+                if entry is None:
+                    raise
+                return entry
+            if entry.rows is not None and catalog_cache.generation == generation:
+                catalog_cache.set(key, entry)
+        return entry
+
+    async def get_courses_batch(self, course_ids: List[str]) -> Dict[str, Optional[dict]]:
+        """Courses keyed by id (None when missing): cached ones from the catalog cache, the rest in one query"""
+        found: Dict[str, Optional[dict]] = {}
+        misses = []
+        for course_id in course_ids:
+            entry = catalog_cache.get(('course', course_id))
+            if entry is not None:
+                found[course_id] = entry.rows
+            elif is_uuid(course_id):
+                misses.append(course_id)
+
+        if misses:
+            generation = catalog_cache.generation
+            try:
+                rows = await self.get_courses_by_ids(misses)
+            except Unavailable:
+                stale = [catalog_cache.get_stale(('course', course_id)) for course_id in misses]
+                if any(entry is None for entry in stale):
+                    raise
+                rows = [entry.rows for entry in stale]
+            for course in rows:
+                found[course['id']] = course
+                # Cached like single-course reads, so later GET /courses/{id} calls hit too
+                if catalog_cache.generation == generation:
+                    catalog_cache.set(('course', course['id']), CatalogEntry(course))
+        return {course_id: found.get(course_id) for course_id in course_ids}
+
+    async def get_courses_by_ids(self, course_ids: List[str]) -> List[dict]:
+        """Get several courses in one query (order not guaranteed)"""
+        if not course_ids:
+            return []
+        return await self.backend.get_courses_by_ids(course_ids)
+
+    async def get_courses_changed_since(self, changed_since: datetime, page_size: int = 500) -> List[dict]:
+        """Every course created or updated at or after `changed_since` (deletions are not seen)"""
+        since = to_utc_iso(changed_since)
+        courses, after_id = [], None
+        while True:
+            page = await self.backend.get_courses_changed_page(since, after_id=after_id, limit=page_size)
+            courses.extend(page)
+            if len(page) < page_size:
+                return courses
+            after_id = page[-1]['id']
+
+    async def search_courses(self, query: str, limit: int = 100, offset: int = 0, category: Optional[str] = None) -> List[dict]:
+        """Ranked course search over title, description and category"""
+        if category == 'Todos':
+            category = None
+        if self.search_backend == 'database':
+            return await self.backend.search_courses(query, limit=limit, offset=offset, category=category)
+
+        await self.build_search_index(rebuild=False)
+        _, course_ids = course_index.search(query, category=category, limit=limit, offset=offset)
+        courses = {course['id']: course for course in await self.get_courses_by_ids(course_ids)}
+        return [courses[course_id] for course_id in course_ids if course_id in courses]
 
-    @async_supabase
-    def update_course(self, course_id: str, course_data: dict) -> Optional[dict]:
-        """Update course"""
+    async def build_search_index(self, rebuild: bool = True, page_size: int = 500):
+        """Load every course into the in-memory search index"""
+        if course_index.built and not rebuild:
+            return
+        async with self._index_lock:
+            if course_index.built and not rebuild:
+                return
+            course_index.begin_build()
+            try:
+                courses, offset = [], 0
+                while True:
+                    page = await self.backend.get_courses(limit=page_size, offset=offset)
+                    courses.extend(page)
+                    if len(page) < page_size:
+                        break
+                    offset += page_size
+            except BaseException:
+                course_index.abort_build()
+                raise
+            course_index.finish_build(courses)
+
+    async def update_course(self, course_id: str, course_data: dict, instructor_id: Optional[str] = None) -> Optional[dict]:
+        """Update course and return it with instructor details (only if owned by instructor_id, when given)"""
         course_data['updated_at'] = datetime.utcnow().isoformat()
-        result = self.supabase.table('courses').update(course_data).eq('id', course_id).execute()
-        return result.data[0] if result.data else None
+        try:
+            course = await self.backend.update_course(course_id, course_data, instructor_id=instructor_id)
+        finally:
+            catalog_cache.clear()
+        if course:
+            course_index.add(course)
+        return course
 
-    @async_supabase
-    def delete_course(self, course_id: str) -> bool:
+    async def delete_course(self, course_id: str) -> bool:
         """Delete course"""
-        result = self.supabase.table('courses').delete().eq('id', course_id).execute()
-        return len(result.data) > 0
+        try:
+            deleted = await self.backend.delete_course(course_id)
+        finally:
+            catalog_cache.clear()
+        if deleted:
+            course_index.remove(course_id)
+            analytics_store.drop(course_id)
+            related_courses.drop(course_id)
+        return deleted
 
     # Enrollment operations
-    @async_supabase
-    def create_enrollment(self, enrollment_data: dict) -> dict:
+    async def create_enrollment(self, enrollment_data: dict) -> dict:
         """Create a new enrollment"""
         enrollment_data['id'] = str(uuid.uuid4())
         enrollment_data['enrolled_at'] = datetime.utcnow().isoformat()
-        
-        result = self.supabase.table('enrollments').insert(enrollment_data).execute()
-        return result.data[0] if result.data else None
+        enrollment = await self.backend.create_enrollment(enrollment_data)
+        if enrollment:
+            self.course_stats.record(enrollment['course_id'], students=1)
+            analytics_store.invalidate(enrollment['course_id'])
+            related_courses.record(enrollment['user_id'], enrollment['course_id'])
+        return enrollment
+
+    async def create_enrollments_bulk(self, enrollments: List[dict]) -> List[dict]:
+        """Insert many enrollments at once, skipping ones that already exist"""
+        now = datetime.utcnow().isoformat()
+        for enrollment_data in enrollments:
+            enrollment_data['id'] = str(uuid.uuid4())
+            enrollment_data['enrolled_at'] = now
+        if not enrollments:
+            return []
+        created = await self.backend.create_enrollments_bulk(enrollments)
+        for enrollment in created:
+            self.course_stats.record(enrollment['course_id'], students=1)
+            analytics_store.invalidate(enrollment['course_id'])
+            related_courses.record(enrollment['user_id'], enrollment['course_id'])
+        return created
 
-    @async_supabase
-    def get_user_enrollments(self, user_id: str) -> List[dict]:
+    async def get_user_enrollments(self, user_id: str) -> List[dict]:
         """Get user enrollments with course details"""
-        result = self.supabase.table('enrollments').select('''
-            *,
-            courses(*)
-        ''').eq('user_id', user_id).execute()
-        
-        return result.data
-
-    @async_supabase
-    def get_enrollment(self, user_id: str, course_id: str) -> Optional[dict]:
+        return await self.backend.get_user_enrollments(user_id)
+
+    async def get_enrollment(self, user_id: str, course_id: str) -> Optional[dict]:
         """Get specific enrollment"""
-        result = self.supabase.table('enrollments').select('*').eq('user_id', user_id).eq('course_id', course_id).execute()
-        return result.data[0] if result.data else None
+        return await self.backend.get_enrollment(user_id, course_id)
+
+    async def get_enrollment_by_id(self, enrollment_id: str) -> Optional[dict]:
+        """Get enrollment by ID"""
+        return await self.backend.get_enrollment_by_id(enrollment_id)
 
-    @async_supabase
-    def update_enrollment_progress(self, enrollment_id: str, progress: float, completed_lessons: int) -> Optional[dict]:
+    async def update_enrollments_progress(self, updates: List[dict]) -> int:
+        """Apply a batch of progress updates in one round trip"""
+        if not updates:
+            return 0
+        updated = await self.backend.update_enrollments_progress(updates)
+        for update in updates:
+            if 'course_id' in update:
+                analytics_store.invalidate(update['course_id'])
+        return updated
+
+    async def update_enrollment_progress(self, enrollment_id: str, progress: float, completed_lessons: int) -> Optional[dict]:
         """Update enrollment progress"""
         update_data = {
             'progress': progress,
             'completed_lessons': completed_lessons
         }
-        
+
+        previous = None
         if progress >= 100:
             update_data['completed_at'] = datetime.utcnow().isoformat()
-            
-        result = self.supabase.table('enrollments').update(update_data).eq('id', enrollment_id).execute()
-        return result.data[0] if result.data else None
+            # Only the first completion counts towards the course's completions
+            previous = await self.backend.get_enrollment_by_id(enrollment_id)
+
+        enrollment = await self.backend.update_enrollment_progress(enrollment_id, update_data)
+        if enrollment:
+            analytics_store.invalidate(enrollment['course_id'])
+        if enrollment and previous and previous.get('completed_at') is None:
+            self.course_stats.record(enrollment['course_id'], completions=1)
+        return enrollment
+
+    async def get_course_enrollment_rows(self, course_id: str, page_size: int = 1000) -> List[dict]:
+        """Every enrollment of a course (analytics columns only), read in keyset pages by id"""
+        rows: List[dict] = []
+        after_id = None
+        while True:
+            page = await self.backend.get_course_enrollments_page(course_id, after_id=after_id, limit=page_size)
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+            after_id = page[-1]['id']
+
+    async def get_enrollment_pairs(self, page_size: int = 10000) -> Tuple[List[str], List[str]]:
+        """User and course ids of every enrollment, as two parallel lists, read in keyset pages by id"""
+        user_ids: List[str] = []
+        course_ids: List[str] = []
+        after_id = None
+        while True:
+            page = await self.backend.get_enrollment_pairs_page(after_id=after_id, limit=page_size)
+            user_ids.extend(row['user_id'] for row in page)
+            course_ids.extend(row['course_id'] for row in page)
+            if len(page) < page_size:
+                return user_ids, course_ids
+            after_id = page[-1]['id']
+
+    # Rating operations
+    async def rate_course(self, user_id: str, course_id: str, rating: int, review: Optional[str] = None) -> dict:
+        """Create or replace the user's rating of a course and update the course's running average"""
+        now = datetime.utcnow().isoformat()
+        previous = await self.backend.get_course_rating(user_id, course_id)
+        saved = await self.backend.upsert_course_rating({
+            'id': previous['id'] if previous else str(uuid.uuid4()),
+            'user_id': user_id,
+            'course_id': course_id,
+            'rating': rating,
+            'review': review,
+            'created_at': previous['created_at'] if previous else now,
+            'updated_at': now,
+        })
+        if previous:
+            self.course_stats.record(course_id, rating_sum=rating - previous['rating'])
+        else:
+            self.course_stats.record(course_id, rating_count=1, rating_sum=rating)
+        return saved
+
+    # Course statistics
+    async def apply_course_stat_deltas(self, deltas: List[dict]) -> int:
+        """Add buffered per-course deltas in one statement"""
+        return await self.backend.apply_course_stat_deltas(deltas)
+
+    async def reconcile_course_stats(self) -> int:
+        """Recompute students/completions/ratings for every course; returns how many had drifted"""
+        return await self.backend.reconcile_course_stats()
 
     # Certificate operations
-    @async_supabase
-    def create_certificate(self, certificate_data: dict) -> dict:
+    async def create_certificate(self, certificate_data: dict) -> dict:
         """Create a new certificate"""
         certificate_data['id'] = str(uuid.uuid4())
         certificate_data['issued_at'] = datetime.utcnow().isoformat()
-        
-        result = self.supabase.table('certificates').insert(certificate_data).execute()
-        return result.data[0] if result.data else None
+        return await self.backend.create_certificate(certificate_data)
 
-    @async_supabase
-    def get_certificates(self, limit: int = 100, offset: int = 0) -> List[dict]:
+    async def get_certificates(self, limit: int = 100, offset: int = 0) -> List[dict]:
         """Get all certificates with user and course details"""
-        result = self.supabase.table('certificates').select('''
-            *,
-            users!certificates_user_id_fkey(name),
-            courses!certificates_course_id_fkey(title),
-            instructors:users!certificates_instructor_id_fkey(name)
-        ''').range(offset, offset + limit - 1).execute()
-        
-        # Transform the data
-        certificates = []
-        for cert in result.data:
-            cert_data = cert.copy()
-            if cert.get('users'):
-                cert_data['student_name'] = cert['users']['name']
-                del cert_data['users']
-            if cert.get('courses'):
-                cert_data['course_name'] = cert['courses']['title']
-                del cert_data['courses']
-            if cert.get('instructors'):
-                cert_data['instructor_name'] = cert['instructors']['name']
-                del cert_data['instructors']
-            certificates.append(cert_data)
-            
-        return certificates
-
-    @async_supabase
-    def get_user_certificates(self, user_id: str) -> List[dict]:
+        return await self.backend.get_certificates(limit=limit, offset=offset)
+
+    async def get_certificates_after(
+        self,
+        limit: int = 100,
+        cursor: Optional[Cursor] = None,
+        course_id: Optional[str] = None,
+        instructor_id: Optional[str] = None,
+        issued_from: Optional[datetime] = None,
+        issued_to: Optional[datetime] = None,
+    ) -> List[dict]:
+        """Get a keyset page of certificates, newest first, after the cursor row"""
+        return await self.backend.get_certificates_after(
+            limit=limit,
+            after=cursor,
+            course_id=course_id,
+            instructor_id=instructor_id,
+            issued_from=to_utc_iso(issued_from),
+            issued_to=to_utc_iso(issued_to),
+        )
+
+    async def iter_certificates(self, chunk_size: int = 1000, **filters) -> AsyncIterator[dict]:
+        """Yield every matching certificate, newest first, one keyset chunk at a time"""
+        cursor = None
+        while True:
+            chunk = await self.get_certificates_after(limit=chunk_size, cursor=cursor, **filters)
+            for cert in chunk:
+                yield cert
+            if len(chunk) < chunk_size:
+                return
+            cursor = (chunk[-1]['issued_at'], chunk[-1]['id'])
+
+    async def get_user_certificates(self, user_id: str) -> List[dict]:
         """Get certificates for a specific user"""
-        result = self.supabase.table('certificates').select('''
-            *,
-            courses!certificates_course_id_fkey(title),
-            instructors:users!certificates_instructor_id_fkey(name)
-        ''').eq('user_id', user_id).execute()
-        
-        # Transform the data
-        certificates = []
-        for cert in result.data:
-            cert_data = cert.copy()
-            if cert.get('courses'):
-                cert_data['course_name'] = cert['courses']['title']
-                del cert_data['courses']
-            if cert.get('instructors'):
-                cert_data['instructor_name'] = cert['instructors']['name']
-                del cert_data['instructors']
-            certificates.append(cert_data)
-            
-        return certificates
+        return await self.backend.get_user_certificates(user_id)
+
+    async def iter_certificate_ids(self, issued_since: Optional[datetime] = None,
+                                   page_size: int = 10000) -> AsyncIterator[List[dict]]:
+        """Yield (id, certificate_id, issued_at) pages of certificates issued at or after `issued_since`, oldest first"""
+        after = (to_utc_iso(issued_since), NIL_UUID) if issued_since is not None else None
+        while True:
+            page = await self.backend.get_certificate_ids_page(after=after, limit=page_size)
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            after = (page[-1]['issued_at'], page[-1]['id'])
+
+    async def get_certificate(self, certificate_id: str) -> Optional[dict]:
+        """Get a certificate by its public certificate ID"""
+        return await self.backend.get_certificate(certificate_id)
 
     # Status check operations (keeping existing functionality)
-    @async_supabase
-    def create_status_check(self, status_data: dict) -> dict:
+    async def create_status_check(self, status_data: dict) -> dict:
         """Create a new status check"""
         status_data['id'] = str(uuid.uuid4())
         status_data['timestamp'] = datetime.utcnow().isoformat()
-        
-        result = self.supabase.table('status_checks').insert(status_data).execute()
-        return result.data[0] if result.data else None
+        return await self.backend.create_status_check(status_data)
+
+    async def create_status_checks_bulk(self, status_checks: List[dict]) -> int:
+        """Insert checks that already carry their id and timestamp in one batch"""
+        return await self.backend.create_status_checks_bulk(status_checks)
 
-    @async_supabase
-    def get_status_checks(self, limit: int = 1000) -> List[dict]:
-        """Get all status checks"""
-        result = self.supabase.table('status_checks').select('*').limit(limit).execute()
-        return result.data
+    async def get_status_checks(
+        self,
+        limit: int = 1000,
+        client_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[dict]:
+        """Status checks in [since, until), newest first"""
+        return await self.backend.get_status_checks(
+            limit=limit, client_name=client_name, since=to_utc_iso(since), until=to_utc_iso(until)
+        )
+
+    async def get_status_check_rollups(
+        self,
+        limit: int = 1000,
+        client_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[dict]:
+        """Hourly status check counts in [since, until), newest first"""
+        return await self.backend.get_status_check_rollups(
+            limit=limit, client_name=client_name, since=to_utc_iso(since), until=to_utc_iso(until)
+        )
+
+    async def downsample_status_checks(self, raw_before: datetime, rollups_before: datetime) -> dict:
+        """Roll raw checks older than raw_before up into hourly counts and expire rollups older than rollups_before"""
+        return await self.backend.downsample_status_checks(to_utc_iso(raw_before), to_utc_iso(rollups_before))
 
 # Global database instance
-db = Database()
\ No newline at end of file
+db = Database()
+
+registry.gauge('course_stats_pending', 'Courses with statistics deltas waiting to be flushed',
+               callback=lambda: len(db.course_stats._pending))
+registry.counter('course_stats_drifted_total', 'Courses corrected by statistics reconciliation',
+                 callback=lambda: db.course_stats.drifted)
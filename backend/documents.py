@@ -0,0 +1,314 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+
+from backend.catalog import etag_matches
+from backend.executor import ExecutorSaturated
+from backend.metrics import registry
+from backend.pdf import render_certificate_pdf
+
+logger = logging.getLogger(__name__)
+
+# Part of every cache key: bump when the certificate layout changes so old files are never served
+TEMPLATE_VERSION = 1
+
+certificate_render_duration = registry.histogram(
+    'certificate_render_duration_seconds', 'Time to render a certificate PDF, including waiting for a worker')
+
+
+def certificate_fields(certificate: dict) -> dict:
+    """The inputs a certificate document is rendered from"""
+    return {
+        'certificate_id': certificate['certificate_id'],
+        'student_name': certificate['student_name'],
+        'course_name': certificate['course_name'],
+        'instructor_name': certificate['instructor_name'],
+        'grade': certificate['grade'],
+        'issued_on': str(certificate['issued_at'])[:10],
+    }
+
+
+def document_key(fields: dict) -> str:
+    """Content address of a document: sha256 of the template version and the inputs"""
+    canonical = json.dumps({'template': TEMPLATE_VERSION, **fields}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+# Module-level so it can be pickled into worker processes
+def _render_to_file(fields: dict, path: str) -> int:
+    data = render_certificate_pdf(fields)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Written aside and renamed, so readers never see a partial file
+    partial = f'{path}.{os.getpid()}.tmp'
+    with open(partial, 'wb') as f:
+        f.write(data)
+    os.replace(partial, path)
+    return len(data)
+
+
+class CertificateRenderer:
+    """Renders certificate PDFs in a bounded worker pool into a content-addressed disk cache.
+
+    A document's file name is the hash of everything it is rendered from,
+    so a file never goes stale: changed inputs (a renamed student, a new
+    template) simply address a new file. Renders are single-flight per key
+    and at most `max_concurrency` are queued or running; on-demand renders
+    that cannot get a slot within `queue_timeout` seconds get
+    `ExecutorSaturated` (503).
+
+    New certificates are queued for pre-rendering (up to `max_queued`, the
+    rest are rendered on first download) and drained by
+    `prerender_concurrency` background tasks, so a burst of graduations
+    never holds more than that many workers and downloads stay served.
+    Once the cache exceeds `max_bytes` the oldest files are deleted.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        workers: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        prerender_concurrency: Optional[int] = None,
+        max_queued: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        executor: Optional[str] = None,
+    ):
+        self.cache_dir = cache_dir or os.environ.get('CERTIFICATE_CACHE_DIR', '/tmp/skilio-certificates')
+        self.workers = workers or int(os.environ.get('CERTIFICATE_RENDER_WORKERS', str(max(1, (os.cpu_count() or 2) // 2))))
+        self.max_concurrency = max_concurrency or int(os.environ.get('CERTIFICATE_RENDER_MAX_CONCURRENCY', str(self.workers * 4)))
+        self.queue_timeout = queue_timeout if queue_timeout is not None else float(os.environ.get('CERTIFICATE_RENDER_QUEUE_TIMEOUT', '10'))
+        self.prerender_concurrency = prerender_concurrency or int(os.environ.get('CERTIFICATE_PRERENDER_CONCURRENCY', '1'))
+        self.max_queued = max_queued or int(os.environ.get('CERTIFICATE_PRERENDER_QUEUE', '1000'))
+        self.max_bytes = max_bytes or int(float(os.environ.get('CERTIFICATE_CACHE_MAX_MB', '512')) * 1024 * 1024)
+        # 'process' keeps rendering off the API's GIL; 'thread' suits constrained hosts
+        self.executor_kind = executor or os.environ.get('CERTIFICATE_RENDER_EXECUTOR', 'process')
+        self._pool: Optional[Executor] = None
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._rendering: Dict[str, asyncio.Future] = {}
+        self._queue: "asyncio.Queue[dict]" = asyncio.Queue(self.max_queued)
+        self._tasks: List[asyncio.Task] = []
+        self._pruning: Optional[asyncio.Future] = None
+        self._bytes = 0
+        self.hits = 0
+        self.renders = 0
+        self.failures = 0
+        self.dropped = 0
+        self.pruned = 0
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.executor_kind == 'thread':
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='render')
+            else:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def path_for(self, key: str) -> str:
+        # Two-character fan-out keeps directories small
+        return os.path.join(self.cache_dir, key[:2], f'{key}.pdf')
+
+    async def document(self, certificate: dict) -> Tuple[str, str]:
+        """Path and content key of the certificate's PDF, rendering it first if needed"""
+        fields = certificate_fields(certificate)
+        key = document_key(fields)
+        path = self.path_for(key)
+        if os.path.exists(path):
+            self.hits += 1
+            return path, key
+
+        future = self._rendering.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._render(fields, path))
+            self._rendering[key] = future
+            future.add_done_callback(lambda _: self._rendering.pop(key, None))
+        # Shielded so one cancelled download does not abort the render others wait on
+        await asyncio.shield(future)
+        return path, key
+
+    async def _render(self, fields: dict, path: str) -> None:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise ExecutorSaturated(f"Certificate rendering saturated: no slot within {self.queue_timeout}s")
+        try:
+            loop = asyncio.get_running_loop()
+            size = await loop.run_in_executor(self._get_pool(), _render_to_file, fields, path)
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self._slots.release()
+            certificate_render_duration.observe(time.perf_counter() - started)
+        self.renders += 1
+        self._bytes += size
+        if self._bytes > self.max_bytes:
+            self._schedule_prune()
+
+    def schedule(self, certificate: dict) -> bool:
+        """Queue a new certificate for pre-rendering; False when the queue is full"""
+        try:
+            self._queue.put_nowait(certificate)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        return True
+
+    async def _prerender(self) -> None:
+        while True:
+            certificate = await self._queue.get()
+            try:
+                await self.document(certificate)
+            except Exception:
+                logger.exception("Pre-rendering certificate %s failed", certificate.get('certificate_id'))
+            finally:
+                self._queue.task_done()
+
+    def _prune(self) -> Tuple[int, int]:
+        """Delete the oldest files until the cache is back under 80% of `max_bytes`; returns (deleted, bytes left)"""
+        files = []
+        for shard in os.scandir(self.cache_dir):
+            if shard.is_dir():
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith('.pdf'):
+                        stat = entry.stat()
+                        files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        deleted = 0
+        if total > self.max_bytes:
+            files.sort()
+            for _, size, path in files:
+                if total <= self.max_bytes * 0.8:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                deleted += 1
+        return deleted, total
+
+    def _schedule_prune(self) -> None:
+        if self._pruning is not None and not self._pruning.done():
+            return
+
+        def pruned(future: asyncio.Future) -> None:
+            if future.cancelled() or future.exception() is not None:
+                if not future.cancelled():
+                    logger.error("Certificate cache prune failed", exc_info=future.exception())
+                return
+            deleted, self._bytes = future.result()
+            self.pruned += deleted
+
+        self._pruning = asyncio.ensure_future(asyncio.to_thread(self._prune))
+        self._pruning.add_done_callback(pruned)
+
+    def start(self) -> None:
+        if not self._tasks:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Measures what earlier runs left on disk
+            self._schedule_prune()
+            self._tasks = [asyncio.create_task(self._prerender()) for _ in range(self.prerender_concurrency)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.renders
+        return {
+            'cache_dir': self.cache_dir,
+            'cache_bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'queued': self._queue.qsize(),
+            'rendering': len(self._rendering),
+            'hits': self.hits,
+            'renders_total': self.renders,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'failures_total': self.failures,
+            'dropped_total': self.dropped,
+            'pruned_total': self.pruned,
+        }
+
+
+def _byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """(start, end) inclusive of a single `bytes=` range; None to send the whole file, (-1, -1) if unsatisfiable"""
+    if not header or not header.startswith('bytes=') or ',' in header:
+        # Multiple ranges may be answered with the whole representation
+        return None
+    first, _, last = header[6:].strip().partition('-')
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                return -1, -1
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        return -1, -1
+    return start, end
+
+
+def _read_range(path: str, start: int, length: int) -> bytes:
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return f.read(length)
+
+
+async def document_response(request: Request, path: str, key: str, filename: str,
+                            media_type: str = 'application/pdf') -> Response:
+    """Serve a content-addressed file with a strong ETag, 304s and single byte ranges"""
+    etag = f'"{key[:32]}"'
+    headers = {
+        'ETag': etag,
+        'Accept-Ranges': 'bytes',
+        # The content behind a key never changes, but the certificate it belongs to may be re-rendered
+        'Cache-Control': 'private, no-cache',
+        'Content-Disposition': f'inline; filename="{filename}"',
+    }
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers=headers)
+
+    size = os.path.getsize(path)
+    if_range = request.headers.get('if-range')
+    byte_range = _byte_range(request.headers.get('range'), size) if not if_range or if_range == etag else None
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, headers=headers)
+    start, end = byte_range
+    if start < 0:
+        return Response(status_code=416, headers={**headers, 'Content-Range': f'bytes */{size}'})
+    body = await asyncio.to_thread(_read_range, path, start, end - start + 1)
+    return Response(content=body, status_code=206, media_type=media_type,
+                    headers={**headers, 'Content-Range': f'bytes {start}-{end}/{size}'})
+
+
+# Global certificate renderer
+certificate_renderer = CertificateRenderer()
+
+registry.gauge('certificate_prerender_queued', 'Certificates waiting to be pre-rendered',
+               callback=lambda: certificate_renderer._queue.qsize())
+registry.counter('certificate_renders_total', 'Certificate PDFs rendered', callback=lambda: certificate_renderer.renders)
+registry.counter('certificate_render_cache_hits_total', 'Certificate downloads served from the disk cache',
+                 callback=lambda: certificate_renderer.hits)
@@ -0,0 +1,121 @@
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+
+from backend.metrics import executor_queue_wait, executor_slot_wait, registry
+
+
+class ExecutorSaturated(Exception):
+    """Raised when a DB call waits longer than the queue timeout for an executor slot"""
+
+
+class DBExecutor:
+    """Dedicated, bounded thread pool for blocking database I/O.
+
+    Calls are admitted through a max-in-flight semaphore before they reach the
+    pool. A call that cannot get a slot within `queue_timeout` seconds raises
+    `ExecutorSaturated` (surfaced as 503) instead of queueing without bound.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+    ):
+        self.max_workers = max_workers or int(os.environ.get('DB_EXECUTOR_WORKERS', '16'))
+        self.max_in_flight = max_in_flight or int(os.environ.get('DB_EXECUTOR_MAX_IN_FLIGHT', str(self.max_workers * 2)))
+        self.queue_timeout = queue_timeout if queue_timeout is not None else float(os.environ.get('DB_EXECUTOR_QUEUE_TIMEOUT', '2.0'))
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='db')
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.in_flight = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _call(self, bound, submitted: float):
+        executor_queue_wait.observe(time.perf_counter() - submitted)
+        with self._lock:
+            self.running += 1
+        try:
+            return bound()
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    async def _acquire_slot(self) -> None:
+        if not self._slots.locked():
+            await self._slots.acquire()
+            return
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise ExecutorSaturated(
+                f"Database executor saturated: no slot within {self.queue_timeout}s "
+                f"({self.in_flight} in flight, {self.waiting} waiting)"
+            )
+        finally:
+            self.waiting -= 1
+
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking call in the pool, failing fast when the pool is saturated"""
+        started = time.perf_counter()
+        await self._acquire_slot()
+        submitted = time.perf_counter()
+        executor_slot_wait.observe(submitted - started)
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._pool, self._call, partial(func, *args, **kwargs), submitted)
+        except BaseException:
+            self._finished(None)
+            raise
+        # A caller that gives up (deadline, lost hedge) does not stop the thread, so
+        # the slot is held until the call really finishes and admission stays honest
+        future.add_done_callback(self._finished)
+        return await asyncio.shield(future)
+
+    def _finished(self, future: Optional[asyncio.Future]) -> None:
+        if future is not None and not future.cancelled():
+            # Retrieved so abandoned calls that failed don't log "exception never retrieved"
+            future.exception()
+        self.in_flight -= 1
+        self._slots.release()
+
+    def gauges(self) -> dict:
+        """Live pool occupancy and queue depth"""
+        running = self.running
+        return {
+            'workers': self.max_workers,
+            'max_in_flight': self.max_in_flight,
+            'queue_timeout_seconds': self.queue_timeout,
+            'running': running,
+            'queued': max(self.in_flight - running, 0),
+            'waiting_for_slot': self.waiting,
+            'occupancy': running / self.max_workers,
+            'completed_total': self.completed,
+            'rejected_total': self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Global executor used by the Supabase bridge
+db_executor = DBExecutor()
+
+registry.gauge('db_executor_running', 'DB calls executing in the thread pool', callback=lambda: db_executor.running)
+registry.gauge('db_executor_queued', 'DB calls submitted but waiting for a pool thread',
+               callback=lambda: max(db_executor.in_flight - db_executor.running, 0))
+registry.gauge('db_executor_waiting_for_slot', 'DB calls waiting for an in-flight slot', callback=lambda: db_executor.waiting)
+registry.counter('db_executor_rejected_total', 'DB calls shed with ExecutorSaturated', callback=lambda: db_executor.rejected)
@@ -0,0 +1,59 @@
+import io
+import os
+import csv
+import json
+from typing import AsyncIterator, Iterable
+
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', '1000'))
+
+CERTIFICATE_EXPORT_FIELDS = (
+    'id', 'certificate_id', 'user_id', 'student_name', 'course_id', 'course_name',
+    'instructor_id', 'instructor_name', 'grade', 'issued_at',
+)
+
+EXPORT_MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def export_row(cert: dict, fields: Iterable[str] = CERTIFICATE_EXPORT_FIELDS) -> dict:
+    """Project a certificate row onto the export columns (missing ones become None)"""
+    return {field: cert.get(field) for field in fields}
+
+
+async def ndjson_lines(rows: AsyncIterator[dict], batch_size: int = EXPORT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Encode rows as NDJSON, yielding one bytes chunk per `batch_size` rows"""
+    lines = []
+    async for row in rows:
+        lines.append(json.dumps(export_row(row), default=str))
+        if len(lines) >= batch_size:
+            yield ('\n'.join(lines) + '\n').encode()
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode()
+
+
+async def csv_lines(rows: AsyncIterator[dict], batch_size: int = EXPORT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Encode rows as CSV with a header line, yielding one bytes chunk per `batch_size` rows"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CERTIFICATE_EXPORT_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    pending = 0
+    async for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    # Always flush: an empty export still gets its header line
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def encode_export(rows: AsyncIterator[dict], fmt: str) -> AsyncIterator[bytes]:
+    if fmt == 'csv':
+        return csv_lines(rows)
+    return ndjson_lines(rows)
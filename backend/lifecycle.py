@@ -0,0 +1,121 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from backend.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+WARM_START = os.environ.get('WARM_START', 'true').lower() in ('1', 'true', 'yes')
+WARM_CONNECTIONS = int(os.environ.get('WARM_CONNECTIONS', '4'))
+# Catalog page the frontend asks for first
+WARM_CATALOG_LIMIT = int(os.environ.get('WARM_CATALOG_LIMIT', '100'))
+
+
+class Readiness:
+    """Startup progress: per-step timings, failures and the measured cold-start time.
+
+    The clock starts when this module is imported, which the server does
+    before anything else, so `cold_start_seconds` covers imports too.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.ready = False
+        self.cold_start_seconds: Optional[float] = None
+        self.steps: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+
+    async def step(self, name: str, func: Callable[[], Awaitable[object]], required: bool = False) -> None:
+        """Run and time one startup step; optional steps only log their failure"""
+        started = time.perf_counter()
+        try:
+            await func()
+        except Exception as exc:
+            self.errors[name] = f"{type(exc).__name__}: {exc}"
+            if required:
+                raise
+            logger.warning("Warm-start step %s failed: %s", name, exc)
+        finally:
+            self.steps[name] = time.perf_counter() - started
+
+    def mark_ready(self) -> None:
+        self.cold_start_seconds = time.perf_counter() - self.started
+        self.ready = True
+        logger.info(
+            "Ready in %.3fs (%s)", self.cold_start_seconds,
+            ', '.join(f"{name} {seconds:.3f}s" for name, seconds in self.steps.items()),
+        )
+
+    def mark_stopping(self) -> None:
+        self.ready = False
+
+    def status(self) -> dict:
+        return {
+            'status': 'ready' if self.ready else 'starting',
+            'cold_start_seconds': self.cold_start_seconds,
+            'steps': {name: round(seconds, 4) for name, seconds in self.steps.items()},
+            'errors': self.errors,
+        }
+
+
+async def warm_start(database, hasher, readiness: Readiness, revocations=None, verifier=None) -> None:
+    """Connect and load token revocations, then (with WARM_START) open connections and fill caches"""
+    from backend.cache import user_cache
+    from backend.models import Certificate, CertificatePage, Course, CoursePage, User
+    from backend.serialization import adapter_for
+
+    await readiness.step('connect', database.connect, required=True)
+    if revocations is not None:
+        # Not a warm-up: until this has run, revoked tokens would still be accepted
+        await readiness.step('revocations', revocations.sync)
+    if not WARM_START:
+        readiness.mark_ready()
+        return
+
+    await readiness.step('connections', lambda: database.warm(WARM_CONNECTIONS))
+
+    async def compile_models():
+        for tp in (Course, List[Course], CoursePage, List[Certificate], CertificatePage, User):
+            adapter_for(tp)
+
+    async def prime_catalog_and_users():
+        # Serialize the first catalog page now so its first hit is a cache hit with an ETag
+        entry = await database.get_courses_entry(limit=WARM_CATALOG_LIMIT, offset=0)
+        entry.etag
+        # Instructors of the catalog are the accounts most likely to sign in and edit
+        instructor_ids = list({course['instructor_id'] for course in entry.rows})
+        for user in await database.get_users_by_ids(instructor_ids):
+            user_cache.set(user['id'], User(**user))
+
+    async def build_search_index():
+        if database.search_backend == 'memory':
+            await database.build_search_index(rebuild=False)
+
+    async def start_hasher():
+        # Spawns the bcrypt worker processes and builds the hashing context
+        await hasher.hash('warm-start')
+
+    async def load_certificate_ids():
+        # Without the filter every bogus verification id would be a query
+        if verifier is not None:
+            await verifier.load()
+
+    await asyncio.gather(
+        readiness.step('models', compile_models),
+        readiness.step('catalog', prime_catalog_and_users),
+        readiness.step('search_index', build_search_index),
+        readiness.step('password_hasher', start_hasher),
+        readiness.step('certificate_ids', load_certificate_ids),
+    )
+    readiness.mark_ready()
+
+
+# Global readiness state
+readiness = Readiness()
+
+registry.gauge('app_ready', '1 once warm start has finished', callback=lambda: int(readiness.ready))
+registry.gauge('app_cold_start_seconds', 'Seconds from server import to ready',
+               callback=lambda: readiness.cold_start_seconds or 0.0)
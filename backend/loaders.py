@@ -0,0 +1,94 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from backend.database import Database, db
+
+BatchFn = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+
+
+class Loader:
+    """Batched, de-duplicated loads with a per-request identity map.
+
+    Every `load` issued in the same event-loop tick is collected and resolved
+    by a single `batch_fn(keys)` call; a key that was already requested (or
+    primed from a write) is served from the map without another round trip.
+    Missing keys resolve to None.
+    """
+
+    def __init__(self, batch_fn: BatchFn):
+        self.batch_fn = batch_fn
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+        self._queue: List[Hashable] = []
+        self._dispatching: Optional[asyncio.Task] = None
+        self.batches = 0
+
+    def load(self, key: Hashable) -> Awaitable[Optional[Any]]:
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[key] = future
+            if not self._queue:
+                loop.call_soon(self._schedule)
+            self._queue.append(key)
+        return future
+
+    async def load_many(self, keys: List[Hashable]) -> List[Optional[Any]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: Hashable, value: Any) -> None:
+        """Record a row we already have (e.g. returned by a write)"""
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self._futures[key] = future
+
+    def clear(self, key: Hashable) -> None:
+        self._futures.pop(key, None)
+
+    def _schedule(self) -> None:
+        self._dispatching = asyncio.ensure_future(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        self.batches += 1
+        try:
+            values = await self.batch_fn(keys)
+        except Exception as exc:
+            for key in keys:
+                future = self._futures.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(exc)
+            return
+        for key in keys:
+            future = self._futures.get(key)
+            if future is not None and not future.done():
+                future.set_result(values.get(key))
+
+
+class RequestLoaders:
+    """Loaders for one request; get a fresh instance per request via `get_loaders`"""
+
+    def __init__(self, database: Database):
+        self.db = database
+        self.courses = Loader(self._load_courses)
+        self.users = Loader(self._load_users)
+        self.enrollments = Loader(self._load_enrollments)
+
+    async def _load_courses(self, course_ids: List[str]) -> Dict[str, dict]:
+        if len(course_ids) == 1:
+            # Single lookups go through the catalog cache
+            course = await self.db.get_course_by_id(course_ids[0])
+            return {course_ids[0]: course} if course else {}
+        return {course['id']: course for course in await self.db.get_courses_by_ids(course_ids)}
+
+    async def _load_users(self, user_ids: List[str]) -> Dict[str, dict]:
+        return {user['id']: user for user in await self.db.get_users_by_ids(user_ids)}
+
+    async def _load_enrollments(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], dict]:
+        rows = await asyncio.gather(*(self.db.get_enrollment(user_id, course_id) for user_id, course_id in keys))
+        return {key: row for key, row in zip(keys, rows) if row}
+
+
+def get_loaders() -> RequestLoaders:
+    """FastAPI dependency: one identity map per request"""
+    return RequestLoaders(db)
@@ -0,0 +1,242 @@
+import os
+import time
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Seconds; spans sub-millisecond cache hits up to slow bulk requests
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Any other request method is client-chosen text; it is labelled 'other'
+HTTP_METHODS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'DELETE', 'CONNECT', 'OPTIONS', 'TRACE', 'PATCH'))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    kind = ''
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonic counter, or one read from `callback` (returning a number or {labels: number}) at scrape time"""
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (),
+                 callback: Optional[Callable[[], object]] = None):
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelValues, float] = {}
+        self.callback = callback
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        if self.callback is not None:
+            current = self.callback()
+            values = list(current.items()) if isinstance(current, dict) else [((), current)]
+        else:
+            with self._lock:
+                values = list(self._values.items())
+        return self.header() + [
+            f'{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}'
+            for labels, value in values
+        ]
+
+
+class Gauge(Counter):
+    """Like Counter, but the value may also go down or be set"""
+    kind = 'gauge'
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        lines = self.header()
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = 'le="%s"' % _format_value(bound)
+                lines.append(f'{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}')
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f'{self.name}_sum{label_text} {_format_value(total)}')
+            lines.append(f'{self.name}_count{label_text} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """Process-local metrics rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Tuple[str, ...] = (),
+                callback: Optional[Callable[[], object]] = None) -> Counter:
+        return self._register(Counter(name, help, labels, callback))
+
+    def gauge(self, name: str, help: str, labels: Tuple[str, ...] = (),
+              callback: Optional[Callable[[], object]] = None) -> Gauge:
+        return self._register(Gauge(name, help, labels, callback))
+
+    def histogram(self, name: str, help: str, labels: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            try:
+                lines.extend(metric.render())
+            except Exception:
+                # A broken gauge callback must not take the whole scrape down
+                continue
+        return '\n'.join(lines) + '\n'
+
+
+# Global registry and the instruments shared across modules
+registry = MetricsRegistry()
+
+http_requests_in_flight = registry.gauge(
+    'http_requests_in_flight', 'HTTP requests currently being served', ('method',))
+http_request_duration = registry.histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route template', ('method', 'route'))
+http_requests_total = registry.counter(
+    'http_requests_total', 'HTTP responses by route template and status', ('method', 'route', 'status'))
+
+db_query_duration = registry.histogram(
+    'db_query_duration_seconds', 'Storage backend call latency, including executor wait', ('backend', 'method'))
+db_query_errors = registry.counter(
+    'db_query_errors_total', 'Storage backend calls that raised', ('backend', 'method', 'error'))
+
+executor_slot_wait = registry.histogram(
+    'db_executor_slot_wait_seconds', 'Time spent waiting for a DB executor in-flight slot')
+executor_queue_wait = registry.histogram(
+    'db_executor_queue_wait_seconds', 'Time a DB call sat in the thread pool queue before running')
+
+password_hash_duration = registry.histogram(
+    'password_hash_duration_seconds', 'bcrypt hash/verify latency, including pool wait', ('operation',))
+
+# In-process caches (TTLCache) reported at scrape time, labelled by name
+_caches: Dict[str, object] = {}
+
+
+def watch_cache(name: str, cache) -> None:
+    _caches[name] = cache
+
+
+def _cache_values(attribute: str) -> Dict[LabelValues, float]:
+    return {(name,): getattr(cache, attribute) for name, cache in _caches.items()}
+
+
+registry.gauge('cache_entries', 'Entries held by an in-process cache', ('cache',),
+               callback=lambda: {(name,): len(cache) for name, cache in _caches.items()})
+registry.counter('cache_hits_total', 'In-process cache hits', ('cache',), callback=lambda: _cache_values('hits'))
+registry.counter('cache_misses_total', 'In-process cache misses', ('cache',), callback=lambda: _cache_values('misses'))
+registry.counter('cache_stale_hits_total', 'Expired cache entries served while the database was unavailable',
+                 ('cache',), callback=lambda: _cache_values('stale_hits'))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: per-route latency histograms, status counters and in-flight gauges.
+
+    Routes are labelled by their template (e.g. /api/courses/{course_id}) so
+    label cardinality stays bounded; unmatched paths share one label, as do
+    non-standard methods.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method'] if scope['method'] in HTTP_METHODS else 'other'
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        http_requests_in_flight.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec(method)
+            route = scope.get('route')
+            template = getattr(route, 'path', None) or 'unmatched'
+            http_request_duration.observe(elapsed, method, template)
+            http_requests_total.inc(method, template, str(status_code))
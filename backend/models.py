@@ -1,9 +1,11 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 from enum import Enum
 import uuid
 
+DEFAULT_AVATAR = "https://images.unsplash.com/photo-1507003211169-0a1dd7228f2d?w=50&h=50&fit=crop&crop=face"
+
 class UserRole(str, Enum):
     STUDENT = "student"
     INSTRUCTOR = "instructor"
@@ -31,6 +33,10 @@ class User(UserBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
+class UserBatch(BaseModel):
+    items: Dict[str, Optional[User]]
+    missing: List[str]
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
@@ -39,6 +45,28 @@ class Token(BaseModel):
     access_token: str
     token_type: str
     user: User
+    refresh_token: Optional[str] = None
+    # Access token lifetime in seconds
+    expires_in: Optional[int] = None
+
+class TokenClaims(BaseModel):
+    """The caller as described by a verified access token (no database read)"""
+    id: str
+    email: str
+    name: str
+    role: UserRole
+    avatar: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+    # Also void every other session of the user
+    everywhere: bool = False
+
+class UserRoleUpdate(BaseModel):
+    role: UserRole
 
 class CourseBase(BaseModel):
     title: str
@@ -73,10 +101,36 @@ class Course(CourseBase):
     instructor_name: str
     instructor_avatar: str
     students: int = 0
+    completions: int = 0
     rating: float = 0.0
+    rating_count: int = 0
     created_at: datetime
     updated_at: Optional[datetime] = None
 
+class CoursePage(BaseModel):
+    items: List[Course]
+    next_cursor: Optional[str] = None
+
+class CourseBatch(BaseModel):
+    items: Dict[str, Optional[Course]]
+    missing: List[str]
+
+class CourseRatingCreate(BaseModel):
+    rating: int = Field(ge=1, le=5)
+    review: Optional[str] = None
+
+class CourseRating(CourseRatingCreate):
+    id: str
+    user_id: str
+    course_id: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+class RelatedCourse(BaseModel):
+    course_id: str
+    score: float
+    shared_students: int
+
 class EnrollmentBase(BaseModel):
     user_id: str
     course_id: str
@@ -108,10 +162,29 @@ class Certificate(CertificateBase):
     instructor_name: str
     issued_at: datetime
 
+class CertificateVerification(BaseModel):
+    certificate_id: str
+    student_name: str
+    course_name: str
+    instructor_name: str
+    grade: str
+    issued_at: datetime
+
+class CertificatePage(BaseModel):
+    items: List[Certificate]
+    next_cursor: Optional[str] = None
+
 class StatusCheck(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     client_name: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 class StatusCheckCreate(BaseModel):
-    client_name: str
\ No newline at end of file
+    client_name: str
+
+class StatusCheckRollup(BaseModel):
+    client_name: str
+    bucket_start: datetime
+    checks: int
+    first_seen: datetime
+    last_seen: datetime
\ No newline at end of file
@@ -0,0 +1,33 @@
+import json
+import base64
+from typing import Optional, Tuple
+
+Cursor = Tuple[str, str]
+
+
+def encode_cursor(sort_value, row_id) -> str:
+    """Opaque keyset cursor for the row a page ended on: (sort timestamp, id)"""
+    raw = json.dumps([str(sort_value), str(row_id)], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Cursor]:
+    """Decode a cursor from `encode_cursor`; an empty cursor means the first page"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(sort_value, str) or not isinstance(row_id, str):
+        raise ValueError("Invalid cursor")
+    return sort_value, row_id
+
+
+def next_cursor(rows: list, limit: int, sort_key: str) -> Optional[str]:
+    """Cursor for the page after `rows`, or None when this was the last page"""
+    if len(rows) < limit or not rows:
+        return None
+    last = rows[-1]
+    return encode_cursor(last[sort_key], last['id'])
@@ -0,0 +1,106 @@
+import os
+import time
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from backend.executor import ExecutorSaturated
+from backend.metrics import password_hash_duration
+
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+
+
+@lru_cache(maxsize=None)
+def build_context(rounds: int) -> CryptContext:
+    """bcrypt context that treats any hash not using `rounds` as needing a rehash"""
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+# Module-level so they can be pickled into worker processes
+def _hash(password: str, rounds: int) -> str:
+    return build_context(rounds).hash(password)
+
+
+def _verify_and_update(password: str, hashed: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    return build_context(rounds).verify_and_update(password, hashed)
+
+
+class PasswordHasher:
+    """Runs bcrypt off the event loop in a bounded worker pool.
+
+    At most `max_concurrency` operations are queued or running at once;
+    callers that cannot get a slot within `queue_timeout` seconds get
+    `ExecutorSaturated` (503) rather than piling up behind a login burst.
+    """
+
+    def __init__(
+        self,
+        rounds: int = BCRYPT_ROUNDS,
+        workers: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        executor: Optional[str] = None,
+    ):
+        self.rounds = rounds
+        self.workers = workers or int(os.environ.get('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 2)))
+        self.max_concurrency = max_concurrency or int(os.environ.get('PASSWORD_HASH_MAX_CONCURRENCY', str(self.workers * 4)))
+        self.queue_timeout = queue_timeout if queue_timeout is not None else float(os.environ.get('PASSWORD_HASH_QUEUE_TIMEOUT', '10'))
+        # 'process' avoids holding the GIL for bcrypt's setup work; 'thread' suits constrained hosts
+        self.executor_kind = executor or os.environ.get('PASSWORD_HASH_EXECUTOR', 'process')
+        self._pool: Optional[Executor] = None
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+
+    @property
+    def context(self) -> CryptContext:
+        return build_context(self.rounds)
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.executor_kind == 'thread':
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='bcrypt')
+            else:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    async def _run(self, func, *args):
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise ExecutorSaturated(f"Password hashing saturated: no slot within {self.queue_timeout}s")
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_pool(), func, *args)
+        finally:
+            self._slots.release()
+            password_hash_duration.observe(time.perf_counter() - started, func.__name__.lstrip('_'))
+
+    async def hash(self, password: str) -> str:
+        """Hash a password with the configured cost factor"""
+        return await self._run(_hash, password, self.rounds)
+
+    async def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password; also returns a fresh hash when the stored one is out of date"""
+        return await self._run(_verify_and_update, password, hashed, self.rounds)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        valid, _ = await self.verify_and_update(password, hashed)
+        return valid
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# Global password hashing service
+password_hasher = PasswordHasher()
@@ -0,0 +1,138 @@
+import zlib
+import unicodedata
+from typing import List, Tuple
+
+# Landscape A4 in points
+PAGE_WIDTH, PAGE_HEIGHT = 842, 595
+
+# Advance widths (1/1000 em) of printable ASCII 32-126 in the standard 14 fonts,
+# from Adobe's AFM files; accented letters share their base letter's width
+HELVETICA_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+HELVETICA_BOLD_WIDTHS = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+FONTS = {
+    'F1': ('Helvetica', HELVETICA_WIDTHS),
+    'F2': ('Helvetica-Bold', HELVETICA_BOLD_WIDTHS),
+    'F3': ('Courier', None),
+}
+
+# Colors of the web certificate (Tailwind blue-600, gray-800, gray-600, green-600, blue-50)
+BLUE = (0.145, 0.388, 0.922)
+DARK = (0.122, 0.161, 0.216)
+GRAY = (0.294, 0.333, 0.388)
+GREEN = (0.086, 0.639, 0.290)
+BACKGROUND = (0.937, 0.965, 1.0)
+
+
+def text_width(text: str, font: str, size: float) -> float:
+    widths = FONTS[font][1]
+    if widths is None:
+        return len(text) * 0.6 * size
+    total = 0
+    for char in text:
+        code = ord(unicodedata.normalize('NFKD', char)[:1] or ' ')
+        total += widths[code - 32] if 32 <= code <= 126 else 556
+    return total * size / 1000
+
+
+def _literal(text: str) -> bytes:
+    """PDF string literal in WinAnsiEncoding; characters it lacks become '?'"""
+    encoded = text.encode('cp1252', errors='replace')
+    return b'(' + encoded.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+
+class Canvas:
+    """Just enough of a PDF content stream for a one-page certificate"""
+
+    def __init__(self):
+        self._ops: List[bytes] = []
+
+    def fill_rect(self, x: float, y: float, width: float, height: float, color: Tuple[float, float, float]) -> None:
+        self._ops.append(b'%.3f %.3f %.3f rg %.2f %.2f %.2f %.2f re f' % (*color, x, y, width, height))
+
+    def stroke_rect(self, x: float, y: float, width: float, height: float, line_width: float,
+                    color: Tuple[float, float, float]) -> None:
+        self._ops.append(b'%.3f %.3f %.3f RG %.2f w %.2f %.2f %.2f %.2f re S' % (*color, line_width, x, y, width, height))
+
+    def centered_text(self, text: str, center_x: float, y: float, font: str, size: float,
+                      color: Tuple[float, float, float], max_width: float = PAGE_WIDTH - 120) -> None:
+        width = text_width(text, font, size)
+        if width > max_width:
+            # Long names and titles shrink to fit rather than overflow the border
+            size *= max_width / width
+            width = max_width
+        self._ops.append(b'BT /%s %.2f Tf %.3f %.3f %.3f rg %.2f %.2f Td %s Tj ET' % (
+            font.encode(), size, *color, center_x - width / 2, y, _literal(text)))
+
+    def content(self) -> bytes:
+        return b'\n'.join(self._ops)
+
+
+def build_pdf(content: bytes, title: str) -> bytes:
+    """Single-page PDF with the standard fonts in FONTS; byte-for-byte deterministic for the same input"""
+    stream = zlib.compress(content, 9)
+    fonts = b' '.join(b'/%s %d 0 R' % (name.encode(), 4 + i) for i, name in enumerate(FONTS))
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << %s >> >> /Contents %d 0 R >>'
+        % (PAGE_WIDTH, PAGE_HEIGHT, fonts, 4 + len(FONTS)),
+        *(b'<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>' % base.encode()
+          for base, _ in FONTS.values()),
+        b'<< /Length %d /Filter /FlateDecode >>\nstream\n' % len(stream) + stream + b'\nendstream',
+        b'<< /Title %s /Producer (Skilio) >>' % _literal(title),
+    ]
+    out = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+        len(objects) + 1, len(objects), xref)
+    return bytes(out)
+
+
+def render_certificate_pdf(fields: dict) -> bytes:
+    """The certificate of completion as shown in the web app, as a PDF"""
+    canvas = Canvas()
+    middle = PAGE_WIDTH / 2
+    canvas.fill_rect(0, 0, PAGE_WIDTH, PAGE_HEIGHT, BACKGROUND)
+    canvas.stroke_rect(34, 34, PAGE_WIDTH - 68, PAGE_HEIGHT - 68, 8, BLUE)
+
+    canvas.centered_text('CERTIFICADO DE FINALIZACIÓN', middle, 478, 'F2', 30, DARK)
+    canvas.fill_rect(middle - 48, 458, 96, 4, BLUE)
+    canvas.centered_text('Se certifica que', middle, 418, 'F1', 16, GRAY)
+    canvas.centered_text(fields['student_name'], middle, 380, 'F2', 28, BLUE)
+    canvas.centered_text('ha completado exitosamente el curso', middle, 342, 'F1', 16, GRAY)
+    canvas.centered_text(fields['course_name'], middle, 308, 'F2', 22, DARK)
+
+    left, right = PAGE_WIDTH * 0.3, PAGE_WIDTH * 0.7
+    canvas.centered_text('Instructor', left, 250, 'F1', 12, GRAY)
+    canvas.centered_text(fields['instructor_name'], left, 232, 'F2', 14, DARK, max_width=300)
+    canvas.centered_text('Fecha de Finalización', right, 250, 'F1', 12, GRAY)
+    canvas.centered_text(fields['issued_on'], right, 232, 'F2', 14, DARK, max_width=300)
+    canvas.centered_text('Calificación', left, 190, 'F1', 12, GRAY)
+    canvas.centered_text(fields['grade'], left, 170, 'F2', 18, GREEN, max_width=300)
+    canvas.centered_text('ID del Certificado', right, 190, 'F1', 12, GRAY)
+    canvas.centered_text(fields['certificate_id'], right, 172, 'F3', 12, DARK, max_width=300)
+
+    canvas.fill_rect(middle - 220, 128, 440, 2, BLUE)
+    canvas.centered_text('Skilio - Plataforma de Educación Online', middle, 106, 'F1', 11, GRAY)
+    canvas.centered_text('Este certificado puede ser verificado en skilio.com/verify', middle, 90, 'F1', 9, GRAY)
+    return build_pdf(canvas.content(), f"Certificado {fields['certificate_id']}")
@@ -0,0 +1,181 @@
+import os
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from backend.cache import TTLCache
+from backend.database import Database, db
+from backend.metrics import registry
+from backend.executor import ExecutorSaturated
+from backend.resilience import Unavailable
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressBuffer:
+    """Write-behind buffer for enrollment progress heartbeats.
+
+    Only the latest (progress, completed_lessons) per enrollment is kept; the
+    buffer is flushed as one batched write every `flush_interval` seconds or
+    once `max_pending` enrollments are waiting. An update that reaches 100%
+    is flushed before `submit` returns so `completed_at` is set right away,
+    and everything still pending is flushed on shutdown. A first completion
+    is counted towards the course's statistics once its flush succeeds.
+
+    A failed batch is put back for the next flush while the database is
+    unavailable. Any other error means the database rejected the batch, so
+    each update gets `max_attempts` tries before it is dropped; one bad row
+    cannot wedge every later flush.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        flush_interval: Optional[float] = None,
+        max_pending: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        self.db = database
+        self.flush_interval = flush_interval or float(os.environ.get('PROGRESS_FLUSH_INTERVAL', '5'))
+        self.max_pending = max_pending or int(os.environ.get('PROGRESS_FLUSH_SIZE', '500'))
+        self.max_attempts = max_attempts or int(os.environ.get('PROGRESS_FLUSH_ATTEMPTS', '3'))
+        self._pending: Dict[str, dict] = {}
+        # enrollment id -> flushes of its pending update the database rejected
+        self._attempts: Dict[str, int] = {}
+        # enrollment id -> course id, for first completions not flushed yet
+        self._completions: Dict[str, str] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        # enrollment id -> (user_id, course_id, completed), so heartbeats skip the existence check
+        self._enrollments = TTLCache(maxsize=100000, ttl=3600)
+        self.submitted = 0
+        self.coalesced = 0
+        self.flushed = 0
+        self.batches = 0
+        self.dropped = 0
+
+    async def get_enrollment(self, enrollment_id: str) -> Optional[dict]:
+        """Owner and course of an enrollment, cached (None if it does not exist)"""
+        known = self._enrollments.get(enrollment_id)
+        if known is not None:
+            return known
+        enrollment = await self.db.get_enrollment_by_id(enrollment_id)
+        if enrollment is None:
+            return None
+        known = {
+            'user_id': enrollment['user_id'],
+            'course_id': enrollment['course_id'],
+            'completed': enrollment.get('completed_at') is not None,
+        }
+        self._enrollments.set(enrollment_id, known)
+        return known
+
+    async def submit(self, enrollment_id: str, user_id: str, course_id: str, progress: float, completed_lessons: int) -> None:
+        update = {
+            'id': enrollment_id,
+            'user_id': user_id,
+            'course_id': course_id,
+            'progress': progress,
+            'completed_lessons': completed_lessons,
+        }
+        if progress >= 100:
+            update['completed_at'] = datetime.utcnow().isoformat()
+            known = self._enrollments.get(enrollment_id)
+            if known is not None and not known['completed']:
+                known['completed'] = True
+                self._completions[enrollment_id] = course_id
+
+        previous = self._pending.get(enrollment_id)
+        if previous is not None:
+            self.coalesced += 1
+            if 'completed_at' in previous and 'completed_at' not in update:
+                update['completed_at'] = previous['completed_at']
+        self._pending[enrollment_id] = update
+        self.submitted += 1
+
+        if 'completed_at' in update or len(self._pending) >= self.max_pending:
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write every pending update in one batch"""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            completions, self._completions = self._completions, {}
+            try:
+                updated = await self.db.update_enrollments_progress(list(batch.values()))
+            except BaseException as exc:
+                # Outages and local overload are retried for as long as they last
+                rejected = isinstance(exc, Exception) and not isinstance(exc, (Unavailable, ExecutorSaturated))
+                # Put the batch back without clobbering anything newer
+                for enrollment_id, update in batch.items():
+                    if rejected:
+                        attempts = self._attempts.get(enrollment_id, 0) + 1
+                        if attempts >= self.max_attempts:
+                            self._attempts.pop(enrollment_id, None)
+                            completions.pop(enrollment_id, None)
+                            self.dropped += 1
+                            continue
+                        self._attempts[enrollment_id] = attempts
+                    self._pending.setdefault(enrollment_id, update)
+                self._completions.update(completions)
+                raise
+            for enrollment_id in batch:
+                self._attempts.pop(enrollment_id, None)
+            for course_id in completions.values():
+                self.db.course_stats.record(course_id, completions=1)
+            self.flushed += len(batch)
+            self.batches += 1
+            return updated
+
+    def forget_course(self, course_id: str) -> None:
+        """Drop cached enrollments and pending updates of a deleted course"""
+        for enrollment_id, known in self._enrollments.items():
+            if known['course_id'] == course_id:
+                self._enrollments.invalidate(enrollment_id)
+        for enrollment_id, update in list(self._pending.items()):
+            if update['course_id'] == course_id:
+                del self._pending[enrollment_id]
+                self._attempts.pop(enrollment_id, None)
+                self._completions.pop(enrollment_id, None)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Progress flush failed; %d updates kept for retry", len(self._pending))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            'pending': len(self._pending),
+            'submitted_total': self.submitted,
+            'coalesced_total': self.coalesced,
+            'flushed_total': self.flushed,
+            'batches_total': self.batches,
+            'dropped_total': self.dropped,
+        }
+
+
+# Global progress buffer
+progress_buffer = ProgressBuffer(db)
+
+registry.gauge('progress_buffer_pending', 'Progress updates waiting to be flushed', callback=lambda: len(progress_buffer._pending))
+registry.counter('progress_buffer_flushed_total', 'Progress updates written in batches', callback=lambda: progress_buffer.flushed)
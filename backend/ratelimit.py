@@ -0,0 +1,314 @@
+import os
+import re
+import math
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Pattern, Tuple
+
+import jwt
+from fastapi.responses import JSONResponse
+
+from backend.auth import ALGORITHM, SECRET_KEY
+from backend.executor import db_executor
+from backend.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Admission priorities: lower is more important
+CRITICAL, AUTHENTICATED, ANONYMOUS = 0, 1, 2
+
+# Load (0..1) at and above which each priority is shed with a 503; CRITICAL is never shed here
+SHED_THRESHOLDS = {AUTHENTICATED: 0.9, ANONYMOUS: 0.7}
+
+# Never limited or shed: health, readiness and metrics scrapes
+EXEMPT_PATHS = frozenset({'/api/', '/api/ready', '/api/metrics'})
+
+rate_limited_total = registry.counter(
+    'rate_limited_total', 'Requests rejected by the rate limiter', ('group', 'reason'))
+
+
+@dataclass(frozen=True)
+class Limit:
+    """Token bucket: holds up to `burst` tokens, refilled at `rate` tokens per second"""
+    burst: float
+    rate: float
+
+    @classmethod
+    def parse(cls, value: str) -> "Limit":
+        burst, rate = value.split('/')
+        return cls(float(burst), float(rate))
+
+
+@dataclass(frozen=True)
+class Rule:
+    method: str
+    template: str
+    group: str
+    cost: float
+    # Authenticated requests on critical routes are kept when shedding
+    critical: bool = False
+
+
+# Per-group bucket sizes; every (group, IP or user) pair has its own bucket
+LIMITS: Dict[str, Limit] = {
+    'auth': Limit.parse(os.environ.get('RATE_LIMIT_AUTH', '30/0.5')),
+    'write': Limit.parse(os.environ.get('RATE_LIMIT_WRITE', '120/10')),
+    'read': Limit.parse(os.environ.get('RATE_LIMIT_READ', '600/100')),
+}
+
+# First match wins; other GETs cost 1 'read' token and other methods 1 'write' token
+RULES: List[Rule] = [
+    Rule('POST', '/api/login', 'auth', 5),
+    Rule('POST', '/api/register', 'auth', 10),
+    Rule('POST', '/api/token/refresh', 'auth', 1),
+    Rule('PUT', '/api/enrollments/{enrollment_id}/progress', 'write', 1, critical=True),
+    Rule('POST', '/api/enrollments', 'write', 1, critical=True),
+    Rule('GET', '/api/enrollments/me', 'read', 1, critical=True),
+    Rule('POST', '/api/admin/import/users', 'write', 20),
+    Rule('POST', '/api/admin/import/enrollments', 'write', 10),
+    Rule('GET', '/api/certificates/export', 'read', 20),
+    Rule('GET', '/api/courses/{course_id}/analytics', 'read', 5),
+]
+
+
+def parse_cost_overrides(value: str) -> Dict[Tuple[str, str], float]:
+    """RATE_LIMIT_COSTS, e.g. 'POST /api/login=8, GET /api/courses=2'"""
+    overrides = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        route, cost = item.rsplit('=', 1)
+        method, template = route.split()
+        overrides[(method.upper(), template)] = float(cost)
+    return overrides
+
+
+class BucketStore:
+    """Where token buckets live; implement `take` over a shared store to limit across workers"""
+
+    def take(self, key: str, cost: float, limit: Limit) -> float:
+        """Take `cost` tokens from bucket `key`; returns 0 if admitted, else seconds until it would be"""
+        raise NotImplementedError
+
+    async def take_async(self, key: str, cost: float, limit: Limit) -> float:
+        """`take` from the event loop; stores that block override this to run it off the loop"""
+        return self.take(key, cost, limit)
+
+    def close(self) -> None:
+        pass
+
+
+def _refill(tokens: float, updated: float, now: float, limit: Limit) -> float:
+    return min(limit.burst, tokens + max(now - updated, 0.0) * limit.rate)
+
+
+class MemoryBucketStore(BucketStore):
+    """Per-process buckets, least recently used evicted beyond `max_keys`"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str, cost: float, limit: Limit) -> float:
+        now = time.monotonic()
+        state = self._buckets.get(key)
+        tokens = limit.burst if state is None else _refill(state[0], state[1], now, limit)
+        if tokens >= cost:
+            tokens -= cost
+            retry_after = 0.0
+        else:
+            retry_after = (cost - tokens) / limit.rate
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SQLiteBucketStore(BucketStore):
+    """Buckets in a local SQLite file, shared by every worker process on the host.
+
+    Each take is one short IMMEDIATE transaction, run on a worker thread so
+    lock waits and fsyncs never stall the event loop; if the file stays
+    locked past `timeout` the request is admitted rather than failed.
+    """
+
+    def __init__(self, path: str, timeout: float = 0.05):
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        # Bucket state is disposable: no fsync per commit, a crash only refills buckets
+        self.conn.execute('PRAGMA synchronous = NORMAL')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL)')
+        self.lock = threading.Lock()
+
+    def take(self, key: str, cost: float, limit: Limit) -> float:
+        # Wall-clock time: monotonic clocks are not comparable across processes
+        now = time.time()
+        try:
+            with self.lock:
+                self.conn.execute('BEGIN IMMEDIATE')
+                try:
+                    row = self.conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+                    tokens = limit.burst if row is None else _refill(row[0], row[1], now, limit)
+                    if tokens >= cost:
+                        tokens -= cost
+                        retry_after = 0.0
+                    else:
+                        retry_after = (cost - tokens) / limit.rate
+                    self.conn.execute(
+                        'INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) '
+                        'ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated',
+                        (key, tokens, now),
+                    )
+                    self.conn.execute('COMMIT')
+                except BaseException:
+                    self.conn.execute('ROLLBACK')
+                    raise
+        except sqlite3.OperationalError as exc:
+            logger.warning("Rate limit store unavailable, admitting request: %s", exc)
+            return 0.0
+        return retry_after
+
+    async def take_async(self, key: str, cost: float, limit: Limit) -> float:
+        return await asyncio.to_thread(self.take, key, cost, limit)
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def create_store() -> BucketStore:
+    """Bucket store selected by RATE_LIMIT_STORE ('memory' or 'sqlite')"""
+    kind = os.environ.get('RATE_LIMIT_STORE', 'memory').lower()
+    if kind == 'memory':
+        return MemoryBucketStore(int(os.environ.get('RATE_LIMIT_MAX_KEYS', '100000')))
+    if kind == 'sqlite':
+        return SQLiteBucketStore(os.environ.get('RATE_LIMIT_SQLITE_PATH', '/tmp/skilio-ratelimit.db'))
+    raise ValueError(f"Unknown RATE_LIMIT_STORE: {kind}")
+
+
+def _compile(template: str) -> Pattern:
+    return re.compile('^' + re.sub(r'\\\{[^}]+\\\}', '[^/]+', re.escape(template)) + '$')
+
+
+class RateLimitMiddleware:
+    """Pure ASGI admission control: priority load shedding, then per-route token buckets.
+
+    Each request is charged its route's cost from the bucket of its route
+    group, keyed by user id for a valid bearer token and by client IP
+    otherwise (auth routes are always keyed by IP). Behind proxies, the
+    client IP is the X-Forwarded-For entry added by the outermost of
+    `trusted_hops` trusted proxies; anything left of it is client-supplied.
+    An empty bucket answers 429 with Retry-After. Independently, once
+    in-flight requests or the DB executor approach capacity, anonymous and
+    then authenticated requests are answered 503 while authenticated
+    progress and enrollment traffic still goes through.
+    """
+
+    def __init__(
+        self,
+        app,
+        store: Optional[BucketStore] = None,
+        rules: Optional[List[Rule]] = None,
+        limits: Optional[Dict[str, Limit]] = None,
+        max_in_flight: Optional[int] = None,
+        trust_forwarded: Optional[bool] = None,
+        trusted_hops: Optional[int] = None,
+    ):
+        self.app = app
+        self.store = store or create_store()
+        self.limits = limits or LIMITS
+        overrides = parse_cost_overrides(os.environ.get('RATE_LIMIT_COSTS', ''))
+        self.rules = [
+            (rule.method, _compile(rule.template), rule.group, overrides.pop((rule.method, rule.template), rule.cost),
+             rule.critical)
+            for rule in (rules if rules is not None else RULES)
+        ]
+        # Overrides for routes without a rule keep the method's default group
+        self.rules += [
+            (method, _compile(template), 'read' if method == 'GET' else 'write', cost, False)
+            for (method, template), cost in overrides.items()
+        ]
+        self.max_in_flight = max_in_flight or int(os.environ.get('RATE_LIMIT_MAX_IN_FLIGHT', '256'))
+        if trust_forwarded is None:
+            trust_forwarded = os.environ.get('RATE_LIMIT_TRUST_FORWARDED', 'false').lower() in ('1', 'true', 'yes')
+        self.trust_forwarded = trust_forwarded
+        self.trusted_hops = trusted_hops or int(os.environ.get('RATE_LIMIT_TRUSTED_HOPS', '1'))
+        self.in_flight = 0
+
+    def classify(self, method: str, path: str) -> Tuple[str, float, bool]:
+        for rule_method, pattern, group, cost, critical in self.rules:
+            if rule_method == method and pattern.match(path):
+                return group, cost, critical
+        return ('read' if method in ('GET', 'HEAD') else 'write'), 1.0, False
+
+    def load(self) -> float:
+        """Fraction of capacity in use: the busier of this worker's requests and the DB executor"""
+        return max(self.in_flight / self.max_in_flight, db_executor.in_flight / db_executor.max_in_flight)
+
+    def client_ip(self, scope) -> str:
+        if self.trust_forwarded:
+            # Each proxy appends the address it saw; only the right-most `trusted_hops` entries are ours
+            forwarded = [
+                entry.strip() for name, value in scope['headers'] if name == b'x-forwarded-for'
+                for entry in value.split(b',') if entry.strip()
+            ]
+            if forwarded:
+                return forwarded[-min(self.trusted_hops, len(forwarded))].decode('latin-1')
+        client = scope.get('client')
+        return client[0] if client else 'unknown'
+
+    @staticmethod
+    def user_id(headers: Dict[bytes, bytes]) -> Optional[str]:
+        authorization = headers.get(b'authorization', b'')
+        scheme, _, token = authorization.partition(b' ')
+        if scheme.lower() != b'bearer' or not token:
+            return None
+        try:
+            return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get('sub')
+        except jwt.PyJWTError:
+            return None
+
+    async def reject(self, scope, receive, send, status_code: int, detail: str, retry_after: float,
+                     group: str, reason: str) -> None:
+        rate_limited_total.inc(group, reason)
+        response = JSONResponse(
+            status_code=status_code,
+            content={"detail": detail},
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        await response(scope, receive, send)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] in EXEMPT_PATHS or scope['method'] == 'OPTIONS':
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope['headers'])
+        group, cost, critical = self.classify(scope['method'], scope['path'])
+        user_id = self.user_id(headers)
+
+        priority = ANONYMOUS if user_id is None else (CRITICAL if critical else AUTHENTICATED)
+        threshold = SHED_THRESHOLDS.get(priority)
+        if threshold is not None and self.load() >= threshold:
+            await self.reject(scope, receive, send, 503, "Service temporarily overloaded, please retry",
+                              1, group, 'shed')
+            return
+
+        identity = f'user:{user_id}' if user_id and group != 'auth' else f'ip:{self.client_ip(scope)}'
+        retry_after = await self.store.take_async(f'{group}:{identity}', cost, self.limits[group])
+        if retry_after > 0:
+            await self.reject(scope, receive, send, 429, "Too many requests, please retry later",
+                              retry_after, group, 'rate')
+            return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
@@ -0,0 +1,300 @@
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from backend.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+class CoEnrollmentMatrix:
+    """Immutable snapshot built from every (user, course) enrollment pair.
+
+    Course × course co-enrollment counts and user → courses are both CSR
+    arrays (row pointers plus sorted column indices), so a row is a slice
+    and a single cell is a binary search. The top `k` neighbours of each
+    course, by cosine similarity shared / sqrt(students_a * students_b), are
+    precomputed into dense (courses × k) arrays; empty slots hold -1.
+    """
+
+    def __init__(self, user_ids: List[str], course_ids: List[str], k: int, max_user_courses: int):
+        self.course_ids = list(dict.fromkeys(course_ids))
+        self.course_index = {course_id: i for i, course_id in enumerate(self.course_ids)}
+        unique_users = list(dict.fromkeys(user_ids))
+        self.user_index = {user_id: i for i, user_id in enumerate(unique_users)}
+        n = len(self.course_ids)
+
+        users = np.fromiter((self.user_index[u] for u in user_ids), dtype=np.int64, count=len(user_ids))
+        courses = np.fromiter((self.course_index[c] for c in course_ids), dtype=np.int64, count=len(course_ids))
+        # Sorted by (user, course) so each user's courses are a sorted slice
+        pairs = np.unique(users * max(n, 1) + courses)
+        users, courses = pairs // max(n, 1), pairs % max(n, 1)
+        self.user_indptr = np.searchsorted(users, np.arange(len(unique_users) + 1)).astype(np.int64)
+        self.user_courses = courses.astype(np.int32)
+        self.students = np.bincount(courses, minlength=n).astype(np.int64)
+
+        # Every ordered pair of distinct courses sharing a student: for each
+        # enrollment, pair it with every enrollment of the same user
+        sizes = np.diff(self.user_indptr)
+        counted = sizes <= max_user_courses
+        per_row = np.repeat(np.where(counted, sizes, 0), sizes)
+        left = np.repeat(courses, per_row)
+        starts = np.repeat(self.user_indptr[:-1], sizes)
+        offsets = np.arange(per_row.sum()) - np.repeat(np.cumsum(per_row) - per_row, per_row)
+        right = courses[np.repeat(starts, per_row) + offsets]
+        distinct = left != right
+        keys, counts = np.unique(left[distinct] * max(n, 1) + right[distinct], return_counts=True)
+        rows, cols = keys // max(n, 1), keys % max(n, 1)
+        self.indptr = np.searchsorted(rows, np.arange(n + 1)).astype(np.int64)
+        self.indices = cols.astype(np.int32)
+        self.counts = counts.astype(np.int32)
+
+        self.neighbours = np.full((n, k), -1, dtype=np.int32)
+        self.scores = np.zeros((n, k), dtype=np.float32)
+        if len(keys):
+            scores = counts / np.sqrt(self.students[rows] * self.students[cols])
+            order = np.lexsort((-scores, rows))
+            rank = np.arange(len(order)) - self.indptr[rows[order]]
+            keep = rank < k
+            self.neighbours[rows[order][keep], rank[keep]] = cols[order][keep]
+            self.scores[rows[order][keep], rank[keep]] = scores[order][keep]
+
+    @property
+    def pairs(self) -> int:
+        return len(self.indices)
+
+    def shared(self, a: int, b: int) -> int:
+        """Students enrolled in both courses"""
+        if a >= len(self.indptr) - 1:
+            return 0
+        start, end = self.indptr[a], self.indptr[a + 1]
+        i = start + np.searchsorted(self.indices[start:end], b)
+        return int(self.counts[i]) if i < end and self.indices[i] == b else 0
+
+    def row(self, a: int) -> Tuple[np.ndarray, np.ndarray]:
+        if a >= len(self.indptr) - 1:
+            return self.indices[:0], self.counts[:0]
+        start, end = self.indptr[a], self.indptr[a + 1]
+        return self.indices[start:end], self.counts[start:end]
+
+    def user_course_list(self, user_id: str) -> np.ndarray:
+        user = self.user_index.get(user_id)
+        if user is None:
+            return self.user_courses[:0]
+        return self.user_courses[self.user_indptr[user]:self.user_indptr[user + 1]]
+
+
+class RelatedCourses:
+    """"Students who took this also took…", served from memory.
+
+    A full `CoEnrollmentMatrix` is rebuilt from the enrollments table every
+    `rebuild_interval` seconds on a worker thread. Enrollments made through
+    this process update it in between: shared counts go into a small delta
+    on top of the snapshot, the new course's neighbour row is recomputed and
+    it is offered to each co-enrolled course's top `k`. Scores of other
+    pairs are not rescaled for the new student until the next rebuild.
+    Students with more than `max_user_courses` enrollments are counted as
+    students but not as co-enrollments, as they relate everything to
+    everything. Lookups are a row slice and never touch the database.
+    """
+
+    def __init__(self, k: Optional[int] = None, rebuild_interval: Optional[float] = None,
+                 max_user_courses: Optional[int] = None, page_size: int = 10000):
+        self.k = k or int(os.environ.get('RECOMMENDATIONS_TOP_K', '20'))
+        self.rebuild_interval = rebuild_interval or float(os.environ.get('RECOMMENDATIONS_REBUILD_INTERVAL', '3600'))
+        self.max_user_courses = max_user_courses or int(os.environ.get('RECOMMENDATIONS_MAX_USER_COURSES', '200'))
+        self.page_size = page_size
+        self._matrix = CoEnrollmentMatrix([], [], self.k, self.max_user_courses)
+        self._reset_overlay()
+        # Enrollments recorded while a rebuild is reading the table, replayed onto the new snapshot
+        self._replay: Optional[List[Tuple[str, str]]] = None
+        self._task: Optional[asyncio.Task] = None
+        self.built_at: Optional[str] = None
+        self.build_seconds = 0.0
+        self.builds = 0
+        self.updates = 0
+        self.lookups = 0
+
+    def _reset_overlay(self) -> None:
+        matrix = self._matrix
+        self._course_ids = list(matrix.course_ids)
+        self._course_index = dict(matrix.course_index)
+        self._students = matrix.students.copy()
+        self._neighbours = matrix.neighbours.copy()
+        self._scores = matrix.scores.copy()
+        self._delta: Dict[int, Dict[int, int]] = {}
+        self._user_delta: Dict[str, List[int]] = {}
+        self._removed: Set[int] = set()
+
+    def _course(self, course_id: str) -> int:
+        index = self._course_index.get(course_id)
+        if index is None:
+            index = self._course_index[course_id] = len(self._course_ids)
+            self._course_ids.append(course_id)
+            if index >= len(self._students):
+                grow = max(len(self._students), 64)
+                self._students = np.concatenate([self._students, np.zeros(grow, dtype=np.int64)])
+                self._neighbours = np.concatenate([self._neighbours, np.full((grow, self.k), -1, dtype=np.int32)])
+                self._scores = np.concatenate([self._scores, np.zeros((grow, self.k), dtype=np.float32)])
+        return index
+
+    def _shared(self, a: int, b: int) -> int:
+        return self._matrix.shared(a, b) + self._delta.get(a, {}).get(b, 0)
+
+    def _score(self, a: int, b: int, shared: int) -> float:
+        return shared / float(np.sqrt(self._students[a] * self._students[b])) if shared else 0.0
+
+    def _rank_row(self, a: int) -> None:
+        """Recompute a course's top k from its snapshot row plus delta"""
+        indices, counts = self._matrix.row(a)
+        delta = self._delta.get(a)
+        if delta:
+            extra = np.fromiter(delta.keys(), dtype=np.int32, count=len(delta))
+            extra_counts = np.fromiter(delta.values(), dtype=np.int32, count=len(delta))
+            indices = np.concatenate([indices, extra])
+            counts = np.concatenate([counts, extra_counts])
+            indices, inverse = np.unique(indices, return_inverse=True)
+            counts = np.bincount(inverse, weights=counts).astype(np.int32)
+        self._neighbours[a] = -1
+        self._scores[a] = 0.0
+        if not len(indices):
+            return
+        scores = counts / np.sqrt(self._students[a] * self._students[indices])
+        top = np.argsort(-scores, kind='stable')[:self.k]
+        self._neighbours[a, :len(top)] = indices[top]
+        self._scores[a, :len(top)] = scores[top]
+
+    def _offer(self, a: int, b: int) -> None:
+        """Put b into a's top k if its current score earns a place"""
+        score = self._score(a, b, self._shared(a, b))
+        neighbours, scores = self._neighbours[a], self._scores[a]
+        present = np.flatnonzero(neighbours == b)
+        if len(present):
+            slot = present[0]
+        elif neighbours[-1] == -1 or score > scores[-1]:
+            slot = self.k - 1
+        else:
+            return
+        neighbours[slot], scores[slot] = b, score
+        order = np.argsort(-np.where(neighbours >= 0, scores, -1.0), kind='stable')
+        neighbours[:] = neighbours[order]
+        scores[:] = scores[order]
+
+    def _apply(self, user_id: str, course_id: str) -> None:
+        course = self._course(course_id)
+        others = self._matrix.user_course_list(user_id).tolist() + self._user_delta.get(user_id, [])
+        if course in others:
+            return
+        self._user_delta.setdefault(user_id, []).append(course)
+        self._students[course] += 1
+        if len(others) + 1 > self.max_user_courses:
+            return
+        for other in others:
+            self._delta.setdefault(course, {})[other] = self._delta.get(course, {}).get(other, 0) + 1
+            self._delta.setdefault(other, {})[course] = self._delta.get(other, {}).get(course, 0) + 1
+            self._offer(other, course)
+        self._rank_row(course)
+
+    def record(self, user_id: str, course_id: str) -> None:
+        """Count a new enrollment"""
+        self.updates += 1
+        if self._replay is not None:
+            self._replay.append((user_id, course_id))
+        self._apply(user_id, course_id)
+
+    def drop(self, course_id: str) -> None:
+        """Stop recommending a deleted course"""
+        index = self._course_index.get(course_id)
+        if index is not None:
+            self._removed.add(index)
+
+    def related(self, course_id: str, limit: int = 10) -> List[dict]:
+        """Most similar courses by co-enrollment, best first"""
+        self.lookups += 1
+        index = self._course_index.get(course_id)
+        if index is None or index in self._removed:
+            return []
+        related = []
+        for neighbour, score in zip(self._neighbours[index].tolist(), self._scores[index].tolist()):
+            if neighbour < 0 or len(related) >= limit:
+                break
+            if neighbour in self._removed:
+                continue
+            related.append({
+                'course_id': self._course_ids[neighbour],
+                'score': round(score, 4),
+                'shared_students': self._shared(index, neighbour),
+            })
+        return related
+
+    async def rebuild(self, database) -> None:
+        """Rebuild the snapshot from every enrollment"""
+        started = time.perf_counter()
+        self._replay = []
+        try:
+            user_ids, course_ids = await database.get_enrollment_pairs(page_size=self.page_size)
+            matrix = await asyncio.to_thread(CoEnrollmentMatrix, user_ids, course_ids, self.k, self.max_user_courses)
+        except BaseException:
+            self._replay = None
+            raise
+        replay, self._replay = self._replay, None
+        removed = [self._course_ids[index] for index in self._removed]
+        self._matrix = matrix
+        self._reset_overlay()
+        for user_id, course_id in replay:
+            self._apply(user_id, course_id)
+        for course_id in removed:
+            self.drop(course_id)
+        self.builds += 1
+        self.build_seconds = time.perf_counter() - started
+        self.built_at = datetime.utcnow().isoformat()
+        logger.info("Rebuilt course recommendations: %d courses, %d pairs in %.2fs",
+                    len(matrix.course_ids), matrix.pairs, self.build_seconds)
+
+    async def _run(self, database) -> None:
+        while True:
+            try:
+                await self.rebuild(database)
+            except Exception:
+                logger.exception("Course recommendation rebuild failed")
+            await asyncio.sleep(self.rebuild_interval)
+
+    def start(self, database) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(database))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            'courses': len(self._course_ids),
+            'users': len(self._matrix.user_index),
+            'pairs': self._matrix.pairs,
+            'delta_courses': len(self._delta),
+            'top_k': self.k,
+            'built_at': self.built_at,
+            'build_seconds': round(self.build_seconds, 4),
+            'builds_total': self.builds,
+            'updates_total': self.updates,
+            'lookups_total': self.lookups,
+        }
+
+
+# Global co-enrollment recommendations
+related_courses = RelatedCourses()
+
+registry.gauge('recommendation_pairs', 'Co-enrolled course pairs in the last recommendation snapshot',
+               callback=lambda: related_courses._matrix.pairs)
+registry.counter('recommendation_rebuilds_total', 'Full recommendation rebuilds', callback=lambda: related_courses.builds)
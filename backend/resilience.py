@@ -0,0 +1,285 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import httpx
+from postgrest.exceptions import APIError
+
+from backend.executor import ExecutorSaturated, db_executor
+from backend.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Postgres error classes worth another attempt: connection (08), resources (53),
+# operator intervention incl. statement timeout (57), serialization failure/deadlock (40)
+TRANSIENT_SQLSTATE_CLASSES = ('08', '40', '53', '57')
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+BREAKER_STATES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+db_retries_total = registry.counter('db_retries_total', 'Database reads retried after a transient failure', ('table',))
+db_hedges_total = registry.counter(
+    'db_hedges_total', 'Hedged duplicate reads, by whether the hedge answered first', ('method', 'outcome'))
+db_deadlines_total = registry.counter('db_deadlines_exceeded_total', 'Database calls abandoned at their deadline',
+                                      ('table',))
+
+
+class Unavailable(Exception):
+    """The database could not answer in time or at all; surfaced as 503"""
+
+    retry_after = 1.0
+
+
+class DeadlineExceeded(Unavailable):
+    pass
+
+
+class CircuitOpen(Unavailable):
+    def __init__(self, table: str, retry_after: float):
+        super().__init__(f"Circuit for {table} is open; retry in {retry_after:.1f}s")
+        self.table = table
+        self.retry_after = retry_after
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Failures that say the database is slow or unreachable, as opposed to a bad request"""
+    if isinstance(exc, (DeadlineExceeded, httpx.TransportError)):
+        return True
+    if isinstance(exc, APIError):
+        return bool(exc.code) and exc.code[:2] in TRANSIENT_SQLSTATE_CLASSES
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return False
+
+
+class CircuitBreaker:
+    """Per-table breaker: opens after `failure_threshold` consecutive transient failures.
+
+    While open every call fails fast with CircuitOpen. After `reset_timeout`
+    seconds one probe is let through (half-open); its success closes the
+    breaker and its failure opens it again. A probe that reports nothing
+    within another `reset_timeout` is presumed lost and replaced.
+    """
+
+    def __init__(self, table: str, failure_threshold: int, reset_timeout: float):
+        self.table = table
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self.opened = 0
+        self.rejected = 0
+
+    def before_call(self) -> None:
+        if self.state == CLOSED:
+            return
+        now = time.monotonic()
+        remaining = self.opened_at + self.reset_timeout - now
+        if self.state == OPEN and remaining <= 0:
+            self.state = HALF_OPEN
+            self._probing = False
+        if self.state == HALF_OPEN and (not self._probing or now - self._probe_started >= self.reset_timeout):
+            self._probing = True
+            self._probe_started = now
+            return
+        self.rejected += 1
+        raise CircuitOpen(self.table, max(remaining, 1.0))
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._probing = False
+        if self.state != CLOSED:
+            logger.info("Circuit for %s closed", self.table)
+            self.state = CLOSED
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning("Circuit for %s opened after %d failures", self.table, self.failures)
+                self.opened += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """A call let through half-open ended without telling anything about the database"""
+        self._probing = False
+
+
+class LatencyTracker:
+    """Recent latencies of one method; the hedge delay is their p95"""
+
+    def __init__(self, window: int = 256):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._p95: Optional[float] = None
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        # Recomputed every 16 samples rather than on every call
+        if len(self._samples) % 16 == 0:
+            ordered = sorted(self._samples)
+            self._p95 = ordered[int(len(ordered) * 0.95)]
+
+    @property
+    def p95(self) -> Optional[float]:
+        return self._p95
+
+
+class Resilience:
+    """Deadlines, retries, hedging and circuit breaking for blocking storage calls.
+
+    Every call gets a deadline (`read_deadline` / `write_deadline` seconds);
+    the caller is released when it passes, while the worker thread finishes
+    on its own under the HTTP client's timeout. Idempotent reads are retried
+    up to `retries` times on transient failures with full-jitter exponential
+    backoff. Reads marked for hedging send a duplicate request once the first
+    has been pending longer than that method's recent p95 (`hedge_delay`
+    until enough samples exist) and take whichever answers first; hedges are
+    capped at `hedge_ratio` of hedged reads and skipped while the executor is
+    queueing, so they cannot amplify an overload.
+    """
+
+    def __init__(
+        self,
+        read_deadline: Optional[float] = None,
+        write_deadline: Optional[float] = None,
+        retries: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_cap: Optional[float] = None,
+        hedge_delay: Optional[float] = None,
+        hedge_ratio: Optional[float] = None,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: Optional[float] = None,
+    ):
+        self.read_deadline = read_deadline or float(os.environ.get('DB_READ_DEADLINE', '2.0'))
+        self.write_deadline = write_deadline or float(os.environ.get('DB_WRITE_DEADLINE', '5.0'))
+        self.retries = retries if retries is not None else int(os.environ.get('DB_READ_RETRIES', '2'))
+        self.backoff_base = backoff_base or float(os.environ.get('DB_RETRY_BACKOFF', '0.05'))
+        self.backoff_cap = backoff_cap or float(os.environ.get('DB_RETRY_BACKOFF_CAP', '1.0'))
+        self.hedge_delay = hedge_delay or float(os.environ.get('DB_HEDGE_DELAY', '0.05'))
+        self.hedge_ratio = hedge_ratio if hedge_ratio is not None else float(os.environ.get('DB_HEDGE_RATIO', '0.1'))
+        self.failure_threshold = failure_threshold or int(os.environ.get('DB_BREAKER_FAILURES', '5'))
+        self.reset_timeout = reset_timeout or float(os.environ.get('DB_BREAKER_RESET', '10'))
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._latency: Dict[str, LatencyTracker] = {}
+        self.hedged_reads = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def breaker(self, table: str) -> CircuitBreaker:
+        breaker = self.breakers.get(table)
+        if breaker is None:
+            breaker = self.breakers[table] = CircuitBreaker(table, self.failure_threshold, self.reset_timeout)
+        return breaker
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def _hedge_allowed(self) -> bool:
+        return db_executor.waiting == 0 and self.hedges < self.hedge_ratio * self.hedged_reads
+
+    async def _hedged(self, method: str, attempt: Callable[[], Awaitable[T]]) -> T:
+        self.hedged_reads += 1
+        tracker = self._latency.get(method)
+        if tracker is None:
+            tracker = self._latency[method] = LatencyTracker()
+        started = time.perf_counter()
+        first = asyncio.ensure_future(attempt())
+        pending = {first}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=tracker.p95 or self.hedge_delay)
+            if not done and self._hedge_allowed():
+                self.hedges += 1
+                pending.add(asyncio.ensure_future(attempt()))
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        tracker.observe(time.perf_counter() - started)
+                        if len(done) + len(pending) > 1 or future is not first:
+                            won = future is not first
+                            self.hedge_wins += won
+                            db_hedges_total.inc(method, 'won' if won else 'lost')
+                        return future.result()
+                    error = future.exception()
+            raise error
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def call(self, table: str, method: str, attempt: Callable[[], Awaitable[T]],
+                   read: bool = False, hedge: bool = False) -> T:
+        """Run `attempt` (one storage round trip) under the table's breaker, a deadline and, for reads, retries.
+
+        Transient failures that survive the retries surface as Unavailable.
+        """
+        breaker = self.breaker(table)
+        deadline = self.read_deadline if read else self.write_deadline
+        tries = self.retries + 1 if read else 1
+        for attempt_number in range(tries):
+            breaker.before_call()
+            try:
+                once = self._hedged(method, attempt) if hedge else attempt()
+                try:
+                    result = await asyncio.wait_for(once, deadline)
+                except asyncio.TimeoutError:
+                    db_deadlines_total.inc(table)
+                    raise DeadlineExceeded(f"{method} on {table} exceeded its {deadline}s deadline")
+            except ExecutorSaturated:
+                # Local overload, not a database failure
+                breaker.release()
+                raise
+            except Exception as exc:
+                if not is_transient(exc):
+                    # The database answered, just not with rows
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                if attempt_number + 1 >= tries or breaker.state == OPEN:
+                    if isinstance(exc, Unavailable):
+                        raise
+                    raise Unavailable(f"{method} on {table} failed: {exc}") from exc
+                db_retries_total.inc(table)
+                await asyncio.sleep(self.backoff(attempt_number))
+                continue
+            except BaseException:
+                # Cancelled (e.g. the request went away): free the half-open probe for the next caller
+                breaker.release()
+                raise
+            breaker.record_success()
+            return result
+
+    def stats(self) -> dict:
+        return {
+            'breakers': {
+                table: {'state': breaker.state, 'failures': breaker.failures,
+                        'opened_total': breaker.opened, 'rejected_total': breaker.rejected}
+                for table, breaker in self.breakers.items()
+            },
+            'hedged_reads_total': self.hedged_reads,
+            'hedges_total': self.hedges,
+            'hedge_wins_total': self.hedge_wins,
+            'hedge_delays': {method: tracker.p95 for method, tracker in self._latency.items()},
+        }
+
+
+# Global resilience policy used by the Supabase bridge
+resilience = Resilience()
+
+registry.gauge('db_circuit_state', 'Circuit breaker state per table (0 closed, 1 half-open, 2 open)', ('table',),
+               callback=lambda: {(table,): BREAKER_STATES[b.state] for table, b in resilience.breakers.items()})
+registry.counter('db_circuit_opened_total', 'Times a table circuit breaker opened', ('table',),
+                 callback=lambda: {(table,): b.opened for table, b in resilience.breakers.items()})
+registry.counter('db_circuit_rejected_total', 'Calls failed fast by an open circuit breaker', ('table',),
+                 callback=lambda: {(table,): b.rejected for table, b in resilience.breakers.items()})
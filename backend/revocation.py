@@ -0,0 +1,178 @@
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+from backend.bloom import BloomFilter
+from backend.database import Database, db
+from backend.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Re-read revocations this far back on every sync, for commits racing the previous sync and clock skew
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+def _epoch(value) -> float:
+    """ISO timestamp (naive UTC or with an offset) or datetime to epoch seconds"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class RevocationList:
+    """Revoked access tokens, checked in memory on every authenticated request.
+
+    Two kinds of entries: a single token by `jti` (logout), and a user whose
+    tokens issued before a point in time are void (role change, logout
+    everywhere). A Bloom filter over both answers the common "not revoked"
+    case without touching the exact maps; a hit is confirmed against them,
+    so false positives never reject a valid token.
+
+    Entries only need to outlive the access tokens they cover, so the set
+    stays small. Revocations are written to `token_revocations` and every
+    worker pulls new ones every `sync_interval` seconds; a revocation made
+    by another worker takes effect here within that interval. Expired
+    revocations and refresh tokens are purged every `purge_interval`.
+    """
+
+    def __init__(self, database: Database, sync_interval: Optional[float] = None, capacity: Optional[int] = None):
+        self.db = database
+        self.sync_interval = sync_interval or float(os.environ.get('REVOCATION_SYNC_INTERVAL', '10'))
+        # Expired refresh tokens and revocations are deleted from the database this often
+        self.purge_interval = float(os.environ.get('REVOCATION_PURGE_INTERVAL', '3600'))
+        self._last_purge = time.monotonic()
+        self.capacity = capacity or int(os.environ.get('REVOCATION_FILTER_CAPACITY', '100000'))
+        # jti -> expiry; user id -> (tokens issued before this are void, expiry), as epoch seconds
+        self._tokens: Dict[str, float] = {}
+        self._users: Dict[str, Tuple[float, float]] = {}
+        self._bloom = BloomFilter(self.capacity)
+        self._synced_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self.checks = 0
+        self.filter_hits = 0
+        self.false_positives = 0
+        self.rejected = 0
+
+    def is_revoked(self, jti: Optional[str], user_id: str, issued_at: float) -> bool:
+        self.checks += 1
+        if jti is not None and f'jti:{jti}' in self._bloom:
+            self.filter_hits += 1
+            if jti in self._tokens:
+                self.rejected += 1
+                return True
+            self.false_positives += 1
+        if f'user:{user_id}' in self._bloom:
+            self.filter_hits += 1
+            entry = self._users.get(user_id)
+            if entry is None:
+                self.false_positives += 1
+            elif issued_at < entry[0]:
+                self.rejected += 1
+                return True
+        return False
+
+    def _apply(self, row: dict) -> None:
+        # Each sync re-reads the overlap window: rows already held are not added to the filter again,
+        # since every add counts towards `full` and would force needless rebuilds
+        expires_at = _epoch(row['expires_at'])
+        if row.get('jti'):
+            if row['jti'] not in self._tokens:
+                self._bloom.add(f"jti:{row['jti']}")
+            self._tokens[row['jti']] = expires_at
+        else:
+            revoked_before = _epoch(row['revoked_at'])
+            previous = self._users.get(row['user_id'])
+            if previous is not None:
+                revoked_before = max(revoked_before, previous[0])
+                expires_at = max(expires_at, previous[1])
+            else:
+                self._bloom.add(f"user:{row['user_id']}")
+            self._users[row['user_id']] = (revoked_before, expires_at)
+
+    async def revoke_token(self, jti: str, user_id: str, expires_at: datetime) -> None:
+        """Void one access token until it expires"""
+        row = await self.db.create_token_revocation({'jti': jti, 'user_id': user_id, 'expires_at': expires_at})
+        self._apply(row)
+
+    async def revoke_user(self, user_id: str, expires_at: datetime) -> None:
+        """Void every access token the user was issued so far; `expires_at` is when the last of them expires"""
+        row = await self.db.create_token_revocation({'jti': None, 'user_id': user_id, 'expires_at': expires_at})
+        self._apply(row)
+
+    async def sync(self) -> int:
+        """Pull revocations made since the last sync (all live ones the first time)"""
+        started = datetime.utcnow()
+        since = self._synced_at - SYNC_OVERLAP if self._synced_at is not None else None
+        rows = await self.db.get_token_revocations(revoked_since=since, live_at=started)
+        for row in rows:
+            self._apply(row)
+        self._synced_at = started
+        return len(rows)
+
+    def prune(self) -> int:
+        """Drop expired entries; the filter is rebuilt when anything was dropped or it overflowed"""
+        now = time.time()
+        expired_tokens = [jti for jti, expires_at in self._tokens.items() if expires_at <= now]
+        expired_users = [user_id for user_id, (_, expires_at) in self._users.items() if expires_at <= now]
+        for jti in expired_tokens:
+            del self._tokens[jti]
+        for user_id in expired_users:
+            del self._users[user_id]
+        dropped = len(expired_tokens) + len(expired_users)
+        if dropped or self._bloom.full:
+            keys = [f'jti:{jti}' for jti in self._tokens] + [f'user:{user_id}' for user_id in self._users]
+            self._bloom = BloomFilter.from_items(keys, max(self.capacity, 2 * len(keys)))
+        return dropped
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception:
+                logger.exception("Token revocation sync failed")
+            self.prune()
+            if time.monotonic() - self._last_purge >= self.purge_interval:
+                self._last_purge = time.monotonic()
+                try:
+                    await self.db.purge_expired_tokens()
+                except Exception:
+                    logger.exception("Expired token purge failed")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            'tokens': len(self._tokens),
+            'users': len(self._users),
+            'filter': self._bloom.stats(),
+            'checks_total': self.checks,
+            'filter_hits_total': self.filter_hits,
+            'false_positives_total': self.false_positives,
+            'rejected_total': self.rejected,
+        }
+
+
+# Global revocation list
+revocations = RevocationList(db)
+
+registry.gauge('token_revocations', 'Revoked tokens and users held in memory',
+               callback=lambda: len(revocations._tokens) + len(revocations._users))
+registry.counter('token_revocation_rejections_total', 'Requests rejected with a revoked token',
+                 callback=lambda: revocations.rejected)
@@ -0,0 +1,299 @@
+import os
+import re
+import math
+import time
+import bisect
+import asyncio
+import logging
+import unicodedata
+from collections import defaultdict, Counter
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Relative weight of a term by the course field it appears in
+FIELD_WEIGHTS = {'title': 3.0, 'category': 2.0, 'description': 1.0}
+
+# Match quality by how a query token matched an indexed term
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.7
+SUBSTRING_MATCH = 0.5
+MIN_TRIGRAM_SIMILARITY = 0.4
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip accents so 'Vídeos' matches 'videos'"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def trigrams(term: str) -> Set[str]:
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+
+class CourseSearchIndex:
+    """In-memory inverted index over course title, description and category.
+
+    Query tokens match indexed terms exactly, by prefix, or by substring /
+    trigram similarity (via a trigram index over the vocabulary). Every token
+    must match for a course to be returned; results are ranked by a weighted
+    tf-idf score and ordered deterministically so offset pagination is stable.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self.doc_terms: Dict[str, Dict[str, float]] = {}
+        self.doc_category: Dict[str, str] = {}
+        self.vocabulary: List[str] = []
+        self.trigram_terms: Dict[str, Set[str]] = defaultdict(set)
+        self.built = False
+        self._building = False
+        self._pending: List[Tuple[str, object]] = []
+
+    def __len__(self) -> int:
+        return len(self.doc_terms)
+
+    # Maintenance
+    def _add_term(self, term: str) -> None:
+        bisect.insort(self.vocabulary, term)
+        for gram in trigrams(term):
+            self.trigram_terms[gram].add(term)
+
+    def _drop_term(self, term: str) -> None:
+        del self.postings[term]
+        index = bisect.bisect_left(self.vocabulary, term)
+        if index < len(self.vocabulary) and self.vocabulary[index] == term:
+            del self.vocabulary[index]
+        for gram in trigrams(term):
+            terms = self.trigram_terms.get(gram)
+            if terms is not None:
+                terms.discard(term)
+                if not terms:
+                    del self.trigram_terms[gram]
+
+    def _index(self, course: dict) -> None:
+        course_id = str(course['id'])
+        self._remove(course_id)
+
+        weights: Dict[str, float] = {}
+        for field, field_weight in FIELD_WEIGHTS.items():
+            for term, count in Counter(tokenize(course.get(field) or '')).items():
+                weights[term] = weights.get(term, 0.0) + field_weight * (1.0 + math.log(count))
+
+        for term, weight in weights.items():
+            if term not in self.postings:
+                self._add_term(term)
+            self.postings[term][course_id] = weight
+        self.doc_terms[course_id] = weights
+        self.doc_category[course_id] = course.get('category')
+
+    def _remove(self, course_id: str) -> None:
+        weights = self.doc_terms.pop(course_id, None)
+        self.doc_category.pop(course_id, None)
+        if not weights:
+            return
+        for term in weights:
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(course_id, None)
+            if not posting:
+                self._drop_term(term)
+
+    def add(self, course: dict) -> None:
+        """Index a created or updated course (replaces any previous version)"""
+        if self._building:
+            self._pending.append(('add', course))
+        self._index(course)
+
+    def remove(self, course_id: str) -> None:
+        if self._building:
+            self._pending.append(('remove', course_id))
+        self._remove(str(course_id))
+
+    def begin_build(self) -> None:
+        """Start a full rebuild; writes that happen meanwhile are replayed afterwards"""
+        self._building = True
+        self._pending = []
+
+    def finish_build(self, courses: List[dict]) -> None:
+        self.postings.clear()
+        self.doc_terms.clear()
+        self.doc_category.clear()
+        self.vocabulary = []
+        self.trigram_terms.clear()
+        for course in courses:
+            self._index(course)
+        for op, arg in self._pending:
+            if op == 'add':
+                self._index(arg)
+            else:
+                self._remove(str(arg))
+        self._pending = []
+        self._building = False
+        self.built = True
+
+    def abort_build(self) -> None:
+        self._building = False
+        self._pending = []
+
+    # Querying
+    def _matching_terms(self, token: str) -> Dict[str, float]:
+        matches: Dict[str, float] = {}
+
+        if len(token) >= 2:
+            start = bisect.bisect_left(self.vocabulary, token)
+            for term in self.vocabulary[start:]:
+                if not term.startswith(token):
+                    break
+                matches[term] = PREFIX_MATCH
+
+        if len(token) >= 3:
+            token_grams = trigrams(token)
+            candidates: Counter = Counter()
+            for gram in token_grams:
+                candidates.update(self.trigram_terms.get(gram, ()))
+            for term, shared in candidates.items():
+                if term in matches:
+                    continue
+                if token in term:
+                    matches[term] = SUBSTRING_MATCH
+                    continue
+                similarity = shared / len(token_grams | trigrams(term))
+                if similarity >= MIN_TRIGRAM_SIMILARITY:
+                    matches[term] = SUBSTRING_MATCH * similarity
+
+        if token in self.postings:
+            matches[token] = EXACT_MATCH
+        return matches
+
+    def search(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> Tuple[int, List[str]]:
+        """Return (total matches, ranked course ids for the requested page)"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return 0, []
+
+        total_docs = max(len(self.doc_terms), 1)
+        scores: Optional[Dict[str, float]] = None
+        for token in tokens:
+            token_scores: Dict[str, float] = {}
+            for term, quality in self._matching_terms(token).items():
+                posting = self.postings[term]
+                idf = math.log(1.0 + total_docs / len(posting))
+                for course_id, weight in posting.items():
+                    score = quality * idf * weight
+                    if score > token_scores.get(course_id, 0.0):
+                        token_scores[course_id] = score
+
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {cid: s + token_scores[cid] for cid, s in scores.items() if cid in token_scores}
+            if not scores:
+                return 0, []
+
+        if category:
+            scores = {cid: s for cid, s in scores.items() if self.doc_category.get(cid) == category}
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return len(ranked), [course_id for course_id, _ in ranked[offset:offset + limit]]
+
+
+class SearchIndexRefresher:
+    """Keeps a worker's course index in step with course writes made by other workers.
+
+    Writes through this process update the index directly. Every
+    `sync_interval` seconds, courses created or updated since the previous
+    pass (less an overlap for clock skew and racing commits) are re-indexed,
+    so edits on another worker show up here within that interval. Deletions
+    leave no row to find: search results already skip ids whose course is
+    gone, and the index is rebuilt from scratch every `rebuild_interval`
+    seconds to drop them.
+    """
+
+    # Re-read courses changed this far back on every pass
+    overlap = timedelta(seconds=30)
+
+    def __init__(self, index: CourseSearchIndex, sync_interval: Optional[float] = None,
+                 rebuild_interval: Optional[float] = None):
+        self.index = index
+        self.sync_interval = sync_interval or float(os.environ.get('SEARCH_INDEX_SYNC_INTERVAL', '30'))
+        self.rebuild_interval = rebuild_interval or float(os.environ.get('SEARCH_INDEX_REBUILD_INTERVAL', '3600'))
+        self._database = None
+        self._synced_to: Optional[datetime] = None
+        self._rebuilt_at = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self.refreshed = 0
+        self.rebuilds = 0
+
+    async def refresh(self) -> int:
+        """Re-index courses changed since the last pass, or rebuild when one is due; returns courses indexed"""
+        if not self.index.built:
+            # Built on warm start or the first search; nothing to keep current yet
+            return 0
+        started = datetime.utcnow()
+        if time.monotonic() - self._rebuilt_at >= self.rebuild_interval:
+            self._rebuilt_at = time.monotonic()
+            await self._database.build_search_index(rebuild=True)
+            self._synced_to = started
+            self.rebuilds += 1
+            return len(self.index)
+
+        courses = await self._database.get_courses_changed_since(self._synced_to - self.overlap)
+        for course in courses:
+            self.index.add(course)
+        self._synced_to = started
+        self.refreshed += len(courses)
+        return len(courses)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Search index refresh failed")
+
+    def start(self, database) -> None:
+        if self._task is None:
+            self._database = database
+            # Warm start built the index just before this, so the first pass covers that gap
+            self._synced_to = datetime.utcnow()
+            self._rebuilt_at = time.monotonic()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            'built': self.index.built,
+            'courses': len(self.index),
+            'synced_to': self._synced_to.isoformat() if self._synced_to else None,
+            'refreshed_total': self.refreshed,
+            'rebuilds_total': self.rebuilds,
+        }
+
+
+# Global course search index, maintained by Database course writes
+course_index = CourseSearchIndex()
+search_refresher = SearchIndexRefresher(course_index)
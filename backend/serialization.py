@@ -0,0 +1,51 @@
+import os
+from functools import lru_cache
+from typing import Any, Mapping, Optional, Type
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+
+@lru_cache(maxsize=None)
+def adapter_for(tp: Any) -> TypeAdapter:
+    """Validator/serializer for a model or container type, compiled once per type"""
+    return TypeAdapter(tp)
+
+
+def render(tp: Any, data: Any) -> bytes:
+    """Validate raw DB rows against `tp` once and serialize them straight to JSON bytes"""
+    adapter = adapter_for(tp)
+    return adapter.dump_json(adapter.validate_python(data))
+
+
+def rows_response(
+    tp: Any,
+    data: Any,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """Pre-rendered JSON response; FastAPI skips response_model re-validation for Response objects"""
+    return Response(content=render(tp, data), status_code=status_code, headers=headers, media_type='application/json')
+
+
+if orjson is not None:
+    class FastJSONResponse(JSONResponse):
+        """JSONResponse encoded with orjson"""
+
+        def render(self, content: Any) -> bytes:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+else:
+    FastJSONResponse = JSONResponse
+
+
+def default_response_class() -> Type[Response]:
+    """App-wide response class: orjson when FAST_JSON_RESPONSES is on and orjson is installed"""
+    if os.environ.get('FAST_JSON_RESPONSES', 'false').lower() in ('1', 'true', 'yes'):
+        return FastJSONResponse
+    return JSONResponse
@@ -1,38 +1,105 @@
-from fastapi import FastAPI, APIRouter, HTTPException, status, Depends
+from pathlib import Path
+
+# Load environment variables before any backend module reads its configuration
+ROOT_DIR = Path(__file__).parent
+if (ROOT_DIR / '.env').exists():
+    from dotenv import load_dotenv
+    load_dotenv(ROOT_DIR / '.env')
+
+# Imported first so the cold-start clock also covers the imports below
+from backend.lifecycle import readiness, warm_start
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, APIRouter, HTTPException, Request, status, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Optional, Union
 import os
+import math
+import asyncio
 import logging
-from pathlib import Path
 
 # Import our models and dependencies
 from backend.models import (
-    User, UserCreate, UserUpdate, UserLogin, Token,
-    Course, CourseCreate, CourseUpdate,
+    User, UserBatch, UserCreate, UserUpdate, UserLogin, UserRoleUpdate, Token, TokenClaims, RefreshRequest, LogoutRequest,
+    Course, CourseCreate, CourseUpdate, CoursePage, CourseBatch, CourseRating, CourseRatingCreate, RelatedCourse,
     Enrollment, EnrollmentCreate,
-    Certificate, CertificateCreate,
-    StatusCheck, StatusCheckCreate
+    Certificate, CertificateCreate, CertificatePage, CertificateVerification,
+    StatusCheck, StatusCheckCreate, StatusCheckRollup, DEFAULT_AVATAR
 )
 from backend.auth import (
-    authenticate_user, create_access_token, get_current_user,
-    get_current_admin_user, get_current_instructor_user,
-    get_password_hash, ACCESS_TOKEN_EXPIRE_MINUTES
+    authenticate_user, issue_tokens, refresh_session, revoke_tokens, revoke_sessions, revoke_access_tokens,
+    get_current_user, get_current_claims, load_user, load_users, get_current_admin_user, get_current_instructor_user,
+    hash_password, security
 )
 from backend.database import db
+from backend.loaders import RequestLoaders, get_loaders
+from backend.executor import db_executor, ExecutorSaturated
+from backend.resilience import Unavailable, resilience
+from backend.cache import user_cache, user_cache_sync
+from backend.catalog import catalog_cache, conditional_response
+from backend.pagination import Cursor, decode_cursor, next_cursor
+from backend.passwords import password_hasher
+from backend.progress_buffer import progress_buffer
+from backend.status_checks import status_store
+from backend.revocation import revocations
+from backend.analytics import INTERVALS, analytics_store
+from backend.recommendations import related_courses
+from backend.search import search_refresher
+from backend.documents import certificate_renderer, document_response
+from backend.verification import certificate_verifier
+from backend.bulk_import import detect_format, import_users, import_enrollments
+from backend.export import EXPORT_CHUNK_SIZE, EXPORT_MEDIA_TYPES, encode_export
+from backend.serialization import default_response_class, rows_response
+from backend.metrics import METRICS_ENABLED, PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, registry
+from backend.ratelimit import RateLimitMiddleware
 
-# Load environment variables
-ROOT_DIR = Path(__file__).parent
-if (ROOT_DIR / '.env').exists():
-    from dotenv import load_dotenv
-    load_dotenv(ROOT_DIR / '.env')
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The database client is created here, not at import; WARM_START also fills caches first
+    await warm_start(db, password_hasher, readiness, revocations, certificate_verifier)
+    revocations.start()
+    progress_buffer.start()
+    db.course_stats.start()
+    status_store.start()
+    related_courses.start(db)
+    search_refresher.start(db)
+    user_cache_sync.start(db)
+    certificate_renderer.start()
+    certificate_verifier.start()
+    try:
+        yield
+    finally:
+        readiness.mark_stopping()
+        # Progress first: its last flush may still record completions
+        await progress_buffer.stop()
+        await db.course_stats.stop()
+        await status_store.stop()
+        await revocations.stop()
+        await related_courses.stop()
+        await search_refresher.stop()
+        await user_cache_sync.stop()
+        await certificate_renderer.stop()
+        await certificate_verifier.stop()
+        await db.close()
+        password_hasher.shutdown()
 
 # Create the main app
-app = FastAPI(title="Skilio API", version="1.0.0")
+# FAST_JSON_RESPONSES=true switches every JSON response to orjson
+app = FastAPI(
+    title="Skilio API", version="1.0.0",
+    default_response_class=default_response_class(), lifespan=lifespan,
+)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
+# Rate limiting and load shedding (inside CORS, so 429/503 answers still carry CORS headers)
+if os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes'):
+    app.add_middleware(RateLimitMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -40,8 +107,13 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Per-route latency/status metrics (outermost, so it times the whole stack)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -49,11 +121,88 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+    logger.warning("Shedding %s %s: %s", request.method, request.url.path, exc)
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Service temporarily overloaded, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(Unavailable)
+async def database_unavailable_handler(request: Request, exc: Unavailable):
+    logger.warning("Database unavailable for %s %s: %s", request.method, request.url.path, exc)
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Service temporarily unavailable, please retry"},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
+    )
+
+# Most ids one batch request may ask for
+BATCH_MAX_IDS = int(os.environ.get('BATCH_MAX_IDS', '100'))
+
+def parse_ids(ids: str) -> List[str]:
+    """Comma-separated ids, deduplicated in order"""
+    id_list = list(dict.fromkeys(part.strip() for part in ids.split(',') if part.strip()))
+    if not id_list:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must list at least one id"
+        )
+    if len(id_list) > BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {BATCH_MAX_IDS} ids per request"
+        )
+    return id_list
+
+def parse_cursor(cursor: str) -> Optional[Cursor]:
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
 # Health check endpoint
 @api_router.get("/")
 async def root():
     return {"message": "Skilio API is running", "status": "healthy"}
 
+@api_router.get("/ready")
+async def ready():
+    """Readiness probe: 503 until warm start has finished, then startup step timings"""
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if readiness.ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=readiness.status(),
+    )
+
+@api_router.get("/executor/stats")
+async def get_executor_stats(current_user: TokenClaims = Depends(get_current_admin_user)):
+    """Live DB executor gauges and circuit breaker / hedging state (admins only)"""
+    return {**db_executor.gauges(), "resilience": resilience.stats()}
+
+@api_router.get("/cache/stats")
+async def get_cache_stats(current_user: TokenClaims = Depends(get_current_admin_user)):
+    """In-process cache sizes and hit/miss counters (admins only)"""
+    return {
+        "users": {**user_cache.stats(), "sync": user_cache_sync.stats()},
+        "catalog": catalog_cache.stats(),
+        "analytics": analytics_store.stats(),
+        "revocations": revocations.stats(),
+        "recommendations": related_courses.stats(),
+        "search_index": search_refresher.stats(),
+        "certificate_documents": certificate_renderer.stats(),
+        "certificate_verification": certificate_verifier.stats(),
+    }
+
+@api_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(current_user: TokenClaims = Depends(get_current_admin_user)):
+    """Prometheus metrics (admins only)"""
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 # Authentication endpoints
 @api_router.post("/register", response_model=Token)
 async def register(user_data: UserCreate):
@@ -68,11 +217,11 @@ async def register(user_data: UserCreate):
     
     # Hash password and create user
     user_dict = user_data.dict()
-    user_dict['password'] = get_password_hash(user_data.password)
+    user_dict['password'] = await hash_password(user_data.password)
     
     # Set default avatar if not provided
     if not user_dict.get('avatar'):
-        user_dict['avatar'] = "https://images.unsplash.com/photo-1507003211169-0a1dd7228f2d?w=50&h=50&fit=crop&crop=face"
+        user_dict['avatar'] = DEFAULT_AVATAR
     
     created_user = await db.create_user(user_dict)
     if not created_user:
@@ -81,20 +230,10 @@ async def register(user_data: UserCreate):
             detail="Failed to create user"
         )
     
-    # Create access token
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": created_user["id"]}, expires_delta=access_token_expires
-    )
-    
     # Remove password from response
     user_response = User(**created_user)
     
-    return Token(
-        access_token=access_token,
-        token_type="bearer",
-        user=user_response
-    )
+    return await issue_tokens(user_response)
 
 @api_router.post("/login", response_model=Token)
 async def login(user_credentials: UserLogin):
@@ -107,16 +246,26 @@ async def login(user_credentials: UserLogin):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.id}, expires_delta=access_token_expires
-    )
-    
-    return Token(
-        access_token=access_token,
-        token_type="bearer",
-        user=user
-    )
+    return await issue_tokens(user)
+
+@api_router.post("/token/refresh", response_model=Token)
+async def refresh_token(body: RefreshRequest):
+    """Exchange a refresh token for a new access/refresh token pair (no password needed)"""
+    return await refresh_session(body.refresh_token)
+
+@api_router.post("/logout")
+async def logout(
+    body: Optional[LogoutRequest] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: TokenClaims = Depends(get_current_claims)
+):
+    """Revoke this session's tokens, or with `everywhere` every session of the user"""
+    body = body or LogoutRequest()
+    if body.everywhere:
+        await revoke_sessions(current_user.id)
+    else:
+        await revoke_tokens(credentials.credentials, body.refresh_token)
+    return {"message": "Logged out"}
 
 # User endpoints
 @api_router.get("/users/me", response_model=User)
@@ -144,43 +293,61 @@ async def update_current_user_profile(
     return User(**updated_user)
 
 # Course endpoints
-@api_router.get("/courses", response_model=List[Course])
+@api_router.get("/courses", response_model=Union[List[Course], CoursePage])
 async def get_courses(
+    request: Request,
     limit: int = 100,
     offset: int = 0,
     category: Optional[str] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    cursor: Optional[str] = None
 ):
-    """Get all courses with optional filtering"""
-    courses = await db.get_courses(limit=limit, offset=offset, category=category)
+    """Get all courses with optional filtering and ranked search.
+
+    Passing `cursor` (empty for the first page) switches to keyset pagination
+    and returns a page object with `next_cursor`; otherwise limit/offset apply.
+    """
+    if cursor is not None and not search:
+        courses = await db.get_courses_after(limit=limit, cursor=parse_cursor(cursor), category=category)
+        return rows_response(CoursePage, {
+            'items': courses,
+            'next_cursor': next_cursor(courses, limit, 'created_at')
+        })
     
-    # Apply search filter if provided
     if search:
-        search_lower = search.lower()
-        courses = [
-            course for course in courses
-            if search_lower in course['title'].lower() or 
-               search_lower in course['description'].lower()
-        ]
+        courses = await db.search_courses(search, limit=limit, offset=offset, category=category)
+        return rows_response(List[Course], courses)
     
-    return [Course(**course) for course in courses]
+    # Catalog pages are served from cache with an ETag (304 when unchanged)
+    entry = await db.get_courses_entry(limit=limit, offset=offset, category=category)
+    return conditional_response(request, entry)
+
+# Declared before /courses/{course_id} so "batch" is not taken for an id
+@api_router.get("/courses/batch", response_model=CourseBatch)
+async def get_courses_batch(ids: str):
+    """Several courses in one request, keyed by id; ids that do not exist map to null and are listed in `missing`"""
+    courses = await db.get_courses_batch(parse_ids(ids))
+    return rows_response(CourseBatch, {
+        'items': courses,
+        'missing': [course_id for course_id, course in courses.items() if course is None]
+    })
 
 @api_router.get("/courses/{course_id}", response_model=Course)
-async def get_course(course_id: str):
+async def get_course(course_id: str, request: Request):
     """Get a specific course"""
-    course = await db.get_course_by_id(course_id)
-    if not course:
+    entry = await db.get_course_entry(course_id)
+    if entry.rows is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Course not found"
         )
     
-    return Course(**course)
+    return conditional_response(request, entry)
 
 @api_router.post("/courses", response_model=Course)
 async def create_course(
     course_data: CourseCreate,
-    current_user: User = Depends(get_current_instructor_user)
+    current_user: TokenClaims = Depends(get_current_instructor_user)
 ):
     """Create a new course (instructors and admins only)"""
     course_dict = course_data.dict()
@@ -193,51 +360,54 @@ async def create_course(
             detail="Failed to create course"
         )
     
-    # Get the course with instructor details
-    course_with_details = await db.get_course_by_id(created_course['id'])
-    return Course(**course_with_details)
+    # The instructor is the current user, so no need to read the course back; their name and
+    # avatar come from the (cached) user record, as token claims go stale when the profile changes
+    instructor = await load_user(current_user.id)
+    return Course(
+        **created_course,
+        instructor_name=instructor.name,
+        instructor_avatar=instructor.avatar
+    )
 
 @api_router.put("/courses/{course_id}", response_model=Course)
 async def update_course(
     course_id: str,
     course_update: CourseUpdate,
-    current_user: User = Depends(get_current_instructor_user)
+    current_user: TokenClaims = Depends(get_current_instructor_user),
+    loaders: RequestLoaders = Depends(get_loaders)
 ):
     """Update a course (instructors and admins only)"""
-    # Check if course exists and user has permission
-    existing_course = await db.get_course_by_id(course_id)
-    if not existing_course:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Course not found"
-        )
-    
-    # Check if user is the instructor or admin
-    if current_user.role != "admin" and existing_course['instructor_id'] != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this course"
-        )
-    
     update_data = course_update.dict(exclude_unset=True)
+    owner_id = None if current_user.role == "admin" else current_user.id
+    
     if not update_data:
-        return Course(**existing_course)
+        existing_course = await loaders.courses.load(course_id)
+        if existing_course and owner_id in (None, existing_course['instructor_id']):
+            return Course(**existing_course)
+    else:
+        # Instructors may only update their own courses; the ownership check is
+        # part of the UPDATE, which also returns the row with instructor details
+        updated_course = await db.update_course(course_id, update_data, instructor_id=owner_id)
+        if updated_course:
+            loaders.courses.prime(course_id, updated_course)
+            return Course(**updated_course)
     
-    updated_course = await db.update_course(course_id, update_data)
-    if not updated_course:
+    # Nothing matched: find out whether the course is missing or not ours
+    existing_course = await loaders.courses.load(course_id)
+    if not existing_course:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to update course"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
         )
-    
-    # Get the course with instructor details
-    course_with_details = await db.get_course_by_id(course_id)
-    return Course(**course_with_details)
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Not authorized to update this course"
+    )
 
 @api_router.delete("/courses/{course_id}")
 async def delete_course(
     course_id: str,
-    current_user: User = Depends(get_current_admin_user)
+    current_user: TokenClaims = Depends(get_current_admin_user)
 ):
     """Delete a course (admins only)"""
     success = await db.delete_course(course_id)
@@ -246,26 +416,97 @@ async def delete_course(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Course not found"
         )
+    # Its enrollments went with it: stop accepting (and flushing) their heartbeats
+    progress_buffer.forget_course(course_id)
     
     return {"message": "Course deleted successfully"}
 
+@api_router.get("/courses/{course_id}/related", response_model=List[RelatedCourse])
+async def get_related_courses(course_id: str, limit: int = 10):
+    """Courses most often taken by this course's students, from memory (empty until there is enough data)"""
+    return rows_response(List[RelatedCourse], related_courses.related(course_id, limit))
+
+@api_router.get("/courses/{course_id}/analytics")
+async def get_course_analytics(
+    course_id: str,
+    interval: str = "week",
+    current_user: TokenClaims = Depends(get_current_instructor_user),
+    loaders: RequestLoaders = Depends(get_loaders)
+):
+    """Completion funnel, progress distribution and enrollment timeline of a course (its instructor or admins)"""
+    if interval not in INTERVALS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"interval must be one of: {', '.join(INTERVALS)}"
+        )
+
+    course = await loaders.courses.load(course_id)
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
+
+    if current_user.role != "admin" and course['instructor_id'] != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this course's analytics"
+        )
+
+    return await analytics_store.rollup(db, course_id, interval)
+
+@api_router.post("/courses/{course_id}/ratings", response_model=CourseRating)
+async def rate_course(
+    course_id: str,
+    rating_data: CourseRatingCreate,
+    current_user: TokenClaims = Depends(get_current_claims),
+    loaders: RequestLoaders = Depends(get_loaders)
+):
+    """Rate a course the current user is enrolled in (rating again replaces the previous one)"""
+    course, enrollment = await asyncio.gather(
+        loaders.courses.load(course_id),
+        loaders.enrollments.load((current_user.id, course_id))
+    )
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
+
+    if not enrollment:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only enrolled students can rate this course"
+        )
+
+    rating = await db.rate_course(current_user.id, course_id, rating_data.rating, rating_data.review)
+    if not rating:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to save rating"
+        )
+
+    return CourseRating(**rating)
+
 # Enrollment endpoints
 @api_router.post("/enrollments", response_model=Enrollment)
 async def enroll_in_course(
     enrollment_data: EnrollmentCreate,
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims),
+    loaders: RequestLoaders = Depends(get_loaders)
 ):
     """Enroll current user in a course"""
-    # Check if course exists
-    course = await db.get_course_by_id(enrollment_data.course_id)
+    # Check the course exists and the user isn't enrolled yet, concurrently
+    course, existing_enrollment = await asyncio.gather(
+        loaders.courses.load(enrollment_data.course_id),
+        loaders.enrollments.load((current_user.id, enrollment_data.course_id))
+    )
     if not course:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Course not found"
         )
     
-    # Check if already enrolled
-    existing_enrollment = await db.get_enrollment(current_user.id, enrollment_data.course_id)
     if existing_enrollment:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -286,7 +527,7 @@ async def enroll_in_course(
     return Enrollment(**created_enrollment)
 
 @api_router.get("/enrollments/me", response_model=List[dict])
-async def get_my_enrollments(current_user: User = Depends(get_current_user)):
+async def get_my_enrollments(current_user: TokenClaims = Depends(get_current_claims)):
     """Get current user's enrollments"""
     enrollments = await db.get_user_enrollments(current_user.id)
     return enrollments
@@ -296,45 +537,98 @@ async def update_enrollment_progress(
     enrollment_id: str,
     progress: float,
     completed_lessons: int,
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
-    """Update enrollment progress"""
-    updated_enrollment = await db.update_enrollment_progress(
-        enrollment_id, progress, completed_lessons
-    )
-    if not updated_enrollment:
+    """Update enrollment progress (buffered; completion is written immediately)"""
+    enrollment = await progress_buffer.get_enrollment(enrollment_id)
+    if not enrollment or enrollment['user_id'] != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Enrollment not found"
         )
     
+    await progress_buffer.submit(
+        enrollment_id, enrollment['user_id'], enrollment['course_id'], progress, completed_lessons
+    )
+    
     return {"message": "Progress updated successfully"}
 
 # Certificate endpoints
-@api_router.get("/certificates", response_model=List[Certificate])
+@api_router.get("/certificates", response_model=Union[List[Certificate], CertificatePage])
 async def get_certificates(
     limit: int = 100,
     offset: int = 0,
-    current_user: User = Depends(get_current_admin_user)
+    cursor: Optional[str] = None,
+    current_user: TokenClaims = Depends(get_current_admin_user)
 ):
-    """Get all certificates (admins only)"""
+    """Get all certificates (admins only); pass `cursor` for keyset pagination"""
+    if cursor is not None:
+        certificates = await db.get_certificates_after(limit=limit, cursor=parse_cursor(cursor))
+        return rows_response(CertificatePage, {
+            'items': certificates,
+            'next_cursor': next_cursor(certificates, limit, 'issued_at')
+        })
+    
     certificates = await db.get_certificates(limit=limit, offset=offset)
-    return [Certificate(**cert) for cert in certificates]
+    return rows_response(List[Certificate], certificates)
+
+@api_router.get("/certificates/export")
+async def export_certificates(
+    format: str = 'ndjson',
+    course_id: Optional[str] = None,
+    instructor_id: Optional[str] = None,
+    issued_from: Optional[datetime] = None,
+    issued_to: Optional[datetime] = None,
+    current_user: TokenClaims = Depends(get_current_admin_user)
+):
+    """Stream every matching certificate as NDJSON or CSV (admins only); issued_to is exclusive"""
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="format must be ndjson or csv"
+        )
+    
+    rows = db.iter_certificates(
+        chunk_size=EXPORT_CHUNK_SIZE,
+        course_id=course_id,
+        instructor_id=instructor_id,
+        issued_from=issued_from,
+        issued_to=issued_to,
+    )
+    filename = f"certificates-{datetime.utcnow():%Y%m%d%H%M%S}.{format}"
+    return StreamingResponse(
+        encode_export(rows, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
 
 @api_router.get("/certificates/me", response_model=List[Certificate])
-async def get_my_certificates(current_user: User = Depends(get_current_user)):
+async def get_my_certificates(current_user: TokenClaims = Depends(get_current_claims)):
     """Get current user's certificates"""
     certificates = await db.get_user_certificates(current_user.id)
-    return [Certificate(**cert) for cert in certificates]
+    return rows_response(List[Certificate], certificates)
 
 @api_router.post("/certificates", response_model=Certificate)
 async def create_certificate(
     certificate_data: CertificateCreate,
-    current_user: User = Depends(get_current_instructor_user)
+    current_user: TokenClaims = Depends(get_current_instructor_user),
+    loaders: RequestLoaders = Depends(get_loaders)
 ):
     """Create a new certificate (instructors and admins only)"""
     certificate_dict = certificate_data.dict()
     
+    # Student, instructor (one batched query) and course are looked up concurrently
+    student, instructor, course = await asyncio.gather(
+        loaders.users.load(certificate_data.user_id),
+        loaders.users.load(certificate_data.instructor_id),
+        loaders.courses.load(certificate_data.course_id)
+    )
+    if not student or not instructor or not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student, instructor or course not found"
+        )
+    
     # Generate unique certificate ID
     import uuid
     certificate_dict['certificate_id'] = f"CERT-{datetime.now().year}-{str(uuid.uuid4())[:8].upper()}"
@@ -346,21 +640,153 @@ async def create_certificate(
             detail="Failed to create certificate"
         )
     
-    return Certificate(**created_certificate)
+    certificate = Certificate(
+        **created_certificate,
+        student_name=student['name'],
+        course_name=course['title'],
+        instructor_name=instructor['name']
+    )
+    certificate_verifier.add(certificate.certificate_id)
+    # Rendered in the background so the first download is a cache hit
+    certificate_renderer.schedule(certificate.dict())
+    return certificate
+
+@api_router.get("/verify/{certificate_id}", response_model=CertificateVerification)
+async def verify_certificate(certificate_id: str):
+    """Public certificate verification by its certificate ID; unknown IDs are rejected from memory"""
+    summary = await certificate_verifier.verify(certificate_id)
+    if summary is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Certificate not found"
+        )
+    return rows_response(CertificateVerification, summary)
+
+@api_router.get("/certificates/{certificate_id}/pdf")
+async def download_certificate(
+    certificate_id: str,
+    request: Request,
+    current_user: TokenClaims = Depends(get_current_claims)
+):
+    """Certificate as a PDF (its student, its instructor or admins); supports Range and If-None-Match"""
+    certificate = await db.get_certificate(certificate_id)
+    if not certificate:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Certificate not found"
+        )
+    if current_user.role != "admin" and current_user.id not in (certificate['user_id'], certificate['instructor_id']):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to download this certificate"
+        )
+
+    path, key = await certificate_renderer.document(certificate)
+    return await document_response(request, path, key, f"{certificate['certificate_id']}.pdf")
+
+@api_router.get("/admin/users/batch", response_model=UserBatch)
+async def get_users_batch(ids: str, current_user: TokenClaims = Depends(get_current_admin_user)):
+    """Several users in one request, keyed by id, with misses as null and in `missing` (admins only)"""
+    users = await load_users(parse_ids(ids))
+    return rows_response(UserBatch, {
+        'items': users,
+        'missing': [user_id for user_id, user in users.items() if user is None]
+    })
+
+@api_router.put("/admin/users/{user_id}/role", response_model=User)
+async def update_user_role(
+    user_id: str,
+    role_update: UserRoleUpdate,
+    current_user: TokenClaims = Depends(get_current_admin_user)
+):
+    """Change a user's role (admins only); their current access tokens stop working right away"""
+    updated_user = await db.update_user(user_id, {'role': role_update.role.value})
+    if not updated_user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    # Refresh tokens stay valid, so the user's next refresh carries the new role
+    await revoke_access_tokens(user_id)
+    return User(**updated_user)
+
+@api_router.post("/admin/course-stats/reconcile")
+async def reconcile_course_stats(current_user: TokenClaims = Depends(get_current_admin_user)):
+    """Recompute every course's student/completion/rating statistics now (admins only)"""
+    drifted = await db.course_stats.reconcile()
+    return {"drifted": drifted, **db.course_stats.stats()}
+
+@api_router.post("/admin/status/maintain")
+async def maintain_status_checks(current_user: TokenClaims = Depends(get_current_admin_user)):
+    """Downsample and expire status checks past retention now (admins only)"""
+    await status_store.flush()
+    result = await status_store.maintain()
+    return {**result, **status_store.stats()}
+
+# Bulk import endpoints (admins only)
+def import_format(request: Request, format: Optional[str]) -> str:
+    try:
+        return detect_format(request.headers.get('content-type'), format)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+
+@api_router.post("/admin/import/users")
+async def bulk_import_users(
+    request: Request,
+    format: Optional[str] = None,
+    current_user: TokenClaims = Depends(get_current_admin_user)
+):
+    """Import users from a streamed CSV or NDJSON body; returns a per-row report"""
+    fmt = import_format(request, format)
+    return await import_users(db, password_hasher, request.stream(), fmt)
+
+@api_router.post("/admin/import/enrollments")
+async def bulk_import_enrollments(
+    request: Request,
+    format: Optional[str] = None,
+    current_user: TokenClaims = Depends(get_current_admin_user)
+):
+    """Import enrollments (course_id plus user_id or email) from a streamed CSV or NDJSON body"""
+    fmt = import_format(request, format)
+    return await import_enrollments(db, request.stream(), fmt)
 
-# Status check endpoints (keeping existing functionality)
+# Status check endpoints
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input_data: StatusCheckCreate):
-    """Create a status check"""
-    status_dict = input_data.dict()
-    created_status = await db.create_status_check(status_dict)
-    return StatusCheck(**created_status)
+    """Record a status check; it is buffered and written in the next batch"""
+    check = await status_store.record(input_data.client_name)
+    return rows_response(StatusCheck, check)
 
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    """Get all status checks"""
-    status_checks = await db.get_status_checks()
-    return [StatusCheck(**status_check) for status_check in status_checks]
+async def get_status_checks(
+    limit: int = 1000,
+    client_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """Raw status checks in [since, until), newest first (raw checks are kept for STATUS_RAW_RETENTION_DAYS)"""
+    status_checks = await status_store.query(limit=limit, client_name=client_name, since=since, until=until)
+    return rows_response(List[StatusCheck], status_checks)
+
+@api_router.get("/status/recent", response_model=List[StatusCheck])
+async def get_recent_status_checks(client_name: Optional[str] = None, limit: int = 100):
+    """A client's latest checks, or every client's latest check, from this worker's memory"""
+    return rows_response(List[StatusCheck], status_store.recent(client_name=client_name, limit=limit))
+
+@api_router.get("/status/rollups", response_model=List[StatusCheckRollup])
+async def get_status_check_rollups(
+    limit: int = 1000,
+    client_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """Hourly per-client check counts for data past raw retention, newest first"""
+    rollups = await status_store.rollups(limit=limit, client_name=client_name, since=since, until=until)
+    return rows_response(List[StatusCheckRollup], rollups)
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -0,0 +1,207 @@
+import os
+import time
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from typing import Deque, List, Optional
+
+from backend.database import Database, db
+from backend.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+class StatusCheckStore:
+    """Time-series store for monitoring agents' status checks.
+
+    Checks are buffered and written as one multi-row insert every
+    `flush_interval` seconds or once `max_pending` are waiting; if the
+    database is unavailable at most `max_backlog` are kept, oldest dropped
+    first, and only the background flush retries them. The last
+    `ring_size` checks of each of the `ring_clients` most recently seen
+    clients are also kept in memory (per worker) so liveness reads never
+    touch the database.
+
+    Every `maintenance_interval` seconds (0 disables) raw checks older than
+    `raw_retention` are folded into hourly per-client rollups, and rollups
+    older than `rollup_retention` are deleted, so the tables stay bounded.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        flush_interval: Optional[float] = None,
+        max_pending: Optional[int] = None,
+        ring_size: Optional[int] = None,
+        ring_clients: Optional[int] = None,
+        raw_retention: Optional[timedelta] = None,
+        rollup_retention: Optional[timedelta] = None,
+        maintenance_interval: Optional[float] = None,
+    ):
+        self.db = database
+        self.flush_interval = flush_interval or float(os.environ.get('STATUS_FLUSH_INTERVAL', '2'))
+        self.max_pending = max_pending or int(os.environ.get('STATUS_FLUSH_SIZE', '500'))
+        self.max_backlog = self.max_pending * 20
+        self.ring_size = ring_size or int(os.environ.get('STATUS_RING_SIZE', '100'))
+        self.ring_clients = ring_clients or int(os.environ.get('STATUS_RING_CLIENTS', '1000'))
+        self.raw_retention = raw_retention or timedelta(days=float(os.environ.get('STATUS_RAW_RETENTION_DAYS', '7')))
+        self.rollup_retention = rollup_retention or timedelta(
+            days=float(os.environ.get('STATUS_ROLLUP_RETENTION_DAYS', '90')))
+        if maintenance_interval is None:
+            maintenance_interval = float(os.environ.get('STATUS_MAINTENANCE_INTERVAL', '3600'))
+        self.maintenance_interval = maintenance_interval
+        self._pending: List[dict] = []
+        self._rings: "OrderedDict[str, Deque[dict]]" = OrderedDict()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._last_maintenance = time.monotonic()
+        # Set while flushes fail, so recording stops triggering them until the background flush recovers
+        self._flush_failing = False
+        self.recorded = 0
+        self.flushed = 0
+        self.batches = 0
+        self.dropped = 0
+        self.downsampled = 0
+        self.expired = 0
+
+    async def record(self, client_name: str) -> dict:
+        """Buffer one check and return it; it is readable from `recent` immediately"""
+        check = {
+            'id': str(uuid.uuid4()),
+            'client_name': client_name,
+            'timestamp': datetime.utcnow().isoformat(),
+        }
+        self._pending.append(check)
+        self.recorded += 1
+
+        ring = self._rings.get(client_name)
+        if ring is None:
+            ring = self._rings[client_name] = deque(maxlen=self.ring_size)
+            while len(self._rings) > self.ring_clients:
+                self._rings.popitem(last=False)
+        else:
+            self._rings.move_to_end(client_name)
+        ring.append(check)
+
+        if len(self._pending) >= self.max_pending and not self._flush_failing:
+            try:
+                await self.flush()
+            except Exception:
+                # The check is buffered either way; the background flush retries it
+                logger.exception("Status check flush failed; %d checks kept for retry", len(self._pending))
+        return check
+
+    async def flush(self) -> int:
+        """Write every pending check in one batch"""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, []
+            try:
+                written = await self.db.create_status_checks_bulk(batch)
+            except BaseException as exc:
+                # Older checks go back in front; beyond the backlog the oldest are dropped
+                if isinstance(exc, Exception):
+                    self._flush_failing = True
+                self._pending[:0] = batch
+                overflow = len(self._pending) - self.max_backlog
+                if overflow > 0:
+                    del self._pending[:overflow]
+                    self.dropped += overflow
+                raise
+            self._flush_failing = False
+            self.flushed += len(batch)
+            self.batches += 1
+            return written
+
+    async def query(
+        self,
+        limit: int = 1000,
+        client_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[dict]:
+        """Stored checks in [since, until), newest first; pending checks are flushed first"""
+        if self._pending:
+            await self.flush()
+        return await self.db.get_status_checks(limit=limit, client_name=client_name, since=since, until=until)
+
+    async def rollups(
+        self,
+        limit: int = 1000,
+        client_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[dict]:
+        return await self.db.get_status_check_rollups(limit=limit, client_name=client_name, since=since, until=until)
+
+    def recent(self, client_name: Optional[str] = None, limit: int = 100) -> List[dict]:
+        """A client's latest checks seen by this worker, or every client's latest check, newest first"""
+        if client_name is not None:
+            ring = self._rings.get(client_name) or ()
+            return list(reversed(ring))[:limit]
+        latest = [ring[-1] for ring in self._rings.values()]
+        latest.sort(key=lambda check: check['timestamp'], reverse=True)
+        return latest[:limit]
+
+    async def maintain(self) -> dict:
+        """Downsample raw checks past retention into hourly rollups and expire old rollups"""
+        now = datetime.utcnow()
+        result = await self.db.downsample_status_checks(now - self.raw_retention, now - self.rollup_retention)
+        self._last_maintenance = time.monotonic()
+        self.downsampled += result['raw_deleted']
+        self.expired += result['rollups_expired']
+        if result['raw_deleted'] or result['rollups_expired']:
+            logger.info("Status check retention: %s", result)
+        return result
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Status check flush failed; %d checks kept for retry", len(self._pending))
+            if self.maintenance_interval and time.monotonic() - self._last_maintenance >= self.maintenance_interval:
+                try:
+                    await self.maintain()
+                except Exception:
+                    self._last_maintenance = time.monotonic()
+                    logger.exception("Status check retention failed")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            'pending': len(self._pending),
+            'clients': len(self._rings),
+            'recorded_total': self.recorded,
+            'flushed_total': self.flushed,
+            'batches_total': self.batches,
+            'dropped_total': self.dropped,
+            'downsampled_total': self.downsampled,
+            'rollups_expired_total': self.expired,
+        }
+
+
+# Global status check store
+status_store = StatusCheckStore(db)
+
+registry.gauge('status_checks_pending', 'Status checks waiting to be flushed', callback=lambda: len(status_store._pending))
+registry.counter('status_checks_flushed_total', 'Status checks written in batches', callback=lambda: status_store.flushed)
+registry.counter('status_checks_dropped_total', 'Status checks dropped while the database was unavailable',
+                 callback=lambda: status_store.dropped)
@@ -0,0 +1,27 @@
+import os
+from typing import Optional
+
+from backend.storage.base import StorageBackend
+
+BACKENDS = ('supabase', 'postgres', 'sqlite')
+
+
+def create_backend(name: Optional[str] = None) -> StorageBackend:
+    """Create the storage backend selected by `name` or the DB_BACKEND env var"""
+    name = (name or os.environ.get('DB_BACKEND', 'supabase')).lower()
+
+    # Imported lazily so each backend only needs its own driver installed
+    if name == 'supabase':
+        from backend.storage.supabase_backend import SupabaseBackend
+        return SupabaseBackend()
+    if name == 'postgres':
+        from backend.storage.postgres_backend import PostgresBackend
+        return PostgresBackend.from_env()
+    if name == 'sqlite':
+        from backend.storage.sqlite_backend import SQLiteBackend
+        return SQLiteBackend(os.environ.get('SQLITE_PATH', ':memory:'))
+
+    raise ValueError(f"Unknown DB_BACKEND {name!r}; expected one of {', '.join(BACKENDS)}")
+
+
+__all__ = ['StorageBackend', 'create_backend', 'BACKENDS']
@@ -0,0 +1,236 @@
+from typing import Optional, List, Tuple
+
+
+class StorageBackend:
+    """Interface every storage backend behind `Database` implements.
+
+    Backends do I/O only: ids and timestamps are assigned by `Database` before
+    a row reaches them, and every read returns plain JSON-like dicts shaped
+    the way the PostgREST joins return them (instructor/student/course names
+    flattened onto the row, timestamps as ISO strings, ids as strings).
+    """
+
+    name = "base"
+
+    async def connect(self) -> None:
+        """Open connections / pools"""
+
+    async def close(self) -> None:
+        """Release connections / pools"""
+
+    async def warm(self, connections: int) -> None:
+        """Open up to `connections` connections ahead of the first requests"""
+
+    # User operations
+    async def create_user(self, user_data: dict) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def get_user_by_email(self, email: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def get_user_by_id(self, user_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def update_user(self, user_id: str, user_data: dict) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def get_users_by_ids(self, user_ids: List[str]) -> List[dict]:
+        raise NotImplementedError
+
+    async def get_users_by_emails(self, emails: List[str]) -> List[dict]:
+        raise NotImplementedError
+
+    async def get_user_ids_updated_since(self, updated_since: str) -> List[str]:
+        """Ids of users whose profile was updated at or after `updated_since`"""
+        raise NotImplementedError
+
+    async def create_users_bulk(self, users: List[dict]) -> List[dict]:
+        """Multi-row insert that skips rows violating the unique email; returns inserted rows"""
+        raise NotImplementedError
+
+    # Token operations
+    async def create_refresh_token(self, token_data: dict) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def get_refresh_token(self, token_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def use_refresh_token(self, token_id: str, now: str) -> Optional[dict]:
+        """Atomically revoke a live (unrevoked, unexpired) refresh token; returns it, or None if it was not live"""
+        raise NotImplementedError
+
+    async def revoke_user_refresh_tokens(self, user_id: str, now: str) -> int:
+        raise NotImplementedError
+
+    async def delete_refresh_token(self, token_id: str, user_id: str) -> bool:
+        raise NotImplementedError
+
+    async def create_token_revocation(self, revocation_data: dict) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def get_token_revocations(self, revoked_since: Optional[str], live_at: str) -> List[dict]:
+        """Revocations still in force at `live_at`, made at or after `revoked_since` (all when None)"""
+        raise NotImplementedError
+
+    async def purge_expired_tokens(self, now: str) -> int:
+        """Delete expired refresh tokens and revocations; returns how many rows went"""
+        raise NotImplementedError
+
+    # Course operations
+    async def create_course(self, course_data: dict) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def get_courses(self, limit: int = 100, offset: int = 0, category: Optional[str] = None) -> List[dict]:
+        raise NotImplementedError
+
+    async def get_courses_after(self, limit: int = 100, after: Optional[Tuple[str, str]] = None, category: Optional[str] = None) -> List[dict]:
+        """Keyset page ordered by (created_at, id) descending, starting after the `after` row"""
+        raise NotImplementedError
+
+    async def get_course_by_id(self, course_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def get_courses_by_ids(self, course_ids: List[str]) -> List[dict]:
+        raise NotImplementedError
+
+    async def get_courses_changed_page(self, changed_since: str, after_id: Optional[str] = None, limit: int = 500) -> List[dict]:
+        """Courses created or updated at or after `changed_since`, in id order after `after_id`"""
+        raise NotImplementedError
+
+    async def search_courses(self, query: str, limit: int = 100, offset: int = 0, category: Optional[str] = None) -> List[dict]:
+        """Ranked full-text search done by the database itself"""
+        raise NotImplementedError
+
+    async def update_course(self, course_id: str, course_data: dict, instructor_id: Optional[str] = None) -> Optional[dict]:
+        """Update and return the course joined with instructor_name/instructor_avatar in one round trip.
+
+        With `instructor_id` only a course owned by that instructor is updated;
+        returns None when no row matched.
+        """
+        raise NotImplementedError
+
+    async def delete_course(self, course_id: str) -> bool:
+        raise NotImplementedError
+
+    # Enrollment operations
+    async def create_enrollment(self, enrollment_data: dict) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def create_enrollments_bulk(self, enrollments: List[dict]) -> List[dict]:
+        """Multi-row insert that skips rows violating UNIQUE(user_id, course_id); returns inserted rows"""
+        raise NotImplementedError
+
+    async def get_user_enrollments(self, user_id: str) -> List[dict]:
+        raise NotImplementedError
+
+    async def get_enrollment(self, user_id: str, course_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def get_enrollment_by_id(self, enrollment_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def get_course_enrollments_page(self, course_id: str, after_id: Optional[str] = None, limit: int = 1000) -> List[dict]:
+        """Analytics columns (id, progress, completed_lessons, enrolled_at, completed_at) of a course's enrollments, by id"""
+        raise NotImplementedError
+
+    async def get_enrollment_pairs_page(self, after_id: Optional[str] = None, limit: int = 10000) -> List[dict]:
+        """(id, user_id, course_id) of every enrollment, by id"""
+        raise NotImplementedError
+
+    async def update_enrollment_progress(self, enrollment_id: str, update_data: dict) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def update_enrollments_progress(self, updates: List[dict]) -> int:
+        """Apply many progress updates at once; each dict carries `id` plus the columns to set.
+
+        Backends override this with a single batched statement; this default
+        falls back to one UPDATE per row.
+        """
+        updated = 0
+        for update in updates:
+            data = {k: v for k, v in update.items() if k in ('progress', 'completed_lessons', 'completed_at')}
+            if await self.update_enrollment_progress(update['id'], data):
+                updated += 1
+        return updated
+
+    # Rating operations
+    async def get_course_rating(self, user_id: str, course_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def upsert_course_rating(self, rating_data: dict) -> Optional[dict]:
+        """Insert the rating, or replace the one the user already gave the course"""
+        raise NotImplementedError
+
+    # Course statistics
+    async def apply_course_stat_deltas(self, deltas: List[dict]) -> int:
+        """Add per-course deltas (course_id, students, completions, rating_count, rating_sum) in one statement"""
+        raise NotImplementedError
+
+    async def reconcile_course_stats(self) -> int:
+        """Recompute every course's statistics from enrollments and ratings; returns how many had drifted"""
+        raise NotImplementedError
+
+    # Certificate operations
+    async def create_certificate(self, certificate_data: dict) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def get_certificates(self, limit: int = 100, offset: int = 0) -> List[dict]:
+        raise NotImplementedError
+
+    async def get_certificates_after(
+        self,
+        limit: int = 100,
+        after: Optional[Tuple[str, str]] = None,
+        course_id: Optional[str] = None,
+        instructor_id: Optional[str] = None,
+        issued_from: Optional[str] = None,
+        issued_to: Optional[str] = None,
+    ) -> List[dict]:
+        """Keyset page ordered by (issued_at, id) descending, starting after the `after` row"""
+        raise NotImplementedError
+
+    async def get_user_certificates(self, user_id: str) -> List[dict]:
+        raise NotImplementedError
+
+    async def get_certificate_ids_page(self, after: Optional[Tuple[str, str]] = None, limit: int = 10000) -> List[dict]:
+        """(id, certificate_id, issued_at) of certificates strictly after `after` in (issued_at, id) ASC order"""
+        raise NotImplementedError
+
+    async def get_certificate(self, certificate_id: str) -> Optional[dict]:
+        """One certificate by its public `certificate_id`, with student/course/instructor names"""
+        raise NotImplementedError
+
+    # Status check operations
+    async def create_status_check(self, status_data: dict) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def create_status_checks_bulk(self, status_checks: List[dict]) -> int:
+        """Multi-row insert; returns how many rows were written"""
+        raise NotImplementedError
+
+    async def get_status_checks(
+        self,
+        limit: int = 1000,
+        client_name: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> List[dict]:
+        """Checks with since <= timestamp < until, newest first"""
+        raise NotImplementedError
+
+    async def get_status_check_rollups(
+        self,
+        limit: int = 1000,
+        client_name: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> List[dict]:
+        """Hourly rollups with since <= bucket_start < until, newest first"""
+        raise NotImplementedError
+
+    async def downsample_status_checks(self, raw_before: str, rollups_before: str) -> dict:
+        """Fold raw checks older than raw_before into hourly rollups and drop rollups older than rollups_before.
+
+        Returns counts: raw_deleted, rollups_written, rollups_expired.
+        """
+        raise NotImplementedError
@@ -0,0 +1,584 @@
+import os
+import json
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime, date
+from decimal import Decimal
+from enum import Enum
+from typing import Optional, List, Dict, Deque, Tuple
+from uuid import UUID
+
+import asyncpg
+
+from backend.storage.base import StorageBackend
+
+# Columns stored as timestamptz; `Database` hands them over as ISO strings
+TIMESTAMP_COLUMNS = {
+    'created_at', 'updated_at', 'enrolled_at', 'completed_at', 'issued_at', 'timestamp',
+    'bucket_start', 'first_seen', 'last_seen', 'expires_at', 'revoked_at',
+}
+
+COURSE_SELECT = '''
+    SELECT c.*, u.name AS instructor_name, u.avatar AS instructor_avatar
+    FROM courses c
+    LEFT JOIN users u ON u.id = c.instructor_id
+'''
+
+CERTIFICATE_SELECT = '''
+    SELECT cert.*, s.name AS student_name, c.title AS course_name, i.name AS instructor_name
+    FROM certificates cert
+    LEFT JOIN users s ON s.id = cert.user_id
+    LEFT JOIN courses c ON c.id = cert.course_id
+    LEFT JOIN users i ON i.id = cert.instructor_id
+'''
+
+# Hot queries, prepared once per pooled connection
+PREPARED_STATEMENTS = {
+    'user_by_id': 'SELECT * FROM users WHERE id = $1',
+    'course_by_id': COURSE_SELECT + ' WHERE c.id = $1',
+    'courses': COURSE_SELECT + ' ORDER BY c.created_at DESC, c.id DESC LIMIT $1 OFFSET $2',
+    'courses_by_category': COURSE_SELECT + ' WHERE c.category = $3 ORDER BY c.created_at DESC, c.id DESC LIMIT $1 OFFSET $2',
+    'enrollment': 'SELECT * FROM enrollments WHERE user_id = $1 AND course_id = $2',
+}
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _to_param(column: str, value):
+    if column in TIMESTAMP_COLUMNS and isinstance(value, str):
+        return _to_timestamp(value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _to_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _to_json(value):
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def record_to_dict(record) -> Optional[dict]:
+    """Convert an asyncpg Record to the JSON-like dict shape PostgREST returns"""
+    if record is None:
+        return None
+    return {key: _to_json(value) for key, value in record.items()}
+
+
+class PooledConnection:
+    """A pooled connection with its prepared statements and last-use time"""
+
+    __slots__ = ('conn', 'statements', 'last_used')
+
+    def __init__(self, conn, statements: Dict[str, "asyncpg.prepared_stmt.PreparedStatement"]):
+        self.conn = conn
+        self.statements = statements
+        self.last_used = time.monotonic()
+
+
+class ConnectionPool:
+    """Bounded, health-checked asyncpg connection pool.
+
+    At most `max_size` connections exist at once. Idle connections are reused
+    LIFO and pinged before reuse once they have been idle longer than
+    `health_check_interval`; dead ones are dropped and replaced transparently.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        acquire_timeout: float = 10.0,
+        health_check_interval: float = 30.0,
+        statements: Optional[Dict[str, str]] = None,
+    ):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+        self.statements = statements or {}
+        self._idle: Deque[PooledConnection] = deque()
+        self._slots = asyncio.Semaphore(max_size)
+        self.size = 0
+
+    async def open(self, count: Optional[int] = None) -> None:
+        """Pre-create idle connections up to `count` (default min_size), capped at max_size"""
+        count = min(self.min_size if count is None else count, self.max_size)
+        for _ in range(count - self.size):
+            self._idle.append(await self._connect())
+
+    async def close(self) -> None:
+        while self._idle:
+            await self._discard(self._idle.pop())
+
+    async def _connect(self) -> PooledConnection:
+        conn = await asyncpg.connect(self.dsn)
+        await conn.set_type_codec('jsonb', encoder=json.dumps, decoder=json.loads, schema='pg_catalog')
+        statements = {name: await conn.prepare(sql) for name, sql in self.statements.items()}
+        self.size += 1
+        return PooledConnection(conn, statements)
+
+    async def _discard(self, pooled: PooledConnection) -> None:
+        self.size -= 1
+        try:
+            await pooled.conn.close(timeout=5)
+        except Exception:
+            pooled.conn.terminate()
+
+    async def _is_healthy(self, pooled: PooledConnection) -> bool:
+        if pooled.conn.is_closed():
+            return False
+        if time.monotonic() - pooled.last_used < self.health_check_interval:
+            return True
+        try:
+            await pooled.conn.execute('SELECT 1', timeout=self.acquire_timeout)
+            return True
+        except (asyncpg.PostgresError, OSError, asyncio.TimeoutError):
+            return False
+
+    async def _checkout(self) -> PooledConnection:
+        while self._idle:
+            pooled = self._idle.pop()
+            if await self._is_healthy(pooled):
+                return pooled
+            await self._discard(pooled)
+        return await self._connect()
+
+    def _release(self, pooled: PooledConnection) -> None:
+        if pooled.conn.is_closed():
+            self.size -= 1
+            return
+        pooled.last_used = time.monotonic()
+        self._idle.append(pooled)
+
+    @asynccontextmanager
+    async def acquire(self):
+        await asyncio.wait_for(self._slots.acquire(), self.acquire_timeout)
+        try:
+            pooled = await self._checkout()
+            try:
+                yield pooled
+            except (asyncpg.PostgresConnectionError, asyncpg.InterfaceError, OSError):
+                await self._discard(pooled)
+                raise
+            except BaseException:
+                self._release(pooled)
+                raise
+            self._release(pooled)
+        finally:
+            self._slots.release()
+
+
+class PostgresBackend(StorageBackend):
+    """Native async Postgres backend (asyncpg) with a pooled connection layer"""
+
+    name = "postgres"
+
+    def __init__(self, dsn: str, **pool_options):
+        self.pool = ConnectionPool(dsn, statements=PREPARED_STATEMENTS, **pool_options)
+
+    @classmethod
+    def from_env(cls) -> "PostgresBackend":
+        dsn = os.environ.get('DATABASE_URL')
+        if not dsn:
+            raise ValueError("DATABASE_URL must be set to use the postgres backend")
+        return cls(
+            dsn,
+            min_size=int(os.environ.get('DB_POOL_MIN_SIZE', '1')),
+            max_size=int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+            acquire_timeout=float(os.environ.get('DB_POOL_ACQUIRE_TIMEOUT', '10')),
+            health_check_interval=float(os.environ.get('DB_POOL_HEALTH_CHECK_INTERVAL', '30')),
+        )
+
+    async def connect(self) -> None:
+        await self.pool.open()
+
+    async def warm(self, connections: int) -> None:
+        await self.pool.open(connections)
+
+    async def close(self) -> None:
+        await self.pool.close()
+
+    async def _prepared_one(self, name: str, *args) -> Optional[dict]:
+        async with self.pool.acquire() as pooled:
+            return record_to_dict(await pooled.statements[name].fetchrow(*args))
+
+    async def _prepared_all(self, name: str, *args) -> List[dict]:
+        async with self.pool.acquire() as pooled:
+            return [record_to_dict(r) for r in await pooled.statements[name].fetch(*args)]
+
+    async def _fetchrow(self, sql: str, *args) -> Optional[dict]:
+        async with self.pool.acquire() as pooled:
+            return record_to_dict(await pooled.conn.fetchrow(sql, *args))
+
+    async def _fetch(self, sql: str, *args) -> List[dict]:
+        async with self.pool.acquire() as pooled:
+            return [record_to_dict(r) for r in await pooled.conn.fetch(sql, *args)]
+
+    async def _insert(self, table: str, data: dict) -> Optional[dict]:
+        columns = list(data)
+        sql = 'INSERT INTO {} ({}) VALUES ({}) RETURNING *'.format(
+            _quote(table),
+            ', '.join(_quote(c) for c in columns),
+            ', '.join('$%d' % (i + 1) for i in range(len(columns))),
+        )
+        return await self._fetchrow(sql, *(_to_param(c, data[c]) for c in columns))
+
+    async def _insert_many(self, table: str, rows: List[dict], conflict_columns: str) -> List[dict]:
+        """One multi-row INSERT ... ON CONFLICT DO NOTHING; rows are shipped as a single jsonb array"""
+        if not rows:
+            return []
+        columns = ', '.join(_quote(c) for c in rows[0])
+        sql = '''
+            INSERT INTO {table} ({columns})
+            SELECT {columns} FROM jsonb_populate_recordset(NULL::{table}, $1::jsonb)
+            ON CONFLICT ({conflict}) DO NOTHING
+            RETURNING *
+        '''.format(table=_quote(table), columns=columns, conflict=conflict_columns)
+        payload = [{c: (v.value if isinstance(v, Enum) else v) for c, v in row.items()} for row in rows]
+        return await self._fetch(sql, payload)
+
+    async def _update(self, table: str, row_id: str, data: dict) -> Optional[dict]:
+        columns = list(data)
+        sql = 'UPDATE {} SET {} WHERE id = $1 RETURNING *'.format(
+            _quote(table),
+            ', '.join('%s = $%d' % (_quote(c), i + 2) for i, c in enumerate(columns)),
+        )
+        return await self._fetchrow(sql, row_id, *(_to_param(c, data[c]) for c in columns))
+
+    # User operations
+    async def create_user(self, user_data: dict) -> Optional[dict]:
+        return await self._insert('users', user_data)
+
+    async def get_user_by_email(self, email: str) -> Optional[dict]:
+        return await self._fetchrow('SELECT * FROM users WHERE email = $1', email)
+
+    async def get_user_by_id(self, user_id: str) -> Optional[dict]:
+        return await self._prepared_one('user_by_id', user_id)
+
+    async def update_user(self, user_id: str, user_data: dict) -> Optional[dict]:
+        return await self._update('users', user_id, user_data)
+
+    async def get_users_by_ids(self, user_ids: List[str]) -> List[dict]:
+        return await self._fetch('SELECT * FROM users WHERE id = ANY($1::uuid[])', user_ids)
+
+    async def get_users_by_emails(self, emails: List[str]) -> List[dict]:
+        return await self._fetch('SELECT * FROM users WHERE email = ANY($1::text[])', emails)
+
+    async def get_user_ids_updated_since(self, updated_since: str) -> List[str]:
+        rows = await self._fetch('SELECT id FROM users WHERE updated_at >= $1', _to_timestamp(updated_since))
+        return [row['id'] for row in rows]
+
+    async def create_users_bulk(self, users: List[dict]) -> List[dict]:
+        return await self._insert_many('users', users, 'email')
+
+    # Token operations
+    async def create_refresh_token(self, token_data: dict) -> Optional[dict]:
+        return await self._insert('refresh_tokens', token_data)
+
+    async def get_refresh_token(self, token_id: str) -> Optional[dict]:
+        return await self._fetchrow('SELECT * FROM refresh_tokens WHERE id = $1', token_id)
+
+    async def use_refresh_token(self, token_id: str, now: str) -> Optional[dict]:
+        return await self._fetchrow(
+            'UPDATE refresh_tokens SET revoked_at = $2 '
+            'WHERE id = $1 AND revoked_at IS NULL AND expires_at > $2 RETURNING *',
+            token_id, _to_timestamp(now),
+        )
+
+    async def revoke_user_refresh_tokens(self, user_id: str, now: str) -> int:
+        async with self.pool.acquire() as pooled:
+            result = await pooled.conn.execute(
+                'UPDATE refresh_tokens SET revoked_at = $2 WHERE user_id = $1 AND revoked_at IS NULL',
+                user_id, _to_timestamp(now),
+            )
+        return int(result.split()[-1])
+
+    async def delete_refresh_token(self, token_id: str, user_id: str) -> bool:
+        async with self.pool.acquire() as pooled:
+            result = await pooled.conn.execute(
+                'DELETE FROM refresh_tokens WHERE id = $1 AND user_id = $2', token_id, user_id)
+        return result != 'DELETE 0'
+
+    async def create_token_revocation(self, revocation_data: dict) -> Optional[dict]:
+        return await self._insert('token_revocations', revocation_data)
+
+    async def get_token_revocations(self, revoked_since: Optional[str], live_at: str) -> List[dict]:
+        if revoked_since is None:
+            return await self._fetch('SELECT * FROM token_revocations WHERE expires_at > $1', _to_timestamp(live_at))
+        return await self._fetch(
+            'SELECT * FROM token_revocations WHERE expires_at > $1 AND revoked_at >= $2',
+            _to_timestamp(live_at), _to_timestamp(revoked_since),
+        )
+
+    async def purge_expired_tokens(self, now: str) -> int:
+        purged = 0
+        async with self.pool.acquire() as pooled:
+            for table in ('refresh_tokens', 'token_revocations'):
+                result = await pooled.conn.execute(f'DELETE FROM {table} WHERE expires_at <= $1', _to_timestamp(now))
+                purged += int(result.split()[-1])
+        return purged
+
+    # Course operations
+    async def create_course(self, course_data: dict) -> Optional[dict]:
+        return await self._insert('courses', course_data)
+
+    async def get_courses(self, limit: int = 100, offset: int = 0, category: Optional[str] = None) -> List[dict]:
+        if category:
+            return await self._prepared_all('courses_by_category', limit, offset, category)
+        return await self._prepared_all('courses', limit, offset)
+
+    async def get_courses_after(self, limit: int = 100, after: Optional[Tuple[str, str]] = None, category: Optional[str] = None) -> List[dict]:
+        conditions, args = [], [limit]
+        if category:
+            args.append(category)
+            conditions.append('c.category = $%d' % len(args))
+        if after:
+            args.extend([_to_timestamp(after[0]), after[1]])
+            conditions.append('(c.created_at, c.id) < ($%d, $%d::uuid)' % (len(args) - 1, len(args)))
+        where = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+        return await self._fetch(COURSE_SELECT + where + ' ORDER BY c.created_at DESC, c.id DESC LIMIT $1', *args)
+
+    async def get_course_by_id(self, course_id: str) -> Optional[dict]:
+        return await self._prepared_one('course_by_id', course_id)
+
+    async def get_courses_by_ids(self, course_ids: List[str]) -> List[dict]:
+        return await self._fetch(COURSE_SELECT + ' WHERE c.id = ANY($1::uuid[])', course_ids)
+
+    async def get_courses_changed_page(self, changed_since: str, after_id: Optional[str] = None, limit: int = 500) -> List[dict]:
+        return await self._fetch(COURSE_SELECT + '''
+            WHERE (c.created_at >= $1 OR c.updated_at >= $1) AND ($2::uuid IS NULL OR c.id > $2::uuid)
+            ORDER BY c.id
+            LIMIT $3
+        ''', _to_timestamp(changed_since), after_id, limit)
+
+    async def search_courses(self, query: str, limit: int = 100, offset: int = 0, category: Optional[str] = None) -> List[dict]:
+        rows = await self._fetch('SELECT search_courses($1, $2, $3, $4) AS course', query, category, limit, offset)
+        return [row['course'] for row in rows]
+
+    async def update_course(self, course_id: str, course_data: dict, instructor_id: Optional[str] = None) -> Optional[dict]:
+        columns = list(course_data)
+        args = [course_id, *(_to_param(c, course_data[c]) for c in columns)]
+        condition = 'id = $1'
+        if instructor_id:
+            args.append(instructor_id)
+            condition += ' AND instructor_id = $%d' % len(args)
+        sql = '''
+            WITH c AS (UPDATE courses SET {} WHERE {} RETURNING *)
+            SELECT c.*, u.name AS instructor_name, u.avatar AS instructor_avatar
+            FROM c LEFT JOIN users u ON u.id = c.instructor_id
+        '''.format(', '.join('%s = $%d' % (_quote(c), i + 2) for i, c in enumerate(columns)), condition)
+        return await self._fetchrow(sql, *args)
+
+    async def delete_course(self, course_id: str) -> bool:
+        row = await self._fetchrow('DELETE FROM courses WHERE id = $1 RETURNING id', course_id)
+        return row is not None
+
+    # Enrollment operations
+    async def create_enrollment(self, enrollment_data: dict) -> Optional[dict]:
+        return await self._insert('enrollments', enrollment_data)
+
+    async def create_enrollments_bulk(self, enrollments: List[dict]) -> List[dict]:
+        return await self._insert_many('enrollments', enrollments, 'user_id, course_id')
+
+    async def get_user_enrollments(self, user_id: str) -> List[dict]:
+        return await self._fetch('''
+            SELECT e.*, to_jsonb(c) - 'search_vector' AS courses
+            FROM enrollments e
+            LEFT JOIN courses c ON c.id = e.course_id
+            WHERE e.user_id = $1
+        ''', user_id)
+
+    async def get_enrollment(self, user_id: str, course_id: str) -> Optional[dict]:
+        return await self._prepared_one('enrollment', user_id, course_id)
+
+    async def get_enrollment_by_id(self, enrollment_id: str) -> Optional[dict]:
+        return await self._fetchrow('SELECT * FROM enrollments WHERE id = $1', enrollment_id)
+
+    async def get_course_enrollments_page(self, course_id: str, after_id: Optional[str] = None, limit: int = 1000) -> List[dict]:
+        return await self._fetch('''
+            SELECT id, progress, completed_lessons, enrolled_at, completed_at
+            FROM enrollments
+            WHERE course_id = $1 AND ($2::uuid IS NULL OR id > $2::uuid)
+            ORDER BY id
+            LIMIT $3
+        ''', course_id, after_id, limit)
+
+    async def get_enrollment_pairs_page(self, after_id: Optional[str] = None, limit: int = 10000) -> List[dict]:
+        return await self._fetch('''
+            SELECT id, user_id, course_id
+            FROM enrollments
+            WHERE ($1::uuid IS NULL OR id > $1::uuid)
+            ORDER BY id
+            LIMIT $2
+        ''', after_id, limit)
+
+    async def update_enrollment_progress(self, enrollment_id: str, update_data: dict) -> Optional[dict]:
+        return await self._update('enrollments', enrollment_id, update_data)
+
+    async def update_enrollments_progress(self, updates: List[dict]) -> int:
+        if not updates:
+            return 0
+        async with self.pool.acquire() as pooled:
+            result = await pooled.conn.execute('''
+                UPDATE enrollments e
+                SET progress = u.progress,
+                    completed_lessons = u.completed_lessons,
+                    completed_at = COALESCE(u.completed_at, e.completed_at)
+                FROM unnest($1::uuid[], $2::float8[], $3::integer[], $4::timestamptz[])
+                    AS u(id, progress, completed_lessons, completed_at)
+                WHERE e.id = u.id
+            ''',
+                [u['id'] for u in updates],
+                [u['progress'] for u in updates],
+                [u['completed_lessons'] for u in updates],
+                [_to_param('completed_at', u.get('completed_at')) for u in updates],
+            )
+        return int(result.split()[-1])
+
+    # Rating operations
+    async def get_course_rating(self, user_id: str, course_id: str) -> Optional[dict]:
+        return await self._fetchrow(
+            'SELECT * FROM course_ratings WHERE user_id = $1 AND course_id = $2', user_id, course_id
+        )
+
+    async def upsert_course_rating(self, rating_data: dict) -> Optional[dict]:
+        columns = list(rating_data)
+        sql = '''
+            INSERT INTO course_ratings ({}) VALUES ({})
+            ON CONFLICT (user_id, course_id) DO UPDATE
+            SET rating = EXCLUDED.rating, review = EXCLUDED.review, updated_at = EXCLUDED.updated_at
+            RETURNING *
+        '''.format(
+            ', '.join(_quote(c) for c in columns),
+            ', '.join('$%d' % (i + 1) for i in range(len(columns))),
+        )
+        return await self._fetchrow(sql, *(_to_param(c, rating_data[c]) for c in columns))
+
+    # Course statistics (SQL functions from supabase/migrations/20261017_course_stats.sql)
+    async def apply_course_stat_deltas(self, deltas: List[dict]) -> int:
+        async with self.pool.acquire() as pooled:
+            return await pooled.conn.fetchval('SELECT apply_course_stat_deltas($1::jsonb)', deltas)
+
+    async def reconcile_course_stats(self) -> int:
+        async with self.pool.acquire() as pooled:
+            return await pooled.conn.fetchval('SELECT reconcile_course_stats()')
+
+    # Certificate operations
+    async def create_certificate(self, certificate_data: dict) -> Optional[dict]:
+        return await self._insert('certificates', certificate_data)
+
+    async def get_certificates(self, limit: int = 100, offset: int = 0) -> List[dict]:
+        return await self._fetch(
+            CERTIFICATE_SELECT + ' ORDER BY cert.issued_at DESC, cert.id DESC LIMIT $1 OFFSET $2',
+            limit, offset,
+        )
+
+    async def get_certificates_after(
+        self,
+        limit: int = 100,
+        after: Optional[Tuple[str, str]] = None,
+        course_id: Optional[str] = None,
+        instructor_id: Optional[str] = None,
+        issued_from: Optional[str] = None,
+        issued_to: Optional[str] = None,
+    ) -> List[dict]:
+        conditions, args = [], [limit]
+        if course_id:
+            args.append(course_id)
+            conditions.append('cert.course_id = $%d' % len(args))
+        if instructor_id:
+            args.append(instructor_id)
+            conditions.append('cert.instructor_id = $%d' % len(args))
+        if issued_from:
+            args.append(_to_timestamp(issued_from))
+            conditions.append('cert.issued_at >= $%d' % len(args))
+        if issued_to:
+            args.append(_to_timestamp(issued_to))
+            conditions.append('cert.issued_at < $%d' % len(args))
+        if after:
+            args.extend([_to_timestamp(after[0]), after[1]])
+            conditions.append('(cert.issued_at, cert.id) < ($%d, $%d::uuid)' % (len(args) - 1, len(args)))
+        where = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+        return await self._fetch(CERTIFICATE_SELECT + where + ' ORDER BY cert.issued_at DESC, cert.id DESC LIMIT $1', *args)
+
+    async def get_user_certificates(self, user_id: str) -> List[dict]:
+        return await self._fetch(CERTIFICATE_SELECT + ' WHERE cert.user_id = $1', user_id)
+
+    async def get_certificate_ids_page(self, after: Optional[Tuple[str, str]] = None, limit: int = 10000) -> List[dict]:
+        if after is None:
+            return await self._fetch(
+                'SELECT id, certificate_id, issued_at FROM certificates ORDER BY issued_at, id LIMIT $1', limit)
+        return await self._fetch('''
+            SELECT id, certificate_id, issued_at
+            FROM certificates
+            WHERE (issued_at, id) > ($1, $2::uuid)
+            ORDER BY issued_at, id
+            LIMIT $3
+        ''', _to_timestamp(after[0]), after[1], limit)
+
+    async def get_certificate(self, certificate_id: str) -> Optional[dict]:
+        return await self._fetchrow(CERTIFICATE_SELECT + ' WHERE cert.certificate_id = $1', certificate_id)
+
+    # Status check operations
+    async def create_status_check(self, status_data: dict) -> Optional[dict]:
+        return await self._insert('status_checks', status_data)
+
+    async def create_status_checks_bulk(self, status_checks: List[dict]) -> int:
+        return len(await self._insert_many('status_checks', status_checks, 'id'))
+
+    async def _time_series(self, table: str, time_column: str, limit: int, client_name: Optional[str],
+                           since: Optional[str], until: Optional[str], order: str) -> List[dict]:
+        conditions, args = [], [limit]
+        if client_name:
+            args.append(client_name)
+            conditions.append('client_name = $%d' % len(args))
+        if since:
+            args.append(_to_timestamp(since))
+            conditions.append('%s >= $%d' % (time_column, len(args)))
+        if until:
+            args.append(_to_timestamp(until))
+            conditions.append('%s < $%d' % (time_column, len(args)))
+        where = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+        return await self._fetch('SELECT * FROM %s%s ORDER BY %s LIMIT $1' % (table, where, order), *args)
+
+    async def get_status_checks(
+        self,
+        limit: int = 1000,
+        client_name: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> List[dict]:
+        return await self._time_series(
+            'status_checks', 'timestamp', limit, client_name, since, until, 'timestamp DESC, id DESC')
+
+    async def get_status_check_rollups(
+        self,
+        limit: int = 1000,
+        client_name: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> List[dict]:
+        return await self._time_series(
+            'status_check_rollups', 'bucket_start', limit, client_name, since, until,
+            'bucket_start DESC, client_name')
+
+    async def downsample_status_checks(self, raw_before: str, rollups_before: str) -> dict:
+        async with self.pool.acquire() as pooled:
+            return await pooled.conn.fetchval(
+                'SELECT downsample_status_checks($1, $2)', _to_timestamp(raw_before), _to_timestamp(rollups_before)
+            )
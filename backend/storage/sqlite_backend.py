@@ -0,0 +1,569 @@
+import sqlite3
+import threading
+from enum import Enum
+from typing import Optional, List, Tuple
+
+from backend.storage.base import StorageBackend
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS users (
+  id TEXT PRIMARY KEY,
+  email TEXT UNIQUE NOT NULL,
+  name TEXT NOT NULL,
+  password TEXT NOT NULL,
+  role TEXT DEFAULT 'student',
+  avatar TEXT,
+  bio TEXT,
+  phone TEXT,
+  created_at TEXT,
+  updated_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS courses (
+  id TEXT PRIMARY KEY,
+  title TEXT NOT NULL,
+  description TEXT NOT NULL,
+  category TEXT NOT NULL,
+  duration TEXT NOT NULL,
+  image TEXT NOT NULL,
+  gradient TEXT NOT NULL,
+  icon TEXT NOT NULL,
+  instructor_id TEXT REFERENCES users(id) ON DELETE CASCADE,
+  video_url TEXT,
+  lessons INTEGER DEFAULT 0,
+  price REAL DEFAULT 0.0,
+  students INTEGER DEFAULT 0,
+  rating REAL DEFAULT 0.0,
+  completions INTEGER DEFAULT 0,
+  rating_count INTEGER DEFAULT 0,
+  rating_sum REAL DEFAULT 0.0,
+  created_at TEXT,
+  updated_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS enrollments (
+  id TEXT PRIMARY KEY,
+  user_id TEXT REFERENCES users(id) ON DELETE CASCADE,
+  course_id TEXT REFERENCES courses(id) ON DELETE CASCADE,
+  progress REAL DEFAULT 0.0,
+  completed_lessons INTEGER DEFAULT 0,
+  enrolled_at TEXT,
+  completed_at TEXT,
+  UNIQUE(user_id, course_id)
+);
+
+CREATE TABLE IF NOT EXISTS certificates (
+  id TEXT PRIMARY KEY,
+  user_id TEXT REFERENCES users(id) ON DELETE CASCADE,
+  course_id TEXT REFERENCES courses(id) ON DELETE CASCADE,
+  instructor_id TEXT REFERENCES users(id) ON DELETE CASCADE,
+  certificate_id TEXT UNIQUE NOT NULL,
+  grade TEXT NOT NULL,
+  issued_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS course_ratings (
+  id TEXT PRIMARY KEY,
+  user_id TEXT REFERENCES users(id) ON DELETE CASCADE,
+  course_id TEXT REFERENCES courses(id) ON DELETE CASCADE,
+  rating INTEGER NOT NULL CHECK (rating BETWEEN 1 AND 5),
+  review TEXT,
+  created_at TEXT,
+  updated_at TEXT,
+  UNIQUE(user_id, course_id)
+);
+
+CREATE INDEX IF NOT EXISTS courses_created_at_id_idx ON courses (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS certificates_issued_at_id_idx ON certificates (issued_at DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS refresh_tokens (
+  id TEXT PRIMARY KEY,
+  user_id TEXT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  created_at TEXT,
+  expires_at TEXT NOT NULL,
+  revoked_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS token_revocations (
+  id TEXT PRIMARY KEY,
+  jti TEXT,
+  user_id TEXT REFERENCES users(id) ON DELETE CASCADE,
+  revoked_at TEXT NOT NULL,
+  expires_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS refresh_tokens_user_id_idx ON refresh_tokens (user_id);
+CREATE INDEX IF NOT EXISTS token_revocations_revoked_at_idx ON token_revocations (revoked_at);
+
+CREATE TABLE IF NOT EXISTS status_checks (
+  id TEXT PRIMARY KEY,
+  client_name TEXT NOT NULL,
+  timestamp TEXT
+);
+
+CREATE TABLE IF NOT EXISTS status_check_rollups (
+  client_name TEXT NOT NULL,
+  bucket_start TEXT NOT NULL,
+  checks INTEGER NOT NULL,
+  first_seen TEXT NOT NULL,
+  last_seen TEXT NOT NULL,
+  PRIMARY KEY (client_name, bucket_start)
+);
+
+CREATE INDEX IF NOT EXISTS status_checks_timestamp_id_idx ON status_checks (timestamp DESC, id DESC);
+CREATE INDEX IF NOT EXISTS status_checks_client_timestamp_id_idx ON status_checks (client_name, timestamp DESC, id DESC);
+CREATE INDEX IF NOT EXISTS status_check_rollups_bucket_start_idx ON status_check_rollups (bucket_start DESC);
+'''
+
+COURSE_SELECT = '''
+    SELECT c.*, u.name AS instructor_name, u.avatar AS instructor_avatar
+    FROM courses c
+    LEFT JOIN users u ON u.id = c.instructor_id
+'''
+
+CERTIFICATE_SELECT = '''
+    SELECT cert.*, s.name AS student_name, c.title AS course_name, i.name AS instructor_name
+    FROM certificates cert
+    LEFT JOIN users s ON s.id = cert.user_id
+    LEFT JOIN courses c ON c.id = cert.course_id
+    LEFT JOIN users i ON i.id = cert.instructor_id
+'''
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _to_param(value):
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+class SQLiteBackend(StorageBackend):
+    """In-process SQLite backend for tests and local development.
+
+    Queries run inline on the event loop: an in-memory database answers in
+    microseconds, so handing them to a thread pool would only add overhead.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str = ':memory:'):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+
+    async def close(self) -> None:
+        self.conn.close()
+
+    def _fetchrow(self, sql: str, *args) -> Optional[dict]:
+        with self.lock:
+            row = self.conn.execute(sql, args).fetchone()
+        return dict(row) if row is not None else None
+
+    def _fetch(self, sql: str, *args) -> List[dict]:
+        with self.lock:
+            rows = self.conn.execute(sql, args).fetchall()
+        return [dict(row) for row in rows]
+
+    def _insert(self, table: str, data: dict) -> Optional[dict]:
+        columns = list(data)
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            _quote(table), ', '.join(_quote(c) for c in columns), ', '.join('?' for _ in columns)
+        )
+        with self.lock, self.conn:
+            self.conn.execute(sql, [_to_param(data[c]) for c in columns])
+        return self._fetchrow('SELECT * FROM {} WHERE id = ?'.format(_quote(table)), data['id'])
+
+    def _insert_many(self, table: str, rows: List[dict]) -> List[dict]:
+        """INSERT OR IGNORE every row in one transaction; returns the rows actually inserted, in input order"""
+        if not rows:
+            return []
+        columns = list(rows[0])
+        sql = 'INSERT OR IGNORE INTO {} ({}) VALUES ({})'.format(
+            _quote(table), ', '.join(_quote(c) for c in columns), ', '.join('?' for _ in columns)
+        )
+        inserted_ids = []
+        with self.lock, self.conn:
+            for row in rows:
+                if self.conn.execute(sql, [_to_param(row[c]) for c in columns]).rowcount:
+                    inserted_ids.append(row['id'])
+        if not inserted_ids:
+            return []
+        placeholders = ', '.join('?' for _ in inserted_ids)
+        fetched = self._fetch('SELECT * FROM {} WHERE id IN ({})'.format(_quote(table), placeholders), *inserted_ids)
+        # IN () comes back in arbitrary order; keep input order like RETURNING does
+        by_id = {row['id']: row for row in fetched}
+        return [by_id[row_id] for row_id in inserted_ids]
+
+    def _update(self, table: str, row_id: str, data: dict) -> Optional[dict]:
+        columns = list(data)
+        sql = 'UPDATE {} SET {} WHERE id = ?'.format(
+            _quote(table), ', '.join('%s = ?' % _quote(c) for c in columns)
+        )
+        with self.lock, self.conn:
+            self.conn.execute(sql, [_to_param(data[c]) for c in columns] + [row_id])
+        return self._fetchrow('SELECT * FROM {} WHERE id = ?'.format(_quote(table)), row_id)
+
+    # User operations
+    async def create_user(self, user_data: dict) -> Optional[dict]:
+        return self._insert('users', user_data)
+
+    async def get_user_by_email(self, email: str) -> Optional[dict]:
+        return self._fetchrow('SELECT * FROM users WHERE email = ?', email)
+
+    async def get_user_by_id(self, user_id: str) -> Optional[dict]:
+        return self._fetchrow('SELECT * FROM users WHERE id = ?', user_id)
+
+    async def update_user(self, user_id: str, user_data: dict) -> Optional[dict]:
+        return self._update('users', user_id, user_data)
+
+    async def get_users_by_ids(self, user_ids: List[str]) -> List[dict]:
+        if not user_ids:
+            return []
+        placeholders = ', '.join('?' for _ in user_ids)
+        return self._fetch(f'SELECT * FROM users WHERE id IN ({placeholders})', *user_ids)
+
+    async def get_users_by_emails(self, emails: List[str]) -> List[dict]:
+        if not emails:
+            return []
+        placeholders = ', '.join('?' for _ in emails)
+        return self._fetch(f'SELECT * FROM users WHERE email IN ({placeholders})', *emails)
+
+    async def get_user_ids_updated_since(self, updated_since: str) -> List[str]:
+        return [row['id'] for row in self._fetch('SELECT id FROM users WHERE updated_at >= ?', updated_since)]
+
+    async def create_users_bulk(self, users: List[dict]) -> List[dict]:
+        return self._insert_many('users', users)
+
+    # Token operations
+    async def create_refresh_token(self, token_data: dict) -> Optional[dict]:
+        return self._insert('refresh_tokens', token_data)
+
+    async def get_refresh_token(self, token_id: str) -> Optional[dict]:
+        return self._fetchrow('SELECT * FROM refresh_tokens WHERE id = ?', token_id)
+
+    async def use_refresh_token(self, token_id: str, now: str) -> Optional[dict]:
+        with self.lock, self.conn:
+            row = self.conn.execute(
+                'UPDATE refresh_tokens SET revoked_at = ? '
+                'WHERE id = ? AND revoked_at IS NULL AND expires_at > ? RETURNING *',
+                (now, token_id, now),
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    async def revoke_user_refresh_tokens(self, user_id: str, now: str) -> int:
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                'UPDATE refresh_tokens SET revoked_at = ? WHERE user_id = ? AND revoked_at IS NULL', (now, user_id)
+            )
+        return cursor.rowcount
+
+    async def delete_refresh_token(self, token_id: str, user_id: str) -> bool:
+        with self.lock, self.conn:
+            cursor = self.conn.execute('DELETE FROM refresh_tokens WHERE id = ? AND user_id = ?', (token_id, user_id))
+        return cursor.rowcount > 0
+
+    async def create_token_revocation(self, revocation_data: dict) -> Optional[dict]:
+        return self._insert('token_revocations', revocation_data)
+
+    async def get_token_revocations(self, revoked_since: Optional[str], live_at: str) -> List[dict]:
+        if revoked_since is None:
+            return self._fetch('SELECT * FROM token_revocations WHERE expires_at > ?', live_at)
+        return self._fetch(
+            'SELECT * FROM token_revocations WHERE expires_at > ? AND revoked_at >= ?', live_at, revoked_since
+        )
+
+    async def purge_expired_tokens(self, now: str) -> int:
+        with self.lock, self.conn:
+            purged = self.conn.execute('DELETE FROM refresh_tokens WHERE expires_at <= ?', (now,)).rowcount
+            purged += self.conn.execute('DELETE FROM token_revocations WHERE expires_at <= ?', (now,)).rowcount
+        return purged
+
+    # Course operations
+    async def create_course(self, course_data: dict) -> Optional[dict]:
+        return self._insert('courses', course_data)
+
+    async def get_courses(self, limit: int = 100, offset: int = 0, category: Optional[str] = None) -> List[dict]:
+        if category:
+            return self._fetch(
+                COURSE_SELECT + ' WHERE c.category = ? ORDER BY c.created_at DESC, c.id DESC LIMIT ? OFFSET ?',
+                category, limit, offset,
+            )
+        return self._fetch(COURSE_SELECT + ' ORDER BY c.created_at DESC, c.id DESC LIMIT ? OFFSET ?', limit, offset)
+
+    async def get_courses_after(self, limit: int = 100, after: Optional[Tuple[str, str]] = None, category: Optional[str] = None) -> List[dict]:
+        conditions, args = [], []
+        if category:
+            conditions.append('c.category = ?')
+            args.append(category)
+        if after:
+            conditions.append('(c.created_at, c.id) < (?, ?)')
+            args.extend(after)
+        where = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+        return self._fetch(COURSE_SELECT + where + ' ORDER BY c.created_at DESC, c.id DESC LIMIT ?', *args, limit)
+
+    async def get_course_by_id(self, course_id: str) -> Optional[dict]:
+        return self._fetchrow(COURSE_SELECT + ' WHERE c.id = ?', course_id)
+
+    async def get_courses_by_ids(self, course_ids: List[str]) -> List[dict]:
+        if not course_ids:
+            return []
+        placeholders = ', '.join('?' for _ in course_ids)
+        return self._fetch(COURSE_SELECT + f' WHERE c.id IN ({placeholders})', *course_ids)
+
+    async def get_courses_changed_page(self, changed_since: str, after_id: Optional[str] = None, limit: int = 500) -> List[dict]:
+        return self._fetch(
+            COURSE_SELECT + ' WHERE (c.created_at >= ? OR c.updated_at >= ?) AND c.id > ? ORDER BY c.id LIMIT ?',
+            changed_since, changed_since, after_id or '', limit,
+        )
+
+    async def search_courses(self, query: str, limit: int = 100, offset: int = 0, category: Optional[str] = None) -> List[dict]:
+        # No full-text index here: rank LIKE matches by the field they hit
+        pattern = f'%{query.lower()}%'
+        sql = COURSE_SELECT + '''
+            WHERE (lower(c.title) LIKE ? OR lower(c.description) LIKE ? OR lower(c.category) LIKE ?)
+              AND (? IS NULL OR c.category = ?)
+            ORDER BY (lower(c.title) LIKE ?) * 3 + (lower(c.category) LIKE ?) * 2 + (lower(c.description) LIKE ?) DESC, c.id
+            LIMIT ? OFFSET ?
+        '''
+        return self._fetch(sql, pattern, pattern, pattern, category, category, pattern, pattern, pattern, limit, offset)
+
+    async def update_course(self, course_id: str, course_data: dict, instructor_id: Optional[str] = None) -> Optional[dict]:
+        columns = list(course_data)
+        args = [_to_param(course_data[c]) for c in columns] + [course_id]
+        condition = 'id = ?'
+        if instructor_id:
+            condition += ' AND instructor_id = ?'
+            args.append(instructor_id)
+        sql = 'UPDATE courses SET {} WHERE {}'.format(', '.join('%s = ?' % _quote(c) for c in columns), condition)
+        with self.lock, self.conn:
+            cursor = self.conn.execute(sql, args)
+        if cursor.rowcount == 0:
+            return None
+        return self._fetchrow(COURSE_SELECT + ' WHERE c.id = ?', course_id)
+
+    async def delete_course(self, course_id: str) -> bool:
+        with self.lock, self.conn:
+            cursor = self.conn.execute('DELETE FROM courses WHERE id = ?', (course_id,))
+        return cursor.rowcount > 0
+
+    # Enrollment operations
+    async def create_enrollment(self, enrollment_data: dict) -> Optional[dict]:
+        return self._insert('enrollments', enrollment_data)
+
+    async def create_enrollments_bulk(self, enrollments: List[dict]) -> List[dict]:
+        return self._insert_many('enrollments', enrollments)
+
+    async def get_user_enrollments(self, user_id: str) -> List[dict]:
+        enrollments = self._fetch('SELECT * FROM enrollments WHERE user_id = ?', user_id)
+        for enrollment in enrollments:
+            enrollment['courses'] = self._fetchrow('SELECT * FROM courses WHERE id = ?', enrollment['course_id'])
+        return enrollments
+
+    async def get_enrollment(self, user_id: str, course_id: str) -> Optional[dict]:
+        return self._fetchrow('SELECT * FROM enrollments WHERE user_id = ? AND course_id = ?', user_id, course_id)
+
+    async def get_enrollment_by_id(self, enrollment_id: str) -> Optional[dict]:
+        return self._fetchrow('SELECT * FROM enrollments WHERE id = ?', enrollment_id)
+
+    async def get_course_enrollments_page(self, course_id: str, after_id: Optional[str] = None, limit: int = 1000) -> List[dict]:
+        return self._fetch(
+            'SELECT id, progress, completed_lessons, enrolled_at, completed_at FROM enrollments '
+            'WHERE course_id = ? AND id > ? ORDER BY id LIMIT ?',
+            course_id, after_id or '', limit,
+        )
+
+    async def get_enrollment_pairs_page(self, after_id: Optional[str] = None, limit: int = 10000) -> List[dict]:
+        return self._fetch(
+            'SELECT id, user_id, course_id FROM enrollments WHERE id > ? ORDER BY id LIMIT ?',
+            after_id or '', limit,
+        )
+
+    async def update_enrollment_progress(self, enrollment_id: str, update_data: dict) -> Optional[dict]:
+        return self._update('enrollments', enrollment_id, update_data)
+
+    async def update_enrollments_progress(self, updates: List[dict]) -> int:
+        with self.lock, self.conn:
+            cursor = self.conn.executemany(
+                'UPDATE enrollments SET progress = ?, completed_lessons = ?, '
+                'completed_at = COALESCE(?, completed_at) WHERE id = ?',
+                [(u['progress'], u['completed_lessons'], u.get('completed_at'), u['id']) for u in updates],
+            )
+        return cursor.rowcount
+
+    # Rating operations
+    async def get_course_rating(self, user_id: str, course_id: str) -> Optional[dict]:
+        return self._fetchrow('SELECT * FROM course_ratings WHERE user_id = ? AND course_id = ?', user_id, course_id)
+
+    async def upsert_course_rating(self, rating_data: dict) -> Optional[dict]:
+        columns = list(rating_data)
+        sql = (
+            'INSERT INTO course_ratings ({}) VALUES ({}) ON CONFLICT (user_id, course_id) DO UPDATE '
+            'SET rating = excluded.rating, review = excluded.review, updated_at = excluded.updated_at'
+        ).format(', '.join(_quote(c) for c in columns), ', '.join('?' for _ in columns))
+        with self.lock, self.conn:
+            self.conn.execute(sql, [_to_param(rating_data[c]) for c in columns])
+        return await self.get_course_rating(rating_data['user_id'], rating_data['course_id'])
+
+    # Course statistics
+    async def apply_course_stat_deltas(self, deltas: List[dict]) -> int:
+        with self.lock, self.conn:
+            cursor = self.conn.executemany(
+                'UPDATE courses SET students = students + :students, completions = completions + :completions, '
+                'rating_count = rating_count + :rating_count, rating_sum = rating_sum + :rating_sum, '
+                'rating = CASE WHEN rating_count + :rating_count > 0 '
+                'THEN ROUND((rating_sum + :rating_sum) / (rating_count + :rating_count), 2) ELSE 0 END '
+                'WHERE id = :course_id',
+                deltas,
+            )
+        return cursor.rowcount
+
+    async def reconcile_course_stats(self) -> int:
+        with self.lock, self.conn:
+            # cursor.rowcount is -1 for statements starting with WITH
+            changes = self.conn.total_changes
+            self.conn.execute('''
+                WITH s AS (
+                    SELECT c.id,
+                           (SELECT COUNT(*) FROM enrollments e WHERE e.course_id = c.id) AS students,
+                           (SELECT COUNT(completed_at) FROM enrollments e WHERE e.course_id = c.id) AS completions,
+                           (SELECT COUNT(*) FROM course_ratings r WHERE r.course_id = c.id) AS rating_count,
+                           (SELECT COALESCE(SUM(rating), 0.0) FROM course_ratings r WHERE r.course_id = c.id) AS rating_sum
+                    FROM courses c
+                )
+                UPDATE courses SET
+                    students = s.students, completions = s.completions,
+                    rating_count = s.rating_count, rating_sum = s.rating_sum,
+                    rating = CASE WHEN s.rating_count > 0 THEN ROUND(s.rating_sum / s.rating_count, 2) ELSE 0 END
+                FROM s
+                WHERE courses.id = s.id
+                  AND (courses.students, courses.completions, courses.rating_count, courses.rating_sum)
+                      IS NOT (s.students, s.completions, s.rating_count, s.rating_sum)
+            ''')
+            changes = self.conn.total_changes - changes
+        return changes
+
+    # Certificate operations
+    async def create_certificate(self, certificate_data: dict) -> Optional[dict]:
+        return self._insert('certificates', certificate_data)
+
+    async def get_certificates(self, limit: int = 100, offset: int = 0) -> List[dict]:
+        return self._fetch(
+            CERTIFICATE_SELECT + ' ORDER BY cert.issued_at DESC, cert.id DESC LIMIT ? OFFSET ?', limit, offset
+        )
+
+    async def get_certificates_after(
+        self,
+        limit: int = 100,
+        after: Optional[Tuple[str, str]] = None,
+        course_id: Optional[str] = None,
+        instructor_id: Optional[str] = None,
+        issued_from: Optional[str] = None,
+        issued_to: Optional[str] = None,
+    ) -> List[dict]:
+        conditions, args = [], []
+        if course_id:
+            conditions.append('cert.course_id = ?')
+            args.append(course_id)
+        if instructor_id:
+            conditions.append('cert.instructor_id = ?')
+            args.append(instructor_id)
+        if issued_from:
+            conditions.append('cert.issued_at >= ?')
+            args.append(issued_from)
+        if issued_to:
+            conditions.append('cert.issued_at < ?')
+            args.append(issued_to)
+        if after:
+            conditions.append('(cert.issued_at, cert.id) < (?, ?)')
+            args.extend(after)
+        where = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+        return self._fetch(CERTIFICATE_SELECT + where + ' ORDER BY cert.issued_at DESC, cert.id DESC LIMIT ?', *args, limit)
+
+    async def get_user_certificates(self, user_id: str) -> List[dict]:
+        return self._fetch(CERTIFICATE_SELECT + ' WHERE cert.user_id = ?', user_id)
+
+    async def get_certificate_ids_page(self, after: Optional[Tuple[str, str]] = None, limit: int = 10000) -> List[dict]:
+        sort_value, row_id = after or ('', '')
+        return self._fetch(
+            'SELECT id, certificate_id, issued_at FROM certificates WHERE (issued_at, id) > (?, ?) '
+            'ORDER BY issued_at, id LIMIT ?',
+            sort_value, row_id, limit,
+        )
+
+    async def get_certificate(self, certificate_id: str) -> Optional[dict]:
+        return self._fetchrow(CERTIFICATE_SELECT + ' WHERE cert.certificate_id = ?', certificate_id)
+
+    # Status check operations
+    async def create_status_check(self, status_data: dict) -> Optional[dict]:
+        return self._insert('status_checks', status_data)
+
+    async def create_status_checks_bulk(self, status_checks: List[dict]) -> int:
+        if not status_checks:
+            return 0
+        with self.lock, self.conn:
+            cursor = self.conn.executemany(
+                'INSERT OR IGNORE INTO status_checks (id, client_name, timestamp) VALUES (:id, :client_name, :timestamp)',
+                status_checks,
+            )
+        return cursor.rowcount
+
+    def _time_series(self, table: str, time_column: str, limit: int, client_name: Optional[str],
+                     since: Optional[str], until: Optional[str], order: str) -> List[dict]:
+        conditions, args = [], []
+        if client_name:
+            conditions.append('client_name = ?')
+            args.append(client_name)
+        if since:
+            conditions.append('%s >= ?' % time_column)
+            args.append(since)
+        if until:
+            conditions.append('%s < ?' % time_column)
+            args.append(until)
+        where = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+        return self._fetch('SELECT * FROM %s%s ORDER BY %s LIMIT ?' % (table, where, order), *args, limit)
+
+    async def get_status_checks(
+        self,
+        limit: int = 1000,
+        client_name: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> List[dict]:
+        return self._time_series(
+            'status_checks', 'timestamp', limit, client_name, since, until, 'timestamp DESC, id DESC')
+
+    async def get_status_check_rollups(
+        self,
+        limit: int = 1000,
+        client_name: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> List[dict]:
+        return self._time_series(
+            'status_check_rollups', 'bucket_start', limit, client_name, since, until,
+            'bucket_start DESC, client_name')
+
+    async def downsample_status_checks(self, raw_before: str, rollups_before: str) -> dict:
+        with self.lock, self.conn:
+            changes = self.conn.total_changes
+            self.conn.execute('''
+                INSERT INTO status_check_rollups (client_name, bucket_start, checks, first_seen, last_seen)
+                SELECT client_name, strftime('%Y-%m-%dT%H:00:00', timestamp), COUNT(*), MIN(timestamp), MAX(timestamp)
+                FROM status_checks
+                WHERE timestamp < ?
+                GROUP BY 1, 2
+                ON CONFLICT (client_name, bucket_start) DO UPDATE SET
+                    checks = checks + excluded.checks,
+                    first_seen = MIN(first_seen, excluded.first_seen),
+                    last_seen = MAX(last_seen, excluded.last_seen)
+            ''', (raw_before,))
+            rollups_written = self.conn.total_changes - changes
+            raw_deleted = self.conn.execute('DELETE FROM status_checks WHERE timestamp < ?', (raw_before,)).rowcount
+            rollups_expired = self.conn.execute(
+                'DELETE FROM status_check_rollups WHERE bucket_start < ?', (rollups_before,)).rowcount
+        return {'raw_deleted': raw_deleted, 'rollups_written': rollups_written, 'rollups_expired': rollups_expired}
@@ -0,0 +1,472 @@
+import os
+import time
+import asyncio
+from functools import wraps
+from typing import Optional, List, Tuple
+
+from postgrest.types import ReturnMethod
+from supabase import create_client, Client
+
+from backend.executor import db_executor
+from backend.metrics import db_query_duration, db_query_errors
+from backend.resilience import resilience
+from backend.storage.base import StorageBackend
+
+COURSE_COLUMNS = '''
+    *,
+    users!courses_instructor_id_fkey(name, avatar)
+'''
+
+CERTIFICATE_COLUMNS = '''
+    *,
+    users!certificates_user_id_fkey(name),
+    courses!certificates_course_id_fkey(title),
+    instructors:users!certificates_instructor_id_fkey(name)
+'''
+
+
+def keyset_filter(sort_column: str, after: Tuple[str, str], descending: bool = True) -> str:
+    """PostgREST `or` filter for rows strictly after `after` in (sort_column, id) DESC (or ASC) order"""
+    sort_value, row_id = after
+    op = 'lt' if descending else 'gt'
+    return f'{sort_column}.{op}."{sort_value}",and({sort_column}.eq."{sort_value}",id.{op}.{row_id})'
+
+
+def async_supabase(table: str, hedge: bool = False):
+    """Decorator to run a sync Supabase call on the dedicated DB executor (timed per method).
+
+    Calls go through the resilience policy: a per-`table` circuit breaker and
+    a deadline on every call, retries for reads (get_/search_ methods, which
+    are idempotent) and, with `hedge`, a hedged duplicate for slow point reads.
+    """
+    def decorator(func):
+        method = func.__name__
+        read = method.startswith(('get_', 'search_', '_ping'))
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await resilience.call(table, method, lambda: db_executor.run(func, *args, **kwargs),
+                                             read=read, hedge=hedge)
+            except Exception as exc:
+                db_query_errors.inc('supabase', method, type(exc).__name__)
+                raise
+            finally:
+                db_query_duration.observe(time.perf_counter() - started, 'supabase', method)
+        return wrapper
+    return decorator
+
+
+def flatten_course(course: dict) -> dict:
+    """Replace the embedded instructor row with instructor_name/instructor_avatar (in place)"""
+    instructor = course.pop('users', None)
+    if instructor:
+        course['instructor_name'] = instructor['name']
+        course['instructor_avatar'] = instructor['avatar']
+    return course
+
+
+def flatten_certificate(cert: dict) -> dict:
+    """Replace the embedded student/course/instructor rows with their names (in place)"""
+    student = cert.pop('users', None)
+    if student:
+        cert['student_name'] = student['name']
+    course = cert.pop('courses', None)
+    if course:
+        cert['course_name'] = course['title']
+    instructor = cert.pop('instructors', None)
+    if instructor:
+        cert['instructor_name'] = instructor['name']
+    return cert
+
+
+class SupabaseBackend(StorageBackend):
+    """Supabase (PostgREST over HTTP) backend; sync client calls run on the DB executor"""
+
+    name = "supabase"
+
+    def __init__(self, client: Optional[Client] = None):
+        if client is None:
+            supabase_url = os.environ.get('SUPABASE_URL')
+            # Only the service key reaches the token tables and the functions revoked from anon clients
+            supabase_key = os.environ.get('SUPABASE_SERVICE_ROLE_KEY')
+            if not supabase_url or not supabase_key:
+                raise ValueError(
+                    "SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set in environment variables "
+                    "(the anon key cannot reach the token tables or the maintenance functions)"
+                )
+            client = create_client(supabase_url, supabase_key)
+        self.supabase = client
+
+    async def warm(self, connections: int) -> None:
+        # Concurrent cheap reads open that many keep-alive HTTP connections (and executor threads)
+        await asyncio.gather(*(self._ping() for _ in range(connections)))
+
+    @async_supabase('courses')
+    def _ping(self) -> None:
+        self.supabase.table('courses').select('id').limit(1).execute()
+
+    # User operations
+    @async_supabase('users')
+    def create_user(self, user_data: dict) -> Optional[dict]:
+        result = self.supabase.table('users').insert(user_data).execute()
+        return result.data[0] if result.data else None
+
+    @async_supabase('users')
+    def get_user_by_email(self, email: str) -> Optional[dict]:
+        result = self.supabase.table('users').select('*').eq('email', email).execute()
+        return result.data[0] if result.data else None
+
+    @async_supabase('users', hedge=True)
+    def get_user_by_id(self, user_id: str) -> Optional[dict]:
+        result = self.supabase.table('users').select('*').eq('id', user_id).execute()
+        return result.data[0] if result.data else None
+
+    @async_supabase('users')
+    def update_user(self, user_id: str, user_data: dict) -> Optional[dict]:
+        result = self.supabase.table('users').update(user_data).eq('id', user_id).execute()
+        return result.data[0] if result.data else None
+
+    @async_supabase('users', hedge=True)
+    def get_users_by_ids(self, user_ids: List[str]) -> List[dict]:
+        result = self.supabase.table('users').select('*').in_('id', user_ids).execute()
+        return result.data
+
+    @async_supabase('users')
+    def get_users_by_emails(self, emails: List[str]) -> List[dict]:
+        result = self.supabase.table('users').select('*').in_('email', emails).execute()
+        return result.data
+
+    @async_supabase('users')
+    def get_user_ids_updated_since(self, updated_since: str) -> List[str]:
+        result = self.supabase.table('users').select('id').gte('updated_at', updated_since).execute()
+        return [row['id'] for row in result.data]
+
+    @async_supabase('users')
+    def create_users_bulk(self, users: List[dict]) -> List[dict]:
+        result = self.supabase.table('users').upsert(users, on_conflict='email', ignore_duplicates=True).execute()
+        return result.data
+
+    # Token operations
+    @async_supabase('refresh_tokens')
+    def create_refresh_token(self, token_data: dict) -> Optional[dict]:
+        result = self.supabase.table('refresh_tokens').insert(token_data).execute()
+        return result.data[0] if result.data else None
+
+    @async_supabase('refresh_tokens')
+    def get_refresh_token(self, token_id: str) -> Optional[dict]:
+        result = self.supabase.table('refresh_tokens').select('*').eq('id', token_id).execute()
+        return result.data[0] if result.data else None
+
+    @async_supabase('refresh_tokens')
+    def use_refresh_token(self, token_id: str, now: str) -> Optional[dict]:
+        # The filters make the UPDATE itself the check, so two concurrent uses cannot both succeed
+        result = self.supabase.table('refresh_tokens').update({'revoked_at': now}) \
+            .eq('id', token_id).is_('revoked_at', 'null').gt('expires_at', now).execute()
+        return result.data[0] if result.data else None
+
+    @async_supabase('refresh_tokens')
+    def revoke_user_refresh_tokens(self, user_id: str, now: str) -> int:
+        result = self.supabase.table('refresh_tokens').update({'revoked_at': now}) \
+            .eq('user_id', user_id).is_('revoked_at', 'null').execute()
+        return len(result.data)
+
+    @async_supabase('refresh_tokens')
+    def delete_refresh_token(self, token_id: str, user_id: str) -> bool:
+        result = self.supabase.table('refresh_tokens').delete().eq('id', token_id).eq('user_id', user_id).execute()
+        return len(result.data) > 0
+
+    @async_supabase('token_revocations')
+    def create_token_revocation(self, revocation_data: dict) -> Optional[dict]:
+        result = self.supabase.table('token_revocations').insert(revocation_data).execute()
+        return result.data[0] if result.data else None
+
+    @async_supabase('token_revocations')
+    def get_token_revocations(self, revoked_since: Optional[str], live_at: str) -> List[dict]:
+        query = self.supabase.table('token_revocations').select('*').gt('expires_at', live_at)
+        if revoked_since is not None:
+            query = query.gte('revoked_at', revoked_since)
+        return query.execute().data
+
+    @async_supabase('refresh_tokens')
+    def purge_expired_tokens(self, now: str) -> int:
+        purged = 0
+        for table in ('refresh_tokens', 'token_revocations'):
+            purged += len(self.supabase.table(table).delete().lte('expires_at', now).execute().data)
+        return purged
+
+    # Course operations
+    @async_supabase('courses')
+    def create_course(self, course_data: dict) -> Optional[dict]:
+        result = self.supabase.table('courses').insert(course_data).execute()
+        return result.data[0] if result.data else None
+
+    @async_supabase('courses')
+    def get_courses(self, limit: int = 100, offset: int = 0, category: Optional[str] = None) -> List[dict]:
+        query = self.supabase.table('courses').select(COURSE_COLUMNS) \
+            .order('created_at', desc=True).order('id', desc=True) \
+            .range(offset, offset + limit - 1)
+
+        if category:
+            query = query.eq('category', category)
+
+        result = query.execute()
+        return [flatten_course(course) for course in result.data]
+
+    @async_supabase('courses')
+    def get_courses_after(self, limit: int = 100, after: Optional[Tuple[str, str]] = None, category: Optional[str] = None) -> List[dict]:
+        query = self.supabase.table('courses').select(COURSE_COLUMNS) \
+            .order('created_at', desc=True).order('id', desc=True) \
+            .limit(limit)
+
+        if category:
+            query = query.eq('category', category)
+        if after:
+            query = query.or_(keyset_filter('created_at', after))
+
+        result = query.execute()
+        return [flatten_course(course) for course in result.data]
+
+    @async_supabase('courses', hedge=True)
+    def get_course_by_id(self, course_id: str) -> Optional[dict]:
+        result = self.supabase.table('courses').select(COURSE_COLUMNS).eq('id', course_id).execute()
+        return flatten_course(result.data[0]) if result.data else None
+
+    @async_supabase('courses')
+    def get_courses_changed_page(self, changed_since: str, after_id: Optional[str] = None, limit: int = 500) -> List[dict]:
+        query = self.supabase.table('courses').select(COURSE_COLUMNS) \
+            .or_(f'created_at.gte."{changed_since}",updated_at.gte."{changed_since}"') \
+            .order('id').limit(limit)
+        if after_id:
+            query = query.gt('id', after_id)
+        return [flatten_course(course) for course in query.execute().data]
+
+    @async_supabase('courses', hedge=True)
+    def get_courses_by_ids(self, course_ids: List[str]) -> List[dict]:
+        result = self.supabase.table('courses').select(COURSE_COLUMNS).in_('id', course_ids).execute()
+        return [flatten_course(course) for course in result.data]
+
+    @async_supabase('courses')
+    def search_courses(self, query: str, limit: int = 100, offset: int = 0, category: Optional[str] = None) -> List[dict]:
+        result = self.supabase.rpc('search_courses', {
+            'q': query,
+            'category_filter': category,
+            'lim': limit,
+            'off': offset,
+        }).execute()
+        return result.data
+
+    @async_supabase('courses')
+    def update_course(self, course_id: str, course_data: dict, instructor_id: Optional[str] = None) -> Optional[dict]:
+        query = self.supabase.table('courses').update(course_data).eq('id', course_id)
+        if instructor_id:
+            query = query.eq('instructor_id', instructor_id)
+        # The update builder has no .select(); PostgREST embeds the instructor in the returned representation
+        query.params = query.params.set('select', ''.join(COURSE_COLUMNS.split()))
+        result = query.execute()
+        return flatten_course(result.data[0]) if result.data else None
+
+    @async_supabase('courses')
+    def delete_course(self, course_id: str) -> bool:
+        result = self.supabase.table('courses').delete().eq('id', course_id).execute()
+        return len(result.data) > 0
+
+    # Enrollment operations
+    @async_supabase('enrollments')
+    def create_enrollment(self, enrollment_data: dict) -> Optional[dict]:
+        result = self.supabase.table('enrollments').insert(enrollment_data).execute()
+        return result.data[0] if result.data else None
+
+    @async_supabase('enrollments')
+    def create_enrollments_bulk(self, enrollments: List[dict]) -> List[dict]:
+        result = self.supabase.table('enrollments').upsert(
+            enrollments, on_conflict='user_id,course_id', ignore_duplicates=True
+        ).execute()
+        return result.data
+
+    @async_supabase('enrollments')
+    def get_user_enrollments(self, user_id: str) -> List[dict]:
+        result = self.supabase.table('enrollments').select('''
+            *,
+            courses(*)
+        ''').eq('user_id', user_id).execute()
+        return result.data
+
+    @async_supabase('enrollments')
+    def get_enrollment(self, user_id: str, course_id: str) -> Optional[dict]:
+        result = self.supabase.table('enrollments').select('*').eq('user_id', user_id).eq('course_id', course_id).execute()
+        return result.data[0] if result.data else None
+
+    @async_supabase('enrollments', hedge=True)
+    def get_enrollment_by_id(self, enrollment_id: str) -> Optional[dict]:
+        result = self.supabase.table('enrollments').select('*').eq('id', enrollment_id).execute()
+        return result.data[0] if result.data else None
+
+    @async_supabase('enrollments')
+    def get_course_enrollments_page(self, course_id: str, after_id: Optional[str] = None, limit: int = 1000) -> List[dict]:
+        query = self.supabase.table('enrollments') \
+            .select('id,progress,completed_lessons,enrolled_at,completed_at').eq('course_id', course_id)
+        if after_id:
+            query = query.gt('id', after_id)
+        return query.order('id').limit(limit).execute().data
+
+    @async_supabase('enrollments')
+    def get_enrollment_pairs_page(self, after_id: Optional[str] = None, limit: int = 10000) -> List[dict]:
+        query = self.supabase.table('enrollments').select('id,user_id,course_id')
+        if after_id:
+            query = query.gt('id', after_id)
+        return query.order('id').limit(limit).execute().data
+
+    @async_supabase('enrollments')
+    def update_enrollment_progress(self, enrollment_id: str, update_data: dict) -> Optional[dict]:
+        result = self.supabase.table('enrollments').update(update_data).eq('id', enrollment_id).execute()
+        return result.data[0] if result.data else None
+
+    @async_supabase('enrollments')
+    def update_enrollments_progress(self, updates: List[dict]) -> int:
+        # One UPDATE over the batch (supabase/migrations/20261018_enrollment_progress.sql);
+        # ids deleted meanwhile are skipped rather than upserted into FK violations
+        rows = [
+            {'id': u['id'], 'progress': u['progress'], 'completed_lessons': u['completed_lessons'],
+             'completed_at': u.get('completed_at')}
+            for u in updates
+        ]
+        return self.supabase.rpc('update_enrollments_progress', {'updates': rows}).execute().data
+
+    # Rating operations
+    @async_supabase('course_ratings')
+    def get_course_rating(self, user_id: str, course_id: str) -> Optional[dict]:
+        result = self.supabase.table('course_ratings').select('*').eq('user_id', user_id).eq('course_id', course_id).execute()
+        return result.data[0] if result.data else None
+
+    @async_supabase('course_ratings')
+    def upsert_course_rating(self, rating_data: dict) -> Optional[dict]:
+        result = self.supabase.table('course_ratings').upsert(rating_data, on_conflict='user_id,course_id').execute()
+        return result.data[0] if result.data else None
+
+    # Course statistics (SQL functions from supabase/migrations/20261017_course_stats.sql)
+    @async_supabase('courses')
+    def apply_course_stat_deltas(self, deltas: List[dict]) -> int:
+        return self.supabase.rpc('apply_course_stat_deltas', {'deltas': deltas}).execute().data
+
+    @async_supabase('courses')
+    def reconcile_course_stats(self) -> int:
+        return self.supabase.rpc('reconcile_course_stats', {}).execute().data
+
+    # Certificate operations
+    @async_supabase('certificates')
+    def create_certificate(self, certificate_data: dict) -> Optional[dict]:
+        result = self.supabase.table('certificates').insert(certificate_data).execute()
+        return result.data[0] if result.data else None
+
+    @async_supabase('certificates')
+    def get_certificates(self, limit: int = 100, offset: int = 0) -> List[dict]:
+        result = self.supabase.table('certificates').select(CERTIFICATE_COLUMNS) \
+            .order('issued_at', desc=True).order('id', desc=True) \
+            .range(offset, offset + limit - 1).execute()
+        return [flatten_certificate(cert) for cert in result.data]
+
+    @async_supabase('certificates')
+    def get_certificates_after(
+        self,
+        limit: int = 100,
+        after: Optional[Tuple[str, str]] = None,
+        course_id: Optional[str] = None,
+        instructor_id: Optional[str] = None,
+        issued_from: Optional[str] = None,
+        issued_to: Optional[str] = None,
+    ) -> List[dict]:
+        query = self.supabase.table('certificates').select(CERTIFICATE_COLUMNS) \
+            .order('issued_at', desc=True).order('id', desc=True) \
+            .limit(limit)
+
+        if course_id:
+            query = query.eq('course_id', course_id)
+        if instructor_id:
+            query = query.eq('instructor_id', instructor_id)
+        if issued_from:
+            query = query.gte('issued_at', issued_from)
+        if issued_to:
+            query = query.lt('issued_at', issued_to)
+        if after:
+            query = query.or_(keyset_filter('issued_at', after))
+
+        result = query.execute()
+        return [flatten_certificate(cert) for cert in result.data]
+
+    @async_supabase('certificates')
+    def get_user_certificates(self, user_id: str) -> List[dict]:
+        result = self.supabase.table('certificates').select(CERTIFICATE_COLUMNS).eq('user_id', user_id).execute()
+        return [flatten_certificate(cert) for cert in result.data]
+
+    @async_supabase('certificates')
+    def get_certificate_ids_page(self, after: Optional[Tuple[str, str]] = None, limit: int = 10000) -> List[dict]:
+        query = self.supabase.table('certificates').select('id,certificate_id,issued_at') \
+            .order('issued_at').order('id').limit(limit)
+        if after:
+            query = query.or_(keyset_filter('issued_at', after, descending=False))
+        return query.execute().data
+
+    @async_supabase('certificates', hedge=True)
+    def get_certificate(self, certificate_id: str) -> Optional[dict]:
+        result = self.supabase.table('certificates').select(CERTIFICATE_COLUMNS) \
+            .eq('certificate_id', certificate_id).limit(1).execute()
+        return flatten_certificate(result.data[0]) if result.data else None
+
+    # Status check operations
+    @async_supabase('status_checks')
+    def create_status_check(self, status_data: dict) -> Optional[dict]:
+        result = self.supabase.table('status_checks').insert(status_data).execute()
+        return result.data[0] if result.data else None
+
+    @async_supabase('status_checks')
+    def create_status_checks_bulk(self, status_checks: List[dict]) -> int:
+        if not status_checks:
+            return 0
+        # Ids are fresh uuids, so there is nothing to skip and no rows need to come back
+        self.supabase.table('status_checks').insert(status_checks, returning=ReturnMethod.minimal).execute()
+        return len(status_checks)
+
+    def _time_series(self, table: str, time_column: str, limit: int, client_name: Optional[str],
+                     since: Optional[str], until: Optional[str], order: List[str]) -> List[dict]:
+        query = self.supabase.table(table).select('*')
+        if client_name:
+            query = query.eq('client_name', client_name)
+        if since:
+            query = query.gte(time_column, since)
+        if until:
+            query = query.lt(time_column, until)
+        for column in order:
+            query = query.order(column, desc=column == time_column or column == 'id')
+        return query.limit(limit).execute().data
+
+    @async_supabase('status_checks')
+    def get_status_checks(
+        self,
+        limit: int = 1000,
+        client_name: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> List[dict]:
+        return self._time_series(
+            'status_checks', 'timestamp', limit, client_name, since, until, ['timestamp', 'id'])
+
+    @async_supabase('status_checks')
+    def get_status_check_rollups(
+        self,
+        limit: int = 1000,
+        client_name: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> List[dict]:
+        return self._time_series(
+            'status_check_rollups', 'bucket_start', limit, client_name, since, until, ['bucket_start', 'client_name'])
+
+    # Retention (SQL function from supabase/migrations/20261017_status_timeseries.sql)
+    @async_supabase('status_checks')
+    def downsample_status_checks(self, raw_before: str, rollups_before: str) -> dict:
+        return self.supabase.rpc('downsample_status_checks', {
+            'raw_before': raw_before,
+            'rollups_before': rollups_before,
+        }).execute().data
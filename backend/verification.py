@@ -0,0 +1,206 @@
+import os
+import re
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from backend.bloom import BloomFilter
+from backend.cache import TTLCache
+from backend.database import Database, db
+from backend.metrics import registry, watch_cache
+
+logger = logging.getLogger(__name__)
+
+# Re-read certificates issued this far back on every sync, for commits racing the previous sync
+SYNC_OVERLAP = timedelta(seconds=30)
+
+# Anything else cannot be an issued certificate id and is rejected before the filter
+PLAUSIBLE_ID = re.compile(r'[A-Za-z0-9-]{1,64}')
+
+
+def _utc(value) -> datetime:
+    """ISO timestamp (naive UTC or with an offset) or datetime to naive UTC"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def certificate_summary(certificate: dict) -> dict:
+    """What a verification reveals: the certificate, never account ids or emails"""
+    return {
+        'certificate_id': certificate['certificate_id'],
+        'student_name': certificate['student_name'],
+        'course_name': certificate['course_name'],
+        'instructor_name': certificate['instructor_name'],
+        'grade': certificate['grade'],
+        'issued_at': certificate['issued_at'],
+    }
+
+
+class CertificateVerifier:
+    """Public certificate lookups by `certificate_id`, with negatives answered from memory.
+
+    Every issued id is in a Bloom filter, so an id that was never issued is
+    rejected with a few bit probes and no query; only filter hits (real ids
+    plus ~`error_rate` of bogus ones) reach the `cache` of resolved
+    summaries and, on a miss, the database. The first load runs during warm
+    start; until it finishes every lookup goes to the database and misses
+    are not cached, since the id may be issued before the filter has it.
+
+    Ids issued by this process are added as they are created. Ids issued by
+    other workers are pulled every `sync_interval` seconds, so on another
+    worker a brand-new certificate verifies within that interval. The filter
+    is rebuilt, twice as large, once it holds more ids than it was sized for.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        capacity: Optional[int] = None,
+        error_rate: float = 0.001,
+        sync_interval: Optional[float] = None,
+        page_size: int = 10000,
+    ):
+        self.db = database
+        self.capacity = capacity or int(os.environ.get('CERTIFICATE_FILTER_CAPACITY', '1000000'))
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval or float(os.environ.get('CERTIFICATE_VERIFY_SYNC_INTERVAL', '30'))
+        self.page_size = page_size
+        self.cache = TTLCache(
+            maxsize=int(os.environ.get('CERTIFICATE_VERIFY_CACHE_SIZE', '10000')),
+            ttl=float(os.environ.get('CERTIFICATE_VERIFY_CACHE_TTL', '600')),
+        )
+        self._bloom = BloomFilter(self.capacity, error_rate)
+        self.ready = False
+        # Newest issued_at seen, where the next sync resumes
+        self._synced_to: Optional[datetime] = None
+        # Ids added while a load is reading the table, re-added to the new filter
+        self._loading: Optional[List[str]] = None
+        self._task: Optional[asyncio.Task] = None
+        self.lookups = 0
+        self.rejected = 0
+        self.false_positives = 0
+        self.db_lookups = 0
+
+    def add(self, certificate_id: str) -> None:
+        """Record a newly issued certificate"""
+        self._bloom.add(certificate_id)
+        if self._loading is not None:
+            self._loading.append(certificate_id)
+        # A bogus id that hit the filter may have been cached as missing
+        self.cache.invalidate(certificate_id)
+
+    def _advance(self, page: List[dict]) -> None:
+        newest = _utc(page[-1]['issued_at'])
+        if self._synced_to is None or newest > self._synced_to:
+            self._synced_to = newest
+
+    async def load(self) -> int:
+        """Build a new filter over every issued id and swap it in"""
+        self._loading = []
+        try:
+            count = 0
+            # Sized from the filter it replaces; if the table outgrew that, the next sync loads again
+            bloom = BloomFilter(max(self.capacity, 2 * len(self._bloom)), self.error_rate)
+            async for page in self.db.iter_certificate_ids(page_size=self.page_size):
+                for row in page:
+                    bloom.add(row['certificate_id'])
+                count += len(page)
+                self._advance(page)
+            for certificate_id in self._loading:
+                bloom.add(certificate_id)
+        finally:
+            self._loading = None
+        self._bloom = bloom
+        self.ready = True
+        logger.info("Loaded %d certificate ids for verification", count)
+        return count
+
+    async def sync(self) -> int:
+        """Add ids issued since the last sync (by any worker)"""
+        if not self.ready or self._bloom.full:
+            return await self.load()
+        since = self._synced_to - SYNC_OVERLAP if self._synced_to is not None else None
+        count = 0
+        async for page in self.db.iter_certificate_ids(issued_since=since, page_size=self.page_size):
+            for row in page:
+                certificate_id = row['certificate_id']
+                # The overlap re-reads ids already added; counting them twice would make the filter look full
+                if certificate_id in self._bloom:
+                    self.cache.invalidate(certificate_id)
+                else:
+                    self.add(certificate_id)
+            count += len(page)
+            self._advance(page)
+        return count
+
+    async def verify(self, certificate_id: str) -> Optional[dict]:
+        """Summary of an issued certificate, or None"""
+        self.lookups += 1
+        if not PLAUSIBLE_ID.fullmatch(certificate_id) or (self.ready and certificate_id not in self._bloom):
+            self.rejected += 1
+            return None
+
+        summary = self.cache.get(certificate_id)
+        if summary is not None:
+            return summary or None
+
+        self.db_lookups += 1
+        certificate = await self.db.get_certificate(certificate_id)
+        if certificate is None:
+            if self.ready:
+                self.false_positives += 1
+                # Cached as missing too, so a scraper cannot replay a filter false positive into queries
+                self.cache.set(certificate_id, False)
+            return None
+        summary = certificate_summary(certificate)
+        self.cache.set(certificate_id, summary)
+        return summary
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except Exception:
+                logger.exception("Certificate verification sync failed")
+            await asyncio.sleep(self.sync_interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            'ready': self.ready,
+            'synced_to': self._synced_to.isoformat() if self._synced_to else None,
+            'filter': self._bloom.stats(),
+            'cache': self.cache.stats(),
+            'lookups_total': self.lookups,
+            'rejected_total': self.rejected,
+            'false_positives_total': self.false_positives,
+            'db_lookups_total': self.db_lookups,
+        }
+
+
+# Global certificate verifier
+certificate_verifier = CertificateVerifier(db)
+watch_cache('certificate_verification', certificate_verifier.cache)
+
+registry.counter('certificate_verifications_total', 'Public certificate verification lookups',
+                 callback=lambda: certificate_verifier.lookups)
+registry.counter('certificate_verification_rejections_total', 'Verification lookups rejected by the filter',
+                 callback=lambda: certificate_verifier.rejected)
+registry.counter('certificate_verification_db_lookups_total', 'Verification lookups that queried the database',
+                 callback=lambda: certificate_verifier.db_lookups)
@@ -0,0 +1,102 @@
+"""Timing, percentile and result-file helpers shared by the benchmark scripts"""
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+
+def prepare_environment(bcrypt_rounds: Optional[int] = None) -> None:
+    """Env the backend modules read at import time; call before importing `backend.*`.
+
+    SQLite in memory needs no server; load runs swap in the fake Supabase
+    client afterwards. Every load request comes from one client, so rate
+    limiting is off unless RATE_LIMIT_ENABLED is set explicitly. Certificate
+    PDFs go to a fresh directory so every run starts with a cold cache.
+    """
+    os.environ.setdefault('DB_BACKEND', 'sqlite')
+    os.environ.setdefault('SQLITE_PATH', ':memory:')
+    os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+    os.environ.setdefault('CERTIFICATE_CACHE_DIR', tempfile.mkdtemp(prefix='skilio-bench-certificates-'))
+    if bcrypt_rounds:
+        os.environ['BCRYPT_ROUNDS'] = str(bcrypt_rounds)
+
+
+def bench(func: Callable[[], object], min_time: float = 1.0, warmup: int = 1) -> dict:
+    """Call `func` repeatedly for at least `min_time` seconds; per-call timings in ms"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while True:
+        started = time.perf_counter()
+        func()
+        finished = time.perf_counter()
+        samples.append((finished - started) * 1000)
+        if finished >= deadline:
+            break
+    return summarize(samples)
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted samples"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_samples) + 0.5 - 1e-9)))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+def summarize(samples: List[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'mean_ms': sum(ordered) / len(ordered) if ordered else 0.0,
+        'p50_ms': percentile(ordered, 50),
+        'p95_ms': percentile(ordered, 95),
+        'p99_ms': percentile(ordered, 99),
+        'max_ms': ordered[-1] if ordered else 0.0,
+    }
+
+
+def run_metadata(**extra) -> dict:
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        **extra,
+    }
+
+
+def write_results(path: str, kind: str, results: Dict[str, dict], meta: dict) -> None:
+    with open(path, 'w') as f:
+        json.dump({'kind': kind, 'meta': meta, 'results': results}, f, indent=2, sort_keys=True)
+
+
+def compare_results(baseline_path: str, results: Dict[str, dict], metric: str, threshold: float) -> List[str]:
+    """Print a comparison against a saved run; returns the names that regressed beyond `threshold`"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+    regressions = []
+    print(f"\n{'benchmark':<40} {'baseline':>10} {'current':>10} {'change':>8}  ({metric})")
+    for name, current in results.items():
+        before = baseline.get(name, {}).get(metric)
+        if not before:
+            print(f"{name:<40} {'-':>10} {current[metric]:>10.3f}")
+            continue
+        change = current[metric] / before - 1
+        flag = '  REGRESSION' if change > threshold else ''
+        print(f"{name:<40} {before:>10.3f} {current[metric]:>10.3f} {change:>+7.1%}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
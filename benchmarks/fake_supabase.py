@@ -0,0 +1,455 @@
+"""In-process stand-in for the Supabase/PostgREST client used by SupabaseBackend.
+
+Implements just the query-builder surface the backend uses (select with
+embedded resources, insert/upsert/update/delete, eq/in_/is_/gte/lt/or_ filters,
+order/range/limit, and the rpcs in RPCS) over in-memory tables, and
+sleeps `latency` (+ up to `jitter`) seconds per request to model the HTTP
+round trip. Requests run on the caller's thread, i.e. the DB executor.
+
+Faults for exercising deadlines, hedging and circuit breakers: a
+`tail_prob` fraction of requests takes `tail_latency` extra seconds, an
+`error_rate` fraction fails with a connection error, and tables listed in
+`down` fail every request.
+"""
+import random
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from postgrest.exceptions import APIError
+
+TABLES = (
+    'users', 'courses', 'enrollments', 'certificates', 'course_ratings', 'status_checks', 'status_check_rollups',
+    'refresh_tokens', 'token_revocations',
+)
+
+# SQL functions from supabase/migrations, implemented as FakeSupabase methods
+RPCS = ('search_courses', 'apply_course_stat_deltas', 'reconcile_course_stats', 'downsample_status_checks',
+        'update_enrollments_progress')
+
+# Columns (or column groups) with a UNIQUE constraint, per table
+UNIQUE = {
+    'users': [('id',), ('email',)],
+    'courses': [('id',)],
+    'enrollments': [('id',), ('user_id', 'course_id')],
+    'certificates': [('id',), ('certificate_id',)],
+    'course_ratings': [('id',), ('user_id', 'course_id')],
+    'status_checks': [('id',)],
+    'status_check_rollups': [('client_name', 'bucket_start')],
+    'refresh_tokens': [('id',)],
+    'token_revocations': [('id',)],
+}
+
+Row = Dict[str, Any]
+
+
+class FakeResponse:
+    def __init__(self, data: List[Row]):
+        self.data = data
+        self.count = None
+
+
+def split_top_level(text: str) -> List[str]:
+    """Split on commas that are not inside parentheses or double quotes"""
+    parts, depth, quoted, current = [], 0, False, ''
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        elif not quoted and depth == 0 and char == ',':
+            parts.append(current)
+            current = ''
+            continue
+        current += char
+    if current:
+        parts.append(current)
+    return parts
+
+
+COMPARATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    'eq': lambda a, b: a == b,
+    'neq': lambda a, b: a != b,
+    'lt': lambda a, b: a is not None and a < b,
+    'lte': lambda a, b: a is not None and a <= b,
+    'gt': lambda a, b: a is not None and a > b,
+    'gte': lambda a, b: a is not None and a >= b,
+}
+
+
+def coerce(value: Any, like: Any) -> Any:
+    """Compare filter values (always strings on the wire) in the column's type"""
+    if isinstance(like, bool):
+        return str(value).lower() == 'true'
+    if isinstance(like, (int, float)) and isinstance(value, str):
+        try:
+            return type(like)(value)
+        except ValueError:
+            return value
+    return value
+
+
+def parse_condition(expr: str) -> Callable[[Row], bool]:
+    """Parse a PostgREST logic-tree term: `col.op.value`, `and(...)` or `or(...)`"""
+    match = re.fullmatch(r'(and|or)\((.*)\)', expr, re.S)
+    if match:
+        terms = [parse_condition(term) for term in split_top_level(match.group(2))]
+        combine = all if match.group(1) == 'and' else any
+        return lambda row: combine(term(row) for term in terms)
+    column, op, value = expr.split('.', 2)
+    if value.startswith('"') and value.endswith('"'):
+        value = value[1:-1]
+    compare = COMPARATORS[op]
+    return lambda row: compare(row.get(column), coerce(value, row.get(column)))
+
+
+class FakeQuery:
+    """Chainable request builder; nothing happens until execute()"""
+
+    def __init__(self, client: 'FakeSupabase', table: str):
+        self.client = client
+        self.table = table
+        self.op = 'select'
+        self.columns = '*'
+        self.payload: List[Row] = []
+        self.on_conflict: Optional[str] = None
+        self.ignore_duplicates = False
+        self.filters: List[Callable[[Row], bool]] = []
+        self.orders: List[Tuple[str, bool]] = []
+        self.offset = 0
+        self.max_rows: Optional[int] = None
+        self.params = httpx.QueryParams()
+
+    # Operations
+    def select(self, columns: str = '*', count: Optional[str] = None) -> 'FakeQuery':
+        self.op, self.columns = 'select', columns
+        return self
+
+    def insert(self, data, **_) -> 'FakeQuery':
+        self.op, self.payload = 'insert', data if isinstance(data, list) else [data]
+        return self
+
+    def upsert(self, data, on_conflict: str = '', ignore_duplicates: bool = False, **_) -> 'FakeQuery':
+        self.op, self.payload = 'upsert', data if isinstance(data, list) else [data]
+        self.on_conflict = on_conflict or 'id'
+        self.ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, data: Row, **_) -> 'FakeQuery':
+        self.op, self.payload = 'update', [data]
+        return self
+
+    def delete(self, **_) -> 'FakeQuery':
+        self.op = 'delete'
+        return self
+
+    # Filters
+    def _filter(self, column: str, op: str, value: Any) -> 'FakeQuery':
+        compare = COMPARATORS[op]
+        self.filters.append(lambda row: compare(row.get(column), value))
+        return self
+
+    def eq(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'eq', value)
+
+    def neq(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'neq', value)
+
+    def lt(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'lt', value)
+
+    def lte(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'lte', value)
+
+    def gt(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'gt', value)
+
+    def gte(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'gte', value)
+
+    def is_(self, column: str, value: str) -> 'FakeQuery':
+        # Only `is.null` is used
+        self.filters.append(lambda row: row.get(column) is None)
+        return self
+
+    def in_(self, column: str, values: List[Any]) -> 'FakeQuery':
+        values = set(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def or_(self, filters: str) -> 'FakeQuery':
+        self.filters.append(parse_condition(f'or({filters})'))
+        return self
+
+    # Modifiers
+    def order(self, column: str, desc: bool = False, **_) -> 'FakeQuery':
+        self.orders.append((column, desc))
+        return self
+
+    def range(self, start: int, end: int) -> 'FakeQuery':
+        self.offset, self.max_rows = start, end - start + 1
+        return self
+
+    def limit(self, size: int) -> 'FakeQuery':
+        self.max_rows = size
+        return self
+
+    def execute(self) -> FakeResponse:
+        self.client.simulate_round_trip(self.table, self.op)
+        with self.client.lock:
+            return FakeResponse(getattr(self, f'_execute_{self.op}')())
+
+    # Execution (called under the client lock)
+    def _matching(self) -> List[Row]:
+        rows = [row for row in self.client.tables[self.table].values() if all(f(row) for f in self.filters)]
+        for column, desc in reversed(self.orders):
+            rows.sort(key=lambda row: (row.get(column) is None, row.get(column) or ''), reverse=desc)
+        end = None if self.max_rows is None else self.offset + self.max_rows
+        return rows[self.offset:end]
+
+    def _execute_select(self) -> List[Row]:
+        return [self.client.project(self.table, row, self.columns) for row in self._matching()]
+
+    def _returning(self, rows: List[Row]) -> List[Row]:
+        columns = self.params.get('select', '*')
+        return [self.client.project(self.table, row, columns) for row in rows]
+
+    def _execute_insert(self) -> List[Row]:
+        for row in self.payload:
+            conflict = self.client.find_conflict(self.table, row)
+            if conflict is not None:
+                raise APIError({
+                    'code': '23505',
+                    'message': f'duplicate key value violates unique constraint on {self.table}{conflict}',
+                })
+        return self._returning([self.client.store(self.table, dict(row)) for row in self.payload])
+
+    def _execute_upsert(self) -> List[Row]:
+        key = tuple(column.strip() for column in self.on_conflict.split(','))
+        written = []
+        for row in self.payload:
+            existing = self.client.find_by(self.table, key, row)
+            if existing is None:
+                written.append(self.client.store(self.table, dict(row)))
+            elif not self.ignore_duplicates:
+                existing.update(row)
+                written.append(existing)
+        return self._returning(written)
+
+    def _execute_update(self) -> List[Row]:
+        rows = self._matching()
+        for row in rows:
+            row.update(self.payload[0])
+        return self._returning(rows)
+
+    def _execute_delete(self) -> List[Row]:
+        rows = self._matching()
+        for row in rows:
+            del self.client.tables[self.table][row['id']]
+        return [dict(row) for row in rows]
+
+
+class FakeRpc:
+    def __init__(self, client: 'FakeSupabase', name: str, params: dict):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    def execute(self) -> FakeResponse:
+        if self.name not in RPCS:
+            raise APIError({'code': 'PGRST202', 'message': f'function {self.name} not found'})
+        self.client.simulate_round_trip('rpc', self.name)
+        with self.client.lock:
+            return FakeResponse(getattr(self.client, self.name)(**self.params))
+
+
+class FakeSupabase:
+    """The `table()` / `rpc()` surface of a supabase Client, backed by dicts"""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        seed: Optional[int] = None,
+        tail_prob: float = 0.0,
+        tail_latency: float = 0.0,
+        error_rate: float = 0.0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.tail_prob = tail_prob
+        self.tail_latency = tail_latency
+        self.error_rate = error_rate
+        self.down: set = set()
+        self.tables: Dict[str, Dict[str, Row]] = {name: {} for name in TABLES}
+        self.lock = threading.Lock()
+        self.requests: Counter = Counter()
+        self._random = random.Random(seed)
+
+    def table(self, name: str) -> FakeQuery:
+        if name not in self.tables:
+            raise APIError({'code': '42P01', 'message': f'relation "{name}" does not exist'})
+        return FakeQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, name: str, params: Optional[dict] = None) -> FakeRpc:
+        return FakeRpc(self, name, params or {})
+
+    def simulate_round_trip(self, table: str, op: str) -> None:
+        self.requests[f'{op} {table}'] += 1
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if self.tail_prob and self._random.random() < self.tail_prob:
+            delay += self.tail_latency
+        if delay > 0:
+            time.sleep(delay)
+        if table in self.down or (self.error_rate and self._random.random() < self.error_rate):
+            self.requests[f'failed {op} {table}'] += 1
+            raise httpx.ConnectError(f'injected failure for {op} {table}')
+
+    # Storage helpers (called under the lock)
+    def store(self, table: str, row: Row) -> Row:
+        self.tables[table][row['id']] = row
+        return row
+
+    def find_by(self, table: str, key: Tuple[str, ...], row: Row) -> Optional[Row]:
+        if key == ('id',):
+            return self.tables[table].get(row.get('id'))
+        values = tuple(row.get(column) for column in key)
+        for existing in self.tables[table].values():
+            if tuple(existing.get(column) for column in key) == values:
+                return existing
+        return None
+
+    def find_conflict(self, table: str, row: Row) -> Optional[Tuple[str, ...]]:
+        for key in UNIQUE[table]:
+            if self.find_by(table, key, row) is not None:
+                return key
+        return None
+
+    def project(self, table: str, row: Row, columns: str) -> Row:
+        """Apply a select list, resolving embedded many-to-one resources"""
+        result: Row = {}
+        for item in split_top_level(''.join(columns.split())):
+            match = re.fullmatch(r'(?:(\w+):)?(\w+)(?:!(\w+))?\((.*)\)', item)
+            if not match:
+                if item == '*':
+                    result.update(row)
+                else:
+                    result[item] = row.get(item)
+                continue
+            alias, target, fkey, sub_columns = match.groups()
+            if fkey:
+                column = fkey[len(table) + 1:-len('_fkey')]
+            else:
+                column = (target[:-1] if target.endswith('s') else target) + '_id'
+            related = self.tables[target].get(row.get(column))
+            result[alias or target] = self.project(target, related, sub_columns) if related else None
+        return result
+
+    def search_courses(self, q: str, category_filter: Optional[str] = None, lim: int = 100, off: int = 0) -> List[Row]:
+        tokens = [token for token in re.split(r'[^\w]+', q.lower()) if token]
+        if not tokens:
+            return []
+        matches = []
+        for course in self.tables['courses'].values():
+            if category_filter and course.get('category') != category_filter:
+                continue
+            fields = {name: (course.get(name) or '').lower() for name in ('title', 'category', 'description')}
+            if not all(any(token in text for text in fields.values()) for token in tokens):
+                continue
+            rank = sum(weight for name, weight in (('title', 3), ('category', 2), ('description', 1))
+                       for token in tokens if token in fields[name])
+            instructor = self.tables['users'].get(course.get('instructor_id')) or {}
+            matches.append((-rank, course['id'], {
+                **course,
+                'instructor_name': instructor.get('name'),
+                'instructor_avatar': instructor.get('avatar'),
+            }))
+        matches.sort(key=lambda match: match[:2])
+        return [course for _, _, course in matches[off:off + lim]]
+
+    def _set_course_stats(self, course: Row, students: int, completions: int, rating_count: int, rating_sum: float) -> None:
+        course.update(
+            students=students, completions=completions, rating_count=rating_count, rating_sum=rating_sum,
+            rating=round(rating_sum / rating_count, 2) if rating_count > 0 else 0,
+        )
+
+    def apply_course_stat_deltas(self, deltas: List[Row]) -> int:
+        updated = 0
+        for delta in deltas:
+            course = self.tables['courses'].get(delta['course_id'])
+            if course is None:
+                continue
+            self._set_course_stats(course, *(
+                (course.get(field) or 0) + delta[field]
+                for field in ('students', 'completions', 'rating_count', 'rating_sum')
+            ))
+            updated += 1
+        return updated
+
+    def update_enrollments_progress(self, updates: List[Row]) -> int:
+        updated = 0
+        for update in updates:
+            enrollment = self.tables['enrollments'].get(update['id'])
+            if enrollment is None:
+                continue
+            enrollment.update(progress=update['progress'], completed_lessons=update['completed_lessons'])
+            if update.get('completed_at') is not None:
+                enrollment['completed_at'] = update['completed_at']
+            updated += 1
+        return updated
+
+    def reconcile_course_stats(self) -> int:
+        actual = {course_id: [0, 0, 0, 0] for course_id in self.tables['courses']}
+        for enrollment in self.tables['enrollments'].values():
+            stats = actual.get(enrollment['course_id'])
+            if stats:
+                stats[0] += 1
+                stats[1] += enrollment.get('completed_at') is not None
+        for rating in self.tables['course_ratings'].values():
+            stats = actual.get(rating['course_id'])
+            if stats:
+                stats[2] += 1
+                stats[3] += rating['rating']
+        fixed = 0
+        for course_id, stats in actual.items():
+            course = self.tables['courses'][course_id]
+            current = [course.get(field) or 0 for field in ('students', 'completions', 'rating_count', 'rating_sum')]
+            if current != stats:
+                self._set_course_stats(course, *stats)
+                fixed += 1
+        return fixed
+
+    def downsample_status_checks(self, raw_before: str, rollups_before: str) -> Row:
+        checks, rollups = self.tables['status_checks'], self.tables['status_check_rollups']
+        expired = [check for check in checks.values() if check['timestamp'] < raw_before]
+        written = set()
+        for check in expired:
+            del checks[check['id']]
+            # Rollups have no id column; key them by their primary key instead
+            key = (check['client_name'], check['timestamp'][:13] + ':00:00')
+            written.add(key)
+            rollup = rollups.get(key)
+            if rollup is None:
+                rollups[key] = {'client_name': key[0], 'bucket_start': key[1], 'checks': 1,
+                                'first_seen': check['timestamp'], 'last_seen': check['timestamp']}
+            else:
+                rollup['checks'] += 1
+                rollup['first_seen'] = min(rollup['first_seen'], check['timestamp'])
+                rollup['last_seen'] = max(rollup['last_seen'], check['timestamp'])
+        stale = [key for key, rollup in rollups.items() if rollup['bucket_start'] < rollups_before]
+        for key in stale:
+            del rollups[key]
+        return {'raw_deleted': len(expired), 'rollups_written': len(written), 'rollups_expired': len(stale)}
+
+    def stats(self) -> dict:
+        return {
+            'rows': {name: len(rows) for name, rows in self.tables.items()},
+            'requests': dict(self.requests),
+        }
@@ -0,0 +1,121 @@
+"""Build the API on a fake Supabase (or in-memory SQLite) and seed it with data"""
+import random
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.common import prepare_environment
+from benchmarks.fake_supabase import FakeSupabase
+
+CATEGORIES = ('Tech', 'Business', 'Design', 'Marketing', 'Data')
+WORDS = ('python', 'react', 'sql', 'design', 'marketing', 'cloud', 'data', 'finance', 'leadership', 'security')
+PASSWORD = 'bench-password'
+
+
+@dataclass
+class Fixture:
+    """Seeded ids and bearer headers the load scenarios draw from"""
+    admin: dict
+    instructor: dict
+    student: dict
+    users: List[dict]
+    course_ids: List[str]
+    instructor_course_ids: List[str]
+    enrollment_ids: List[str]
+    headers: Dict[str, dict] = field(default_factory=dict)
+    extra: Dict[str, list] = field(default_factory=dict)
+
+
+def create_app(backend: str = 'fake', latency: float = 0.005, jitter: float = 0.0,
+               bcrypt_rounds: Optional[int] = None) -> Tuple[object, object, Optional[FakeSupabase]]:
+    """Import the app and point its global `db` at the selected backend"""
+    prepare_environment(bcrypt_rounds)
+    from backend.database import db
+    from backend.server import app
+
+    fake = None
+    if backend == 'fake':
+        from backend.storage.supabase_backend import SupabaseBackend
+        fake = FakeSupabase(latency=latency, jitter=jitter, seed=0)
+        db.backend = SupabaseBackend(client=fake)
+    return app, db, fake
+
+
+def course_data(i: int, instructor_id: str, rng: random.Random) -> dict:
+    words = rng.sample(WORDS, 3)
+    return {
+        'title': f"{words[0].title()} {words[1]} course {i}",
+        'description': f"Learn {' and '.join(words)} from scratch with hands-on projects. " * 3,
+        'category': CATEGORIES[i % len(CATEGORIES)],
+        'duration': f"{rng.randint(1, 40)}h",
+        'image': f"https://images.example.com/courses/{i}.jpg",
+        'gradient': 'from-blue-500 to-purple-600',
+        'icon': 'code',
+        'instructor_id': instructor_id,
+        'lessons': rng.randint(5, 60),
+        'price': round(rng.uniform(0, 200), 2),
+    }
+
+
+async def seed(db, users: int = 200, courses: int = 300, enrollments_per_user: int = 3,
+               certificates: int = 200, seed_value: int = 0) -> Fixture:
+    """Seed through the Database facade; every account shares one password hash"""
+    from backend.auth import create_access_token, hash_password, user_claims
+    from backend.models import DEFAULT_AVATAR, User
+
+    rng = random.Random(seed_value)
+    hashed = await hash_password(PASSWORD)
+
+    def user_row(email: str, name: str, role: str) -> dict:
+        return {'email': email, 'name': name, 'role': role, 'password': hashed, 'avatar': DEFAULT_AVATAR}
+
+    instructor_emails = ['instructor@bench.dev', *(f'instructor{i}@bench.dev' for i in range(9))]
+    staff = await db.create_users_bulk([
+        user_row('admin@bench.dev', 'Bench Admin', 'admin'),
+        *(user_row(email, 'Bench Instructor' if i == 0 else f'Instructor {i - 1}', 'instructor')
+          for i, email in enumerate(instructor_emails)),
+    ])
+    # Picked by email: bulk inserts do not promise to return rows in input order
+    staff_by_email = {user['email']: user for user in staff}
+    admin = staff_by_email['admin@bench.dev']
+    instructors = [staff_by_email[email] for email in instructor_emails]
+    instructor = instructors[0]
+    students = await db.create_users_bulk([
+        user_row(f'student{i}@bench.dev', f'Student {i}', 'student') for i in range(users)
+    ])
+    student = next(user for user in students if user['email'] == 'student0@bench.dev')
+
+    course_ids = []
+    for i in range(courses):
+        owner = instructor if i % 3 == 0 else instructors[i % len(instructors)]
+        course = await db.create_course(course_data(i, owner['id'], rng))
+        course_ids.append(course['id'])
+
+    enrollments = [
+        {'user_id': user['id'], 'course_id': course_id, 'progress': 0.0, 'completed_lessons': 0}
+        for user in students
+        for course_id in rng.sample(course_ids, enrollments_per_user)
+    ]
+    created = await db.create_enrollments_bulk(enrollments)
+    student_enrollments = [e for e in created if e['user_id'] == student['id']]
+
+    for i, enrollment in enumerate(created[:certificates]):
+        course = await db.get_course_by_id(enrollment['course_id'])
+        await db.create_certificate({
+            'user_id': enrollment['user_id'],
+            'course_id': enrollment['course_id'],
+            'instructor_id': course['instructor_id'],
+            'certificate_id': f'CERT-BENCH-{i:06d}',
+            'grade': rng.choice('ABC'),
+        })
+
+    fixture = Fixture(
+        admin=admin, instructor=instructor, student=student, users=students,
+        course_ids=course_ids, instructor_course_ids=course_ids[::3],
+        enrollment_ids=[e['id'] for e in student_enrollments],
+        extra={'student_course_ids': [e['course_id'] for e in student_enrollments]},
+    )
+    for role, user in (('admin', admin), ('instructor', instructor), ('student', student)):
+        token = create_access_token(user_claims(User(**user)), expires_delta=timedelta(hours=12))
+        fixture.headers[role] = {'Authorization': f'Bearer {token}'}
+    return fixture
@@ -0,0 +1,236 @@
+"""Async load generator: p50/p95/p99 latency and throughput for every API route.
+
+Requests go through httpx's ASGI transport straight into the app, so the
+numbers cover routing, auth, handlers, serialization and the storage
+backend, but not sockets. Run from the repository root:
+
+    python -m benchmarks.load --requests 200 --concurrency 20 --latency 0.005 --out load.json
+    python -m benchmarks.load --routes courses --compare load.json
+    python -m benchmarks.load --routes enrollment_progress --tail-prob 0.05 --tail-latency 0.2
+"""
+import argparse
+import asyncio
+import logging
+import random
+import sys
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+
+from benchmarks.common import compare_results, run_metadata, summarize, write_results
+from benchmarks.harness import PASSWORD, Fixture, course_data, create_app, seed
+
+# (method, url, httpx request kwargs)
+Request = Tuple[str, str, dict]
+
+
+@dataclass
+class Scenario:
+    name: str
+    build: Callable[[Fixture, int], Request]
+    ok: Tuple[int, ...] = (200,)
+    # Creates per-request resources (e.g. courses to delete) before timing starts
+    prepare: Optional[Callable[[object, Fixture, int], Awaitable[None]]] = None
+
+
+def pick(items, i):
+    return items[i % len(items)]
+
+
+async def prepare_disposable_courses(db, fixture: Fixture, count: int) -> None:
+    rng = random.Random(count)
+    fixture.extra['disposable_courses'] = [
+        (await db.create_course(course_data(10_000 + i, fixture.instructor['id'], rng)))['id']
+        for i in range(count)
+    ]
+
+
+async def prepare_certificate_verifier(db, fixture: Fixture, count: int) -> None:
+    from backend.verification import certificate_verifier
+    # The fixture is seeded after startup, so its certificates reach the filter through a sync
+    await certificate_verifier.sync()
+
+
+def import_users_body(i: int) -> str:
+    return '\n'.join(
+        f'{{"email": "import{i}-{n}@bench.dev", "name": "Imported {n}", "password": "{PASSWORD}"}}'
+        for n in range(5)
+    )
+
+
+def certificate_body(fixture: Fixture, i: int) -> dict:
+    return {
+        'user_id': pick(fixture.users, i)['id'],
+        'course_id': pick(fixture.course_ids, i),
+        'instructor_id': fixture.instructor['id'],
+        'certificate_id': 'ignored',
+        'grade': 'A',
+    }
+
+
+SCENARIOS = [
+    Scenario('root', lambda f, i: ('GET', '/api/', {})),
+    Scenario('ready', lambda f, i: ('GET', '/api/ready', {})),
+    Scenario('executor_stats', lambda f, i: ('GET', '/api/executor/stats', {'headers': f.headers['admin']})),
+    Scenario('cache_stats', lambda f, i: ('GET', '/api/cache/stats', {'headers': f.headers['admin']})),
+    Scenario('register', lambda f, i: ('POST', '/api/register', {'json': {
+        'email': f'load{i}@bench.dev', 'name': f'Load {i}', 'password': PASSWORD}})),
+    Scenario('login', lambda f, i: ('POST', '/api/login', {'json': {
+        'email': pick(f.users, i)['email'], 'password': PASSWORD}})),
+    Scenario('users_me', lambda f, i: ('GET', '/api/users/me', {'headers': f.headers['student']})),
+    Scenario('users_me_update', lambda f, i: ('PUT', '/api/users/me', {
+        'headers': f.headers['student'], 'json': {'bio': f'bio {i}'}})),
+    Scenario('courses', lambda f, i: ('GET', '/api/courses', {'params': {'limit': 100}})),
+    Scenario('courses_category', lambda f, i: ('GET', '/api/courses', {
+        'params': {'limit': 100, 'category': pick(('Tech', 'Business', 'Design'), i)}})),
+    Scenario('courses_cursor', lambda f, i: ('GET', '/api/courses', {'params': {'limit': 100, 'cursor': ''}})),
+    Scenario('courses_search', lambda f, i: ('GET', '/api/courses', {
+        'params': {'search': pick(('python', 'data sql', 'design', 'cloud sec'), i)}})),
+    Scenario('course', lambda f, i: ('GET', f'/api/courses/{pick(f.course_ids, i)}', {})),
+    Scenario('courses_batch', lambda f, i: ('GET', '/api/courses/batch', {
+        'params': {'ids': ','.join(pick(f.course_ids, i + n) for n in range(20))}})),
+    Scenario('users_batch', lambda f, i: ('GET', '/api/admin/users/batch', {
+        'headers': f.headers['admin'], 'params': {'ids': ','.join(pick(f.users, i + n)['id'] for n in range(20))}})),
+    Scenario('course_related', lambda f, i: ('GET', f'/api/courses/{pick(f.course_ids, i)}/related', {})),
+    Scenario('course_create', lambda f, i: ('POST', '/api/courses', {
+        'headers': f.headers['instructor'], 'json': course_data(20_000 + i, 'ignored', random.Random(i))})),
+    Scenario('course_update', lambda f, i: ('PUT', f'/api/courses/{pick(f.instructor_course_ids, i)}', {
+        'headers': f.headers['instructor'], 'json': {'price': float(i % 100)}})),
+    Scenario('course_delete', lambda f, i: ('DELETE', f"/api/courses/{f.extra['disposable_courses'][i]}", {
+        'headers': f.headers['admin']}), prepare=prepare_disposable_courses),
+    Scenario('course_analytics', lambda f, i: ('GET', f'/api/courses/{pick(f.instructor_course_ids, i)}/analytics', {
+        'headers': f.headers['instructor'], 'params': {'interval': pick(('day', 'week', 'month'), i)}})),
+    Scenario('course_rate', lambda f, i: ('POST', f"/api/courses/{pick(f.extra['student_course_ids'], i)}/ratings", {
+        'headers': f.headers['student'], 'json': {'rating': 1 + i % 5}})),
+    Scenario('course_stats_reconcile', lambda f, i: ('POST', '/api/admin/course-stats/reconcile', {
+        'headers': f.headers['admin']})),
+    Scenario('enroll', lambda f, i: ('POST', '/api/enrollments', {
+        'headers': f.headers['student'], 'json': {'user_id': 'ignored', 'course_id': f.extra['disposable_courses'][i]}}),
+        prepare=prepare_disposable_courses),
+    Scenario('enrollments_me', lambda f, i: ('GET', '/api/enrollments/me', {'headers': f.headers['student']})),
+    Scenario('enrollment_progress', lambda f, i: ('PUT', f'/api/enrollments/{pick(f.enrollment_ids, i)}/progress', {
+        'headers': f.headers['student'], 'params': {'progress': i % 99, 'completed_lessons': i % 10}})),
+    Scenario('certificates', lambda f, i: ('GET', '/api/certificates', {'headers': f.headers['admin']})),
+    Scenario('certificates_cursor', lambda f, i: ('GET', '/api/certificates', {
+        'headers': f.headers['admin'], 'params': {'cursor': ''}})),
+    Scenario('certificates_export', lambda f, i: ('GET', '/api/certificates/export', {
+        'headers': f.headers['admin'], 'params': {'format': pick(('ndjson', 'csv'), i)}})),
+    Scenario('certificates_me', lambda f, i: ('GET', '/api/certificates/me', {'headers': f.headers['student']})),
+    Scenario('certificate_pdf', lambda f, i: ('GET', f'/api/certificates/CERT-BENCH-{i % 10:06d}/pdf', {
+        'headers': f.headers['admin']})),
+    Scenario('certificate_verify', lambda f, i: ('GET', f'/api/verify/CERT-BENCH-{i % 10:06d}', {}),
+             prepare=prepare_certificate_verifier),
+    Scenario('certificate_verify_bogus', lambda f, i: ('GET', f'/api/verify/CERT-2024-{i:08X}', {}), ok=(404,),
+             prepare=prepare_certificate_verifier),
+    Scenario('certificate_create', lambda f, i: ('POST', '/api/certificates', {
+        'headers': f.headers['instructor'], 'json': certificate_body(f, i)})),
+    Scenario('import_users', lambda f, i: ('POST', '/api/admin/import/users', {
+        'headers': {**f.headers['admin'], 'Content-Type': 'application/x-ndjson'}, 'content': import_users_body(i)})),
+    Scenario('import_enrollments', lambda f, i: ('POST', '/api/admin/import/enrollments', {
+        'headers': {**f.headers['admin'], 'Content-Type': 'text/csv'},
+        'content': 'email,course_id\n' + '\n'.join(
+            f"{pick(f.users, i + n)['email']},{pick(f.course_ids, i * 7 + n)}" for n in range(5))})),
+    Scenario('status_create', lambda f, i: ('POST', '/api/status', {'json': {'client_name': f'client-{i % 10}'}})),
+    Scenario('status_list', lambda f, i: ('GET', '/api/status', {})),
+    Scenario('status_client', lambda f, i: ('GET', '/api/status', {'params': {'client_name': f'client-{i % 10}', 'limit': 100}})),
+    Scenario('status_recent', lambda f, i: ('GET', '/api/status/recent', {})),
+]
+
+
+async def run_scenario(client: httpx.AsyncClient, fixture: Fixture, scenario: Scenario,
+                       requests: int, concurrency: int) -> dict:
+    samples, errors, statuses = [], 0, {}
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            method, url, kwargs = scenario.build(fixture, i)
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            await response.aread()
+            samples.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code not in scenario.ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        **summarize(samples),
+        'errors': errors,
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+        'throughput_rps': len(samples) / elapsed if elapsed else 0.0,
+    }
+
+
+async def main_async(args) -> Dict[str, dict]:
+    app, db, fake = create_app(args.backend, args.latency, args.jitter, args.bcrypt_rounds)
+    scenarios = [s for s in SCENARIOS if not args.routes or s.name in args.routes]
+
+    results = {}
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client, \
+            app.router.lifespan_context(app):
+        fixture = await seed(db, users=args.users, courses=args.courses)
+        if fake:
+            # Faults start after seeding so the fixture itself is complete
+            fake.tail_prob, fake.tail_latency, fake.error_rate = args.tail_prob, args.tail_latency, args.error_rate
+        for scenario in scenarios:
+            if scenario.prepare:
+                await scenario.prepare(db, fixture, args.requests)
+            before = dict(fake.requests) if fake else {}
+            result = await run_scenario(client, fixture, scenario, args.requests, args.concurrency)
+            if fake:
+                round_trips = sum(fake.requests.values()) - sum(before.values())
+                result['db_round_trips_per_request'] = round_trips / result['count']
+            results[scenario.name] = result
+            print(
+                f"{scenario.name:<22} p50 {result['p50_ms']:8.2f}  p95 {result['p95_ms']:8.2f}  "
+                f"p99 {result['p99_ms']:8.2f} ms  {result['throughput_rps']:8.1f} req/s  "
+                f"errors {result['errors']}"
+                + (f"  db/req {result['db_round_trips_per_request']:.2f}" if fake else ''),
+                flush=True,
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--backend', choices=('fake', 'sqlite'), default='fake')
+    parser.add_argument('--latency', type=float, default=0.005, help='fake round-trip latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra random latency, up to this many seconds')
+    parser.add_argument('--tail-prob', type=float, default=0.0, help='fraction of fake requests that are slow')
+    parser.add_argument('--tail-latency', type=float, default=0.0, help='extra seconds a slow fake request takes')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of fake requests that fail')
+    parser.add_argument('--requests', type=int, default=200, help='requests per route')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--courses', type=int, default=300)
+    parser.add_argument('--bcrypt-rounds', type=int, help='override BCRYPT_ROUNDS (login/register cost)')
+    parser.add_argument('--routes', nargs='+', help='only run these scenarios')
+    parser.add_argument('--out', help='write results as JSON')
+    parser.add_argument('--compare', help='compare against a previous --out file')
+    parser.add_argument('--metric', default='p95_ms')
+    parser.add_argument('--threshold', type=float, default=0.10, help='allowed slowdown before failing')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = asyncio.run(main_async(args))
+
+    if args.out:
+        meta = run_metadata(
+            backend=args.backend, latency=args.latency, jitter=args.jitter, tail_prob=args.tail_prob,
+            tail_latency=args.tail_latency, error_rate=args.error_rate, requests=args.requests,
+            concurrency=args.concurrency, users=args.users, courses=args.courses,
+        )
+        write_results(args.out, 'load', results, meta)
+    if args.compare and compare_results(args.compare, results, args.metric, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
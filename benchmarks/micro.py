@@ -0,0 +1,122 @@
+"""Microbenchmarks: auth, Database/backend row transforms and model serialization.
+
+Run from the repository root:
+
+    python -m benchmarks.micro --out micro.json
+    python -m benchmarks.micro --group auth --compare micro.json
+"""
+import argparse
+import sys
+import uuid
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.common import bench, compare_results, prepare_environment, run_metadata, write_results
+
+Benchmark = Tuple[str, Callable[[], object]]
+
+
+def auth_benchmarks() -> List[Benchmark]:
+    import jwt
+    from fastapi.security import HTTPAuthorizationCredentials
+
+    from backend.auth import (
+        ALGORITHM, SECRET_KEY, create_access_token, get_current_claims, get_current_user, get_password_hash,
+        user_claims, verify_password,
+    )
+    from backend.cache import user_cache
+    from backend.models import User
+    from backend.revocation import revocations
+    from benchmarks.serialization import run_sync
+
+    user_id = str(uuid.uuid4())
+    user = User(id=user_id, email='bench@bench.dev', name='Bench', role='student', created_at='2026-01-01T00:00:00')
+    claims = user_claims(user)
+    token = create_access_token(claims)
+    user_cache.set(user_id, user)
+    credentials = HTTPAuthorizationCredentials(scheme='Bearer', credentials=token)
+    hashed = get_password_hash('bench-password')
+    return [
+        ('create_access_token', lambda: create_access_token(claims)),
+        ('jwt_decode', lambda: jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])),
+        ('revocation_check', lambda: revocations.is_revoked('bench-jti', user_id, 0.0)),
+        ('get_current_claims', lambda: run_sync(get_current_claims(credentials))),
+        ('get_current_user_cached', lambda: run_sync(get_current_user(run_sync(get_current_claims(credentials))))),
+        ('verify_password', lambda: verify_password('bench-password', hashed)),
+    ]
+
+
+def transform_benchmarks() -> List[Benchmark]:
+    from backend.pagination import decode_cursor, encode_cursor, next_cursor
+    from backend.search import CourseSearchIndex
+    from backend.storage.supabase_backend import flatten_certificate, flatten_course
+    from benchmarks.serialization import make_course_rows
+
+    rows = make_course_rows(100)
+    embedded = [
+        {**{k: v for k, v in row.items() if not k.startswith('instructor_')},
+         'users': {'name': row['instructor_name'], 'avatar': row['instructor_avatar']}}
+        for row in rows
+    ]
+    certificates = [
+        {'id': str(uuid.uuid4()), 'user_id': row['instructor_id'], 'course_id': row['id'],
+         'instructor_id': row['instructor_id'], 'certificate_id': f'CERT-{i}', 'grade': 'A',
+         'issued_at': row['created_at'], 'users': {'name': 'Student'}, 'courses': {'title': row['title']},
+         'instructors': {'name': row['instructor_name']}}
+        for i, row in enumerate(rows)
+    ]
+    index = CourseSearchIndex()
+    index.finish_build(make_course_rows(1000))
+    cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+
+    # Flattening works in place, so each run flattens fresh shallow copies (included in the timing)
+    return [
+        ('flatten_course[100]', lambda: [flatten_course({**row, 'users': row['users']}) for row in embedded]),
+        ('flatten_certificate[100]', lambda: [flatten_certificate(dict(cert)) for cert in certificates]),
+        ('next_cursor', lambda: next_cursor(rows, 100, 'created_at')),
+        ('decode_cursor', lambda: decode_cursor(cursor)),
+        ('search_index[1000 courses]', lambda: index.search('learn python', limit=20)),
+    ]
+
+
+def serialization_benchmarks() -> List[Benchmark]:
+    from benchmarks.serialization import PATHS, make_course_rows
+
+    rows = make_course_rows(100)
+    return [(f'{name}[100]', lambda func=func: func(rows)) for name, func in PATHS.items()]
+
+
+GROUPS: Dict[str, Callable[[], List[Benchmark]]] = {
+    'auth': auth_benchmarks,
+    'transforms': transform_benchmarks,
+    'serialization': serialization_benchmarks,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--group', choices=list(GROUPS), nargs='+', default=list(GROUPS))
+    parser.add_argument('--min-time', type=float, default=0.5, help='seconds per benchmark')
+    parser.add_argument('--bcrypt-rounds', type=int, help='override BCRYPT_ROUNDS')
+    parser.add_argument('--out', help='write results as JSON')
+    parser.add_argument('--compare', help='compare against a previous --out file')
+    parser.add_argument('--metric', default='p50_ms')
+    parser.add_argument('--threshold', type=float, default=0.10, help='allowed slowdown before failing')
+    args = parser.parse_args()
+
+    prepare_environment(args.bcrypt_rounds)
+    results = {}
+    for group in args.group:
+        for name, func in GROUPS[group]():
+            result = bench(func, args.min_time)
+            results[f'{group}.{name}'] = result
+            print(f"{group + '.' + name:<48} p50 {result['p50_ms'] * 1000:10.1f} us  "
+                  f"p99 {result['p99_ms'] * 1000:10.1f} us  ({result['count']} runs)", flush=True)
+
+    if args.out:
+        write_results(args.out, 'micro', results, run_metadata(groups=args.group))
+    if args.compare and compare_results(args.compare, results, args.metric, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+-- Refresh tokens and access-token revocations for claims-based auth.
+-- Access tokens are stateless JWTs; refresh_tokens holds one row per issued
+-- refresh token so it can be rotated (revoked_at set on use) and revoked.
+-- token_revocations lists revoked access tokens (jti) and users whose tokens
+-- issued before revoked_at are void; rows only live until the access tokens
+-- they cover have expired, and every API worker keeps them in memory.
+
+create table if not exists refresh_tokens (
+  id uuid primary key,
+  user_id uuid not null references users(id) on delete cascade,
+  created_at timestamptz default now(),
+  expires_at timestamptz not null,
+  revoked_at timestamptz
+);
+
+create index if not exists refresh_tokens_user_id_idx on refresh_tokens (user_id);
+create index if not exists refresh_tokens_expires_at_idx on refresh_tokens (expires_at);
+
+create table if not exists token_revocations (
+  id uuid primary key,
+  jti text,
+  user_id uuid references users(id) on delete cascade,
+  revoked_at timestamptz not null default now(),
+  expires_at timestamptz not null,
+  check (jti is not null or user_id is not null)
+);
+
+create index if not exists token_revocations_revoked_at_idx on token_revocations (revoked_at);
+create index if not exists token_revocations_expires_at_idx on token_revocations (expires_at);
+
+-- Only the API touches these, with the service key (see SUPABASE_SERVICE_ROLE_KEY), which bypasses RLS.
+-- RLS on with no policies keeps anon and authenticated clients from reading, un-revoking or forging rows
+alter table refresh_tokens enable row level security;
+alter table token_revocations enable row level security;
+drop policy if exists "API manage refresh_tokens" on refresh_tokens;
+drop policy if exists "API manage token_revocations" on token_revocations;
+revoke all on refresh_tokens, token_revocations from anon, authenticated;
@@ -0,0 +1,43 @@
+-- Full-text search over courses (alternative to the API's in-memory index)
+-- Enable with SEARCH_BACKEND=database
+
+alter table courses
+  add column if not exists search_vector tsvector
+  generated always as (
+    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(category, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+  ) stored;
+
+create index if not exists courses_search_vector_idx on courses using gin (search_vector);
+
+-- Ranked search with prefix matching on every query token.
+-- Returns the same flattened shape the API builds for courses.
+create or replace function search_courses(
+  q text,
+  category_filter text default null,
+  lim integer default 100,
+  off integer default 0
+)
+returns setof jsonb
+language sql
+stable
+as $$
+  with query as (
+    select to_tsquery('simple', string_agg(quote_literal(token) || ':*', ' & ')) as tsq
+    from regexp_split_to_table(lower(trim(q)), '[^[:alnum:]]+') as token
+    where token <> ''
+  )
+  select (to_jsonb(c) - 'search_vector')
+         || jsonb_build_object('instructor_name', u.name, 'instructor_avatar', u.avatar)
+  from query, courses c
+  left join users u on u.id = c.instructor_id
+  where query.tsq is not null
+    and c.search_vector @@ query.tsq
+    and (category_filter is null or c.category = category_filter)
+  order by ts_rank(c.search_vector, query.tsq) desc, c.id
+  limit lim
+  offset off;
+$$;
+
+grant execute on function search_courses(text, text, integer, integer) to anon, authenticated;
@@ -0,0 +1,104 @@
+-- Incrementally maintained course statistics (students, completions, ratings).
+-- The API buffers per-course deltas and applies them in batches with
+-- apply_course_stat_deltas; reconcile_course_stats recomputes everything
+-- from enrollments/course_ratings to repair drift.
+
+alter table courses add column if not exists completions integer default 0;
+alter table courses add column if not exists rating_count integer default 0;
+alter table courses add column if not exists rating_sum numeric default 0;
+
+create table if not exists course_ratings (
+  id uuid primary key default gen_random_uuid(),
+  user_id uuid references users(id) on delete cascade,
+  course_id uuid references courses(id) on delete cascade,
+  rating smallint not null check (rating between 1 and 5),
+  review text,
+  created_at timestamptz default now(),
+  updated_at timestamptz,
+  unique (user_id, course_id)
+);
+
+create index if not exists course_ratings_course_id_idx on course_ratings (course_id);
+create index if not exists enrollments_course_id_idx on enrollments (course_id);
+
+alter table course_ratings enable row level security;
+create policy if not exists "Anyone can read ratings" on course_ratings for select using (true);
+create policy if not exists "User insert own ratings" on course_ratings for insert
+  with check (auth.uid() = user_id);
+create policy if not exists "User update own ratings" on course_ratings for update
+  using (auth.uid() = user_id);
+
+-- deltas: [{"course_id", "students", "completions", "rating_count", "rating_sum"}, ...]
+create or replace function apply_course_stat_deltas(deltas jsonb)
+returns integer
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+  updated integer;
+begin
+  update courses c
+  set students = coalesce(c.students, 0) + d.students,
+      completions = coalesce(c.completions, 0) + d.completions,
+      rating_count = coalesce(c.rating_count, 0) + d.rating_count,
+      rating_sum = coalesce(c.rating_sum, 0) + d.rating_sum,
+      rating = case
+        when coalesce(c.rating_count, 0) + d.rating_count > 0
+        then round((coalesce(c.rating_sum, 0) + d.rating_sum) / (coalesce(c.rating_count, 0) + d.rating_count), 2)
+        else 0
+      end
+  from jsonb_to_recordset(deltas)
+    as d(course_id uuid, students integer, completions integer, rating_count integer, rating_sum numeric)
+  where c.id = d.course_id;
+  get diagnostics updated = row_count;
+  return updated;
+end;
+$$;
+
+-- Recompute every course's statistics; returns the number of courses that had drifted
+create or replace function reconcile_course_stats()
+returns integer
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+  fixed integer;
+begin
+  update courses c
+  set students = s.students,
+      completions = s.completions,
+      rating_count = s.rating_count,
+      rating_sum = s.rating_sum,
+      rating = case when s.rating_count > 0 then round(s.rating_sum / s.rating_count, 2) else 0 end
+  from (
+    select c.id,
+           coalesce(e.students, 0) as students,
+           coalesce(e.completions, 0) as completions,
+           coalesce(r.rating_count, 0) as rating_count,
+           coalesce(r.rating_sum, 0) as rating_sum
+    from courses c
+    left join (
+      select course_id, count(*) as students, count(completed_at) as completions
+      from enrollments group by course_id
+    ) e on e.course_id = c.id
+    left join (
+      select course_id, count(*) as rating_count, sum(rating) as rating_sum
+      from course_ratings group by course_id
+    ) r on r.course_id = c.id
+  ) s
+  where c.id = s.id
+    and (c.students, c.completions, c.rating_count, c.rating_sum)
+        is distinct from (s.students, s.completions, s.rating_count, s.rating_sum);
+  get diagnostics fixed = row_count;
+  return fixed;
+end;
+$$;
+
+-- These write course counters as definer, so only the API (service key, see
+-- SUPABASE_SERVICE_ROLE_KEY) may call them; the anon key ships with the frontend
+revoke execute on function apply_course_stat_deltas(jsonb) from public, anon, authenticated;
+revoke execute on function reconcile_course_stats() from public, anon, authenticated;
+grant execute on function apply_course_stat_deltas(jsonb) to service_role;
+grant execute on function reconcile_course_stats() to service_role;
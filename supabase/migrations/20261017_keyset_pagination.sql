@@ -0,0 +1,10 @@
+-- Indexes backing keyset (cursor) pagination on (timestamp, id), newest first
+
+create index if not exists courses_created_at_id_idx
+  on courses (created_at desc, id desc);
+
+create index if not exists courses_category_created_at_id_idx
+  on courses (category, created_at desc, id desc);
+
+create index if not exists certificates_issued_at_id_idx
+  on certificates (issued_at desc, id desc);
@@ -0,0 +1,69 @@
+-- Status checks as a time series: time/client indexes, hourly rollups and retention.
+-- The API batch-inserts raw checks; downsample_status_checks folds raw checks older
+-- than raw_before into hourly per-client rollups (deleting them) and expires rollups
+-- older than rollups_before.
+
+create index if not exists status_checks_timestamp_id_idx
+  on status_checks (timestamp desc, id desc);
+
+create index if not exists status_checks_client_timestamp_id_idx
+  on status_checks (client_name, timestamp desc, id desc);
+
+create table if not exists status_check_rollups (
+  client_name text not null,
+  bucket_start timestamptz not null,
+  checks integer not null,
+  first_seen timestamptz not null,
+  last_seen timestamptz not null,
+  primary key (client_name, bucket_start)
+);
+
+create index if not exists status_check_rollups_bucket_start_idx
+  on status_check_rollups (bucket_start desc);
+
+alter table status_check_rollups enable row level security;
+create policy if not exists "Anyone read status_check_rollups" on status_check_rollups for select using (true);
+
+create or replace function downsample_status_checks(raw_before timestamptz, rollups_before timestamptz)
+returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+  raw_deleted integer;
+  rollups_written integer;
+  rollups_expired integer;
+begin
+  with expired_raw as (
+    delete from status_checks
+    where timestamp < raw_before
+    returning client_name, timestamp
+  ), written as (
+    insert into status_check_rollups as r (client_name, bucket_start, checks, first_seen, last_seen)
+    select client_name, date_trunc('hour', timestamp), count(*), min(timestamp), max(timestamp)
+    from expired_raw
+    group by 1, 2
+    on conflict (client_name, bucket_start) do update
+      set checks = r.checks + excluded.checks,
+          first_seen = least(r.first_seen, excluded.first_seen),
+          last_seen = greatest(r.last_seen, excluded.last_seen)
+    returning 1
+  )
+  select (select count(*) from expired_raw), (select count(*) from written)
+  into raw_deleted, rollups_written;
+
+  delete from status_check_rollups where bucket_start < rollups_before;
+  get diagnostics rollups_expired = row_count;
+
+  return jsonb_build_object(
+    'raw_deleted', raw_deleted,
+    'rollups_written', rollups_written,
+    'rollups_expired', rollups_expired
+  );
+end;
+$$;
+
+-- Deletes raw checks as definer, so only the API (service key, see SUPABASE_SERVICE_ROLE_KEY) may run it
+revoke execute on function downsample_status_checks(timestamptz, timestamptz) from public, anon, authenticated;
+grant execute on function downsample_status_checks(timestamptz, timestamptz) to service_role;
@@ -0,0 +1,29 @@
+-- Batched enrollment progress writes from the API's write-behind buffer.
+-- A pure UPDATE: ids that no longer exist (e.g. their course was deleted)
+-- are skipped instead of turning into inserts that violate the foreign keys.
+
+-- updates: [{"id", "progress", "completed_lessons", "completed_at"}, ...]; a null
+-- completed_at keeps the stored one
+create or replace function update_enrollments_progress(updates jsonb)
+returns integer
+language plpgsql
+set search_path = public
+as $$
+declare
+  updated integer;
+begin
+  update enrollments e
+  set progress = u.progress,
+      completed_lessons = u.completed_lessons,
+      completed_at = coalesce(u.completed_at, e.completed_at)
+  from jsonb_to_recordset(updates)
+    as u(id uuid, progress double precision, completed_lessons integer, completed_at timestamptz)
+  where e.id = u.id;
+  get diagnostics updated = row_count;
+  return updated;
+end;
+$$;
+
+-- Only the API (service key, see SUPABASE_SERVICE_ROLE_KEY) calls it
+revoke execute on function update_enrollments_progress(jsonb) from public, anon, authenticated;
+grant execute on function update_enrollments_progress(jsonb) to service_role;
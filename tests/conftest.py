@@ -0,0 +1,66 @@
+import uuid
+from typing import Optional
+
+import pytest
+
+from backend.catalog import catalog_cache
+from backend.database import Database
+from backend.storage.sqlite_backend import SQLiteBackend
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.fixture
+async def database():
+    """The Database facade over a fresh in-memory SQLite backend"""
+    database = Database(SQLiteBackend())
+    yield database
+    await database.close()
+    catalog_cache.clear()
+
+
+@pytest.fixture
+def make_user(database):
+    async def make_user(role: str = 'student', **fields) -> dict:
+        return await database.create_user({
+            'email': f'{uuid.uuid4().hex[:12]}@example.com',
+            'name': 'Test User',
+            'password': 'not-a-real-hash',
+            'role': role,
+            **fields,
+        })
+    return make_user
+
+
+@pytest.fixture
+def make_course(database, make_user):
+    async def make_course(instructor_id: Optional[str] = None, **fields) -> dict:
+        if instructor_id is None:
+            instructor_id = (await make_user('instructor'))['id']
+        return await database.create_course({
+            'title': 'Test course',
+            'description': 'A course used by the tests',
+            'category': 'Tech',
+            'duration': '2h',
+            'image': 'https://images.example.com/test.jpg',
+            'gradient': 'from-blue-500 to-purple-600',
+            'icon': 'code',
+            'instructor_id': instructor_id,
+            'lessons': 10,
+            **fields,
+        })
+    return make_course
+
+
+@pytest.fixture
+def make_enrollment(database, make_user, make_course):
+    async def make_enrollment(user_id: Optional[str] = None, course_id: Optional[str] = None) -> dict:
+        user_id = user_id or (await make_user())['id']
+        course_id = course_id or (await make_course())['id']
+        return await database.create_enrollment({
+            'user_id': user_id, 'course_id': course_id, 'progress': 0.0, 'completed_lessons': 0,
+        })
+    return make_enrollment
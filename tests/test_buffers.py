@@ -0,0 +1,157 @@
+"""Failure paths of the write-behind buffers: progress, status checks and course statistics"""
+import pytest
+from postgrest.exceptions import APIError
+
+from backend.progress_buffer import ProgressBuffer
+from backend.resilience import Unavailable
+from backend.status_checks import StatusCheckStore
+
+pytestmark = pytest.mark.anyio
+
+
+def failing(exc: BaseException):
+    calls = []
+
+    async def write(*args, **kwargs):
+        calls.append(args)
+        raise exc
+    write.calls = calls
+    return write
+
+
+def rejected() -> APIError:
+    return APIError({'code': '23503', 'message': 'foreign key violation', 'details': None, 'hint': None})
+
+
+async def test_progress_is_kept_while_the_database_is_unavailable(database, make_enrollment, monkeypatch):
+    enrollment = await make_enrollment()
+    buffer = ProgressBuffer(database, max_attempts=2)
+    await buffer.submit(enrollment['id'], enrollment['user_id'], enrollment['course_id'], 40.0, 4)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(database, 'update_enrollments_progress', failing(Unavailable('down')))
+        for _ in range(5):
+            with pytest.raises(Unavailable):
+                await buffer.flush()
+    assert buffer.stats()['pending'] == 1
+    assert buffer.stats()['dropped_total'] == 0
+
+    assert await buffer.flush() == 1
+    assert (await database.get_enrollment_by_id(enrollment['id']))['progress'] == 40.0
+
+
+async def test_rejected_progress_is_dropped_after_max_attempts(database, make_enrollment, monkeypatch):
+    enrollment = await make_enrollment()
+    buffer = ProgressBuffer(database, max_attempts=2)
+    await buffer.submit(enrollment['id'], enrollment['user_id'], enrollment['course_id'], 40.0, 4)
+
+    monkeypatch.setattr(database, 'update_enrollments_progress', failing(rejected()))
+    with pytest.raises(APIError):
+        await buffer.flush()
+    assert buffer.stats()['pending'] == 1
+    with pytest.raises(APIError):
+        await buffer.flush()
+    assert buffer.stats()['pending'] == 0
+    assert buffer.stats()['dropped_total'] == 1
+    assert await buffer.flush() == 0
+
+
+async def test_failed_progress_batch_does_not_clobber_newer_updates(database, make_enrollment, monkeypatch):
+    enrollment = await make_enrollment()
+    buffer = ProgressBuffer(database)
+    await buffer.submit(enrollment['id'], enrollment['user_id'], enrollment['course_id'], 40.0, 4)
+
+    async def heartbeat_during_outage(updates):
+        await buffer.submit(enrollment['id'], enrollment['user_id'], enrollment['course_id'], 60.0, 6)
+        raise Unavailable('down')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(database, 'update_enrollments_progress', heartbeat_during_outage)
+        with pytest.raises(Unavailable):
+            await buffer.flush()
+
+    await buffer.flush()
+    assert (await database.get_enrollment_by_id(enrollment['id']))['progress'] == 60.0
+
+
+async def test_completion_is_counted_once_its_flush_succeeds(database, make_enrollment, monkeypatch):
+    enrollment = await make_enrollment()
+    await database.course_stats.flush()
+    buffer = ProgressBuffer(database)
+    await buffer.get_enrollment(enrollment['id'])
+
+    with monkeypatch.context() as patch:
+        patch.setattr(database, 'update_enrollments_progress', failing(Unavailable('down')))
+        with pytest.raises(Unavailable):
+            await buffer.submit(enrollment['id'], enrollment['user_id'], enrollment['course_id'], 100.0, 10)
+    await database.course_stats.flush()
+    assert (await database.backend.get_course_by_id(enrollment['course_id']))['completions'] == 0
+
+    await buffer.flush()
+    await database.course_stats.flush()
+    assert (await database.backend.get_course_by_id(enrollment['course_id']))['completions'] == 1
+
+
+async def test_deleted_course_is_forgotten(database, make_enrollment):
+    enrollment = await make_enrollment()
+    buffer = ProgressBuffer(database)
+    assert await buffer.get_enrollment(enrollment['id']) is not None
+    await buffer.submit(enrollment['id'], enrollment['user_id'], enrollment['course_id'], 40.0, 4)
+
+    await database.delete_course(enrollment['course_id'])
+    buffer.forget_course(enrollment['course_id'])
+    assert buffer.stats()['pending'] == 0
+    assert await buffer.get_enrollment(enrollment['id']) is None
+
+
+async def test_status_check_is_returned_when_its_flush_fails(database, monkeypatch):
+    store = StatusCheckStore(database, max_pending=2, maintenance_interval=0)
+    write = failing(Unavailable('down'))
+    monkeypatch.setattr(database, 'create_status_checks_bulk', write)
+
+    checks = [await store.record('agent') for _ in range(4)]
+    assert store.recent('agent')[0]['id'] == checks[-1]['id']
+    assert store.stats()['pending'] == 4
+    # After one failed size flush, retries are left to the background flush
+    assert len(write.calls) == 1
+
+
+async def test_status_backlog_drops_the_oldest_checks(database, monkeypatch):
+    store = StatusCheckStore(database, max_pending=1, maintenance_interval=0)
+    monkeypatch.setattr(database, 'create_status_checks_bulk', failing(Unavailable('down')))
+
+    checks = [await store.record('agent') for _ in range(store.max_backlog + 5)]
+    with pytest.raises(Unavailable):
+        await store.flush()
+    assert store.stats()['dropped_total'] == 5
+    assert store._pending[0]['id'] == checks[5]['id']
+
+
+async def test_status_flush_recovers_after_an_outage(database, monkeypatch):
+    store = StatusCheckStore(database, max_pending=2, maintenance_interval=0)
+    with monkeypatch.context() as patch:
+        patch.setattr(database, 'create_status_checks_bulk', failing(Unavailable('down')))
+        for _ in range(3):
+            await store.record('agent')
+
+    assert await store.flush() == 3
+    await store.record('agent')
+    await store.record('agent')
+    assert store.stats()['pending'] == 0
+    assert len(await database.get_status_checks(client_name='agent')) == 5
+
+
+async def test_course_stat_deltas_are_merged_back_on_failure(database, make_course, monkeypatch):
+    course = await make_course()
+    stats = database.course_stats
+    stats.record(course['id'], students=1)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(database, 'apply_course_stat_deltas', failing(Unavailable('down')))
+        with pytest.raises(Unavailable):
+            await stats.flush()
+    stats.record(course['id'], students=2, rating_count=1, rating_sum=4)
+
+    await stats.flush()
+    stored = await database.backend.get_course_by_id(course['id'])
+    assert (stored['students'], stored['rating_count'], stored['rating']) == (3, 1, 4.0)
@@ -0,0 +1,196 @@
+"""Breaker, retry, hedge and deadline behaviour of Resilience.call"""
+import asyncio
+
+import httpx
+import pytest
+from postgrest.exceptions import APIError
+
+from backend.executor import ExecutorSaturated
+from backend.resilience import CLOSED, HALF_OPEN, OPEN, CircuitOpen, DeadlineExceeded, Resilience, Unavailable
+
+pytestmark = pytest.mark.anyio
+
+
+def policy(**overrides) -> Resilience:
+    settings = dict(read_deadline=1.0, write_deadline=1.0, retries=2, backoff_base=0.001, backoff_cap=0.001,
+                    hedge_delay=0.01, hedge_ratio=1.0, failure_threshold=3, reset_timeout=0.05)
+    settings.update(overrides)
+    return Resilience(**settings)
+
+
+class Attempts:
+    """A storage round trip that plays back a script of outcomes, one per call"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def __call__(self):
+        outcome = self.outcomes[min(self.calls, len(self.outcomes) - 1)]
+        self.calls += 1
+        if isinstance(outcome, BaseException):
+            raise outcome
+        if callable(outcome):
+            return await outcome()
+        return outcome
+
+
+def sleep_then(seconds: float, value=None):
+    async def outcome():
+        await asyncio.sleep(seconds)
+        return value
+    return outcome
+
+
+async def open_breaker(resilience: Resilience, table: str = 'courses') -> None:
+    failing = Attempts(httpx.ConnectError('down'))
+    for _ in range(resilience.failure_threshold):
+        with pytest.raises(Unavailable):
+            await resilience.call(table, 'create_course', failing)
+    assert resilience.breaker(table).state == OPEN
+
+
+async def test_reads_are_retried_on_transient_failures():
+    resilience = policy()
+    attempt = Attempts(httpx.ConnectError('reset'), httpx.ReadTimeout('slow'), 'rows')
+    assert await resilience.call('courses', 'get_courses', attempt, read=True) == 'rows'
+    assert attempt.calls == 3
+    assert resilience.breaker('courses').failures == 0
+
+
+async def test_reads_surface_unavailable_once_retries_run_out():
+    resilience = policy(retries=1)
+    attempt = Attempts(httpx.ConnectError('down'))
+    with pytest.raises(Unavailable):
+        await resilience.call('courses', 'get_courses', attempt, read=True)
+    assert attempt.calls == 2
+
+
+async def test_writes_are_not_retried():
+    resilience = policy()
+    attempt = Attempts(httpx.ConnectError('down'), 'row')
+    with pytest.raises(Unavailable):
+        await resilience.call('courses', 'create_course', attempt)
+    assert attempt.calls == 1
+
+
+async def test_rejected_requests_are_neither_retried_nor_counted_as_failures():
+    resilience = policy()
+    attempt = Attempts(APIError({'code': '23505', 'message': 'duplicate key', 'details': None, 'hint': None}))
+    with pytest.raises(APIError):
+        await resilience.call('users', 'get_user_by_email', attempt, read=True)
+    assert attempt.calls == 1
+    assert resilience.breaker('users').failures == 0
+
+
+async def test_deadline_releases_the_caller():
+    resilience = policy(read_deadline=0.01, retries=0)
+    with pytest.raises(DeadlineExceeded):
+        await resilience.call('courses', 'get_courses', Attempts(sleep_then(1.0)), read=True)
+
+
+async def test_breaker_opens_and_fails_fast():
+    resilience = policy()
+    await open_breaker(resilience)
+
+    attempt = Attempts('row')
+    with pytest.raises(CircuitOpen):
+        await resilience.call('courses', 'create_course', attempt)
+    assert attempt.calls == 0
+    # Other tables have breakers of their own
+    assert await resilience.call('users', 'create_user', attempt) == 'row'
+
+
+async def test_half_open_probe_closes_the_breaker():
+    resilience = policy()
+    await open_breaker(resilience)
+    await asyncio.sleep(resilience.reset_timeout)
+
+    assert await resilience.call('courses', 'create_course', Attempts('row')) == 'row'
+    assert resilience.breaker('courses').state == CLOSED
+
+
+async def test_failed_probe_reopens_the_breaker():
+    resilience = policy()
+    await open_breaker(resilience)
+    await asyncio.sleep(resilience.reset_timeout)
+
+    with pytest.raises(Unavailable):
+        await resilience.call('courses', 'create_course', Attempts(httpx.ConnectError('still down')))
+    assert resilience.breaker('courses').state == OPEN
+
+
+async def test_half_open_lets_one_probe_through():
+    resilience = policy()
+    await open_breaker(resilience)
+    await asyncio.sleep(resilience.reset_timeout)
+
+    probe = asyncio.ensure_future(resilience.call('courses', 'create_course', Attempts(sleep_then(0.02, 'row'))))
+    await asyncio.sleep(0)
+    with pytest.raises(CircuitOpen):
+        await resilience.call('courses', 'create_course', Attempts('row'))
+    assert await probe == 'row'
+    assert resilience.breaker('courses').state == CLOSED
+
+
+async def test_cancelled_probe_is_released():
+    resilience = policy()
+    await open_breaker(resilience)
+    await asyncio.sleep(resilience.reset_timeout)
+
+    probe = asyncio.ensure_future(resilience.call('courses', 'create_course', Attempts(sleep_then(10))))
+    await asyncio.sleep(0.01)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    assert resilience.breaker('courses').state == HALF_OPEN
+    assert await resilience.call('courses', 'create_course', Attempts('row')) == 'row'
+    assert resilience.breaker('courses').state == CLOSED
+
+
+async def test_lost_probe_is_replaced_after_reset_timeout():
+    resilience = policy()
+    await open_breaker(resilience)
+    await asyncio.sleep(resilience.reset_timeout)
+    breaker = resilience.breaker('courses')
+
+    # A probe that never reports back
+    breaker.before_call()
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+    await asyncio.sleep(resilience.reset_timeout)
+    breaker.before_call()
+
+
+async def test_executor_saturation_does_not_trip_the_breaker():
+    resilience = policy(failure_threshold=1)
+    with pytest.raises(ExecutorSaturated):
+        await resilience.call('courses', 'create_course', Attempts(ExecutorSaturated('busy')))
+    assert resilience.breaker('courses').state == CLOSED
+
+
+async def test_hedge_answers_a_slow_read():
+    resilience = policy()
+    attempt = Attempts(sleep_then(1.0, 'slow'), 'fast')
+    assert await resilience.call('courses', 'get_course_by_id', attempt, read=True, hedge=True) == 'fast'
+    assert attempt.calls == 2
+    assert resilience.hedges == 1
+    assert resilience.hedge_wins == 1
+
+
+async def test_hedges_are_capped_by_ratio():
+    resilience = policy(hedge_ratio=0.0)
+    attempt = Attempts(sleep_then(0.03, 'slow'), 'fast')
+    assert await resilience.call('courses', 'get_course_by_id', attempt, read=True, hedge=True) == 'slow'
+    assert attempt.calls == 1
+    assert resilience.hedges == 0
+
+
+async def test_fast_reads_are_not_hedged():
+    resilience = policy()
+    attempt = Attempts('row')
+    assert await resilience.call('courses', 'get_course_by_id', attempt, read=True, hedge=True) == 'row'
+    assert attempt.calls == 1
+    assert resilience.hedged_reads == 1
+    assert resilience.hedges == 0
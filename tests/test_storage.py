@@ -0,0 +1,202 @@
+"""The contract every storage backend implements, checked on SQLite through the Database facade"""
+from datetime import datetime, timedelta
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_user_round_trip(database, make_user):
+    user = await make_user(name='Ada')
+    assert (await database.get_user_by_email(user['email']))['id'] == user['id']
+    assert (await database.get_user_by_id(user['id']))['name'] == 'Ada'
+
+    updated = await database.update_user(user['id'], {'name': 'Ada L.'})
+    assert updated['name'] == 'Ada L.'
+    assert updated['updated_at'] is not None
+    assert await database.get_user_by_id('missing') is None
+
+
+async def test_user_ids_updated_since(database, make_user):
+    untouched = await make_user()
+    edited = await make_user()
+    since = datetime.utcnow()
+    await database.update_user(edited['id'], {'bio': 'hello'})
+
+    updated = await database.get_user_ids_updated_since(since)
+    assert edited['id'] in updated
+    assert untouched['id'] not in updated
+
+
+async def test_create_users_bulk_skips_existing_emails(database, make_user):
+    existing = await make_user()
+    rows = [
+        {'email': 'first@example.com', 'name': 'First', 'password': 'x', 'role': 'student'},
+        {'email': existing['email'], 'name': 'Dup', 'password': 'x', 'role': 'student'},
+        {'email': 'second@example.com', 'name': 'Second', 'password': 'x', 'role': 'student'},
+    ]
+    created = await database.create_users_bulk(rows)
+    assert [user['email'] for user in created] == ['first@example.com', 'second@example.com']
+    assert (await database.get_user_by_email(existing['email']))['name'] == existing['name']
+
+
+async def test_get_users_and_courses_by_ids_ignore_unknown_ids(database, make_user, make_course):
+    user = await make_user()
+    course = await make_course()
+    missing = '00000000-0000-0000-0000-000000000001'
+    assert [u['id'] for u in await database.get_users_by_ids([user['id'], missing])] == [user['id']]
+    assert [c['id'] for c in await database.get_courses_by_ids([course['id'], missing])] == [course['id']]
+    assert await database.get_users_by_ids([]) == []
+
+
+async def test_courses_after_pages_newest_first(database, make_user, make_course):
+    instructor = await make_user('instructor', name='Grace')
+    created = [await make_course(instructor['id'], title=f'Course {i}') for i in range(5)]
+
+    seen, cursor = [], None
+    while True:
+        page = await database.get_courses_after(limit=2, cursor=cursor)
+        seen.extend(page)
+        if len(page) < 2:
+            break
+        cursor = (page[-1]['created_at'], page[-1]['id'])
+
+    expected = sorted(created, key=lambda c: (c['created_at'], c['id']), reverse=True)
+    assert [c['id'] for c in seen] == [c['id'] for c in expected]
+    assert all(c['instructor_name'] == 'Grace' for c in seen)
+
+
+async def test_update_course_only_by_its_instructor(database, make_user, make_course):
+    owner = await make_user('instructor')
+    other = await make_user('instructor')
+    course = await make_course(owner['id'])
+
+    assert await database.update_course(course['id'], {'title': 'Stolen'}, instructor_id=other['id']) is None
+    updated = await database.update_course(course['id'], {'title': 'Renamed'}, instructor_id=owner['id'])
+    assert updated['title'] == 'Renamed'
+    assert (await database.get_course_by_id(course['id']))['title'] == 'Renamed'
+
+
+async def test_delete_course_cascades_to_enrollments(database, make_enrollment):
+    enrollment = await make_enrollment()
+    assert await database.delete_course(enrollment['course_id'])
+    assert await database.get_course_by_id(enrollment['course_id']) is None
+    assert await database.get_enrollment_by_id(enrollment['id']) is None
+    assert not await database.delete_course(enrollment['course_id'])
+
+
+async def test_create_enrollments_bulk_skips_existing_pairs(database, make_user, make_course, make_enrollment):
+    user = await make_user()
+    first, second = await make_course(), await make_course()
+    await make_enrollment(user['id'], first['id'])
+
+    created = await database.create_enrollments_bulk([
+        {'user_id': user['id'], 'course_id': first['id'], 'progress': 0.0, 'completed_lessons': 0},
+        {'user_id': user['id'], 'course_id': second['id'], 'progress': 0.0, 'completed_lessons': 0},
+    ])
+    assert [(e['user_id'], e['course_id']) for e in created] == [(user['id'], second['id'])]
+
+
+async def test_update_enrollments_progress_skips_missing_ids(database, make_enrollment):
+    enrollment = await make_enrollment()
+    completed_at = datetime.utcnow().isoformat()
+    updated = await database.update_enrollments_progress([
+        {'id': enrollment['id'], 'course_id': enrollment['course_id'], 'progress': 100.0,
+         'completed_lessons': 10, 'completed_at': completed_at},
+        {'id': '00000000-0000-0000-0000-000000000001', 'course_id': enrollment['course_id'],
+         'progress': 50.0, 'completed_lessons': 5},
+    ])
+    assert updated == 1
+
+    # A later update without completed_at keeps the completion
+    await database.update_enrollments_progress([
+        {'id': enrollment['id'], 'course_id': enrollment['course_id'], 'progress': 90.0, 'completed_lessons': 9},
+    ])
+    stored = await database.get_enrollment_by_id(enrollment['id'])
+    assert stored['progress'] == 90.0
+    assert stored['completed_at'] == completed_at
+
+
+async def test_refresh_token_is_single_use(database, make_user):
+    user = await make_user()
+    live = await database.create_refresh_token(user['id'], datetime.utcnow() + timedelta(days=1))
+    expired = await database.create_refresh_token(user['id'], datetime.utcnow() - timedelta(seconds=1))
+
+    assert (await database.use_refresh_token(live['id']))['id'] == live['id']
+    assert await database.use_refresh_token(live['id']) is None
+    assert await database.use_refresh_token(expired['id']) is None
+    assert await database.delete_refresh_token(live['id'], user['id'])
+    assert await database.purge_expired_tokens() == 1
+
+
+async def test_token_revocations_are_live_until_they_expire(database, make_user):
+    user = await make_user()
+    now = datetime.utcnow()
+    await database.create_token_revocation({'jti': 'live', 'user_id': user['id'], 'expires_at': now + timedelta(hours=1)})
+    await database.create_token_revocation({'jti': 'gone', 'user_id': user['id'], 'expires_at': now - timedelta(hours=1)})
+
+    assert [r['jti'] for r in await database.get_token_revocations(None, now)] == ['live']
+    assert await database.get_token_revocations(now + timedelta(minutes=1), now) == []
+
+
+async def test_certificate_ids_page_oldest_first(database, make_enrollment):
+    enrollment = await make_enrollment()
+    course = await database.get_course_by_id(enrollment['course_id'])
+    issued = []
+    for i in range(5):
+        issued.append(await database.create_certificate({
+            'user_id': enrollment['user_id'], 'course_id': course['id'], 'instructor_id': course['instructor_id'],
+            'certificate_id': f'CERT-TEST-{i:06d}', 'grade': 'A',
+        }))
+
+    pages = [page async for page in database.iter_certificate_ids(page_size=2)]
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [row['certificate_id'] for page in pages for row in page] == [c['certificate_id'] for c in issued]
+
+    since = datetime.fromisoformat(issued[3]['issued_at'])
+    resumed = [row['certificate_id'] async for page in database.iter_certificate_ids(issued_since=since) for row in page]
+    assert resumed == ['CERT-TEST-000003', 'CERT-TEST-000004']
+
+    certificate = await database.get_certificate('CERT-TEST-000000')
+    assert certificate['course_name'] == course['title']
+    assert await database.get_certificate('CERT-TEST-999999') is None
+
+
+async def test_downsample_status_checks_merges_into_hourly_rollups(database):
+    now = datetime.utcnow()
+    old = now - timedelta(days=10)
+    checks = [
+        {'id': f'00000000-0000-0000-0000-00000000000{i}', 'client_name': 'agent',
+         'timestamp': (old + timedelta(minutes=i)).isoformat()}
+        for i in range(3)
+    ]
+    assert await database.create_status_checks_bulk(checks) == 3
+    # Re-sent checks are ignored
+    assert await database.create_status_checks_bulk(checks[:1]) == 0
+
+    result = await database.downsample_status_checks(now - timedelta(days=7), now - timedelta(days=90))
+    assert result['raw_deleted'] == 3
+    assert await database.get_status_checks(client_name='agent') == []
+
+    # A late check for the same hour adds to the existing rollup
+    late = {'id': '00000000-0000-0000-0000-000000000009', 'client_name': 'agent',
+            'timestamp': (old + timedelta(minutes=5)).isoformat()}
+    await database.create_status_checks_bulk([late])
+    await database.downsample_status_checks(now - timedelta(days=7), now - timedelta(days=90))
+    rollups = await database.get_status_check_rollups(client_name='agent')
+    assert sum(rollup['checks'] for rollup in rollups) == 4
+
+
+async def test_course_stat_deltas_and_reconciliation(database, make_enrollment):
+    enrollment = await make_enrollment()
+    course_id = enrollment['course_id']
+    await database.course_stats.flush()
+    assert (await database.backend.get_course_by_id(course_id))['students'] == 1
+
+    # Drift the counter, then let reconciliation recompute it from enrollments
+    await database.apply_course_stat_deltas([
+        {'course_id': course_id, 'students': 5, 'completions': 0, 'rating_count': 0, 'rating_sum': 0},
+    ])
+    assert await database.reconcile_course_stats() == 1
+    assert (await database.backend.get_course_by_id(course_id))['students'] == 1
+    assert await database.reconcile_course_stats() == 0